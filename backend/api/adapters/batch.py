@@ -0,0 +1,91 @@
+"""
+Worker side of the analyze_batch command.
+
+Free of model imports, so worker processes can import it before Django is
+set up, whichever multiprocessing start method is used. Nothing here
+touches the database.
+"""
+import json
+import os
+
+# The engine, file service and requested fields of this worker process
+_engine = None
+_file_service = None
+_fields = None
+
+
+def init_worker(engine_name, fields=None, nice=0):
+    """
+    Set up Django and an uncached analysis engine in a worker process.
+
+    Args:
+        engine_name: The engine to analyze with.
+        fields: Optional subset of ANALYSIS_FIELDS to compute.
+        nice: Niceness to add to the process.
+    """
+    global _engine, _file_service, _fields
+    import django
+    from django.apps import apps
+
+    if not apps.ready:
+        django.setup()
+    if nice and hasattr(os, 'nice'):
+        os.nice(nice)
+
+    from django.conf import settings
+
+    from ..ai import engines
+    from .services import FileService
+
+    _engine = engines.create_engine(engine_name, cached=False)
+    _file_service = FileService(settings.MEDIA_ROOT)
+    _fields = fields
+
+
+def _record(item):
+    """Return the id and {'text' or 'path': ...} record of an item."""
+    kind, key, payload = item
+    if kind == 'path':
+        return key, {'path': payload}
+
+    # An NDJSON line: {"id": ..., "text": ...} or {"id": ..., "path": ...},
+    # with paths relative to the NDJSON file; key is (line number, directory)
+    number, directory = key
+    record = json.loads(payload)
+    if not isinstance(record, dict):
+        raise ValueError("expected a JSON object")
+    if 'path' in record and isinstance(record['path'], str):
+        record['path'] = os.path.join(directory, record['path'])
+    return record.get('id', number), record
+
+
+def _text(record):
+    if isinstance(record.get('text'), str):
+        return record['text']
+    if isinstance(record.get('path'), str):
+        return _file_service.extract_text(record['path'])
+    raise ValueError("expected 'text' or 'path'")
+
+
+def analyze_chunk(items):
+    """
+    Analyze one work unit.
+
+    Args:
+        items: List of ('path', id, file path) or ('ndjson', (line number,
+            directory), line) items.
+
+    Returns:
+        List of (failed, NDJSON line) pairs, one per item and in order: the
+        id and analysis results, or the id and the error.
+    """
+    lines = []
+    for item in items:
+        document_id = item[1] if item[0] == 'path' else item[1][0]
+        try:
+            document_id, record = _record(item)
+            results = _engine.analyze_resume(_text(record), fields=_fields)
+            lines.append((False, json.dumps({'id': document_id, **results})))
+        except Exception as e:
+            lines.append((True, json.dumps({'id': document_id, 'error': f"{type(e).__name__}: {e}"})))
+    return lines
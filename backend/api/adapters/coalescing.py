@@ -0,0 +1,156 @@
+"""
+Single-flight coalescing of identical concurrent work.
+
+Analyzing the same resume twice at once wastes a full pipeline run, and
+both runs then race to save the same rows. SingleFlight lets the first
+caller for a key (the leader) run the work while identical callers wait
+for it and receive the same result.
+
+Within a process, callers wait on the leader's Future. Across processes,
+e.g. several gunicorn workers, the leader holds an exclusive flock on a
+per-key file in the lock directory and writes its JSON-encoded result into
+that file before releasing it. A caller in another process that had to
+wait for the lock takes that result if it was written after the caller
+arrived, and otherwise runs the work itself.
+"""
+import fcntl
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import Future
+
+from ..observability.metrics import REGISTRY
+
+SINGLE_FLIGHT_CALLS = REGISTRY.counter(
+    'resume_analyzer_single_flight_calls',
+    'Coalesced calls by role: leader ran the work, shared waited on a leader in this process, '
+    'remote took the result of a leader in another process.',
+    labelnames=('operation', 'role'),
+)
+
+# Lock files untouched for this long are removed; no caller waits that long
+STALE_LOCK_SECONDS = 24 * 60 * 60
+PRUNE_INTERVAL_SECONDS = 60 * 60
+
+
+def flight_key(*parts):
+    """Hash the parts identifying a unit of work into a key."""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(str(part).encode('utf-8'))
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+class SingleFlight:
+    """Runs work once for all concurrent callers with the same key."""
+
+    def __init__(self, operation, lock_dir=None):
+        """
+        Args:
+            operation: Name of the coalesced work, used as a metric label.
+            lock_dir: Directory for the cross-process lock files, or None to
+                coalesce within this process only.
+        """
+        self.operation = operation
+        self.lock_dir = lock_dir
+        self._flights = {}
+        self._lock = threading.Lock()
+        self._last_prune = 0.0
+
+    def do(self, key, work):
+        """
+        Run work(), or wait for a concurrent caller already running it.
+
+        Args:
+            key: Identifies the work, e.g. from flight_key().
+            work: Zero-argument callable. Its result must be JSON-serializable
+                when a lock directory is used.
+
+        Returns:
+            The result of work(), possibly computed for another caller. If the
+            work raises, callers waiting in this process get the same error.
+        """
+        with self._lock:
+            future = self._flights.get(key)
+            leader = future is None
+            if leader:
+                future = self._flights[key] = Future()
+
+        if not leader:
+            SINGLE_FLIGHT_CALLS.inc((self.operation, 'shared'))
+            return future.result()
+
+        try:
+            result = self._run(key, work)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._flights[key]
+
+    def _run(self, key, work):
+        if self.lock_dir is None:
+            SINGLE_FLIGHT_CALLS.inc((self.operation, 'leader'))
+            return work()
+
+        os.makedirs(self.lock_dir, exist_ok=True)
+        arrived = time.time()
+        with open(os.path.join(self.lock_dir, f'{key}.lock'), 'a+', encoding='utf-8') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                lock_file.seek(0)
+                shared = self._read(lock_file)
+                if shared is not None and shared['finished'] >= arrived:
+                    SINGLE_FLIGHT_CALLS.inc((self.operation, 'remote'))
+                    return shared['result']
+
+                SINGLE_FLIGHT_CALLS.inc((self.operation, 'leader'))
+                result = work()
+                payload = json.dumps({'finished': time.time(), 'result': result})
+                lock_file.truncate(0)
+                lock_file.write(payload)
+                lock_file.flush()
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+        self._prune()
+        return result
+
+    def _read(self, lock_file):
+        try:
+            return json.loads(lock_file.read())
+        except ValueError:
+            return None
+
+    def _prune(self):
+        now = time.time()
+        if now - self._last_prune < PRUNE_INTERVAL_SECONDS:
+            return
+        self._last_prune = now
+        with os.scandir(self.lock_dir) as entries:
+            for entry in entries:
+                try:
+                    if entry.name.endswith('.lock') and now - entry.stat().st_mtime > STALE_LOCK_SECONDS:
+                        os.unlink(entry.path)
+                except OSError:
+                    pass
+
+
+_instances = {}
+_instances_lock = threading.Lock()
+
+
+def get_single_flight(operation, lock_dir=None):
+    """Get the process-wide SingleFlight for an operation and lock directory."""
+    with _instances_lock:
+        key = (operation, lock_dir)
+        if key not in _instances:
+            _instances[key] = SingleFlight(operation, lock_dir)
+        return _instances[key]
@@ -0,0 +1,53 @@
+"""
+Worker side of the reanalyze command.
+
+Free of model imports, so worker processes can import it before Django is
+set up, whichever multiprocessing start method is used.
+"""
+import os
+
+# The analyzer service of this worker process
+_service = None
+
+
+def init_worker(engine_name, nice=0):
+    """
+    Set up Django and the analysis engine in a worker process.
+
+    Args:
+        engine_name: The engine to analyze with.
+        nice: Niceness to add to the process, so the web workers on the
+            same host get the CPU first.
+    """
+    global _service
+    import django
+    from django.apps import apps
+
+    if not apps.ready:
+        django.setup()
+    if nice and hasattr(os, 'nice'):
+        os.nice(nice)
+
+    from ..ai import engines
+    from .services import ResumeAnalyzerService
+
+    _service = ResumeAnalyzerService(None, engine=engines.get_engine(engine_name))
+
+
+def analyze(row):
+    """
+    Analyze one resume.
+
+    Args:
+        row: (id, content, sections) of the resume; sections may be None.
+
+    Returns:
+        (id, score, feedback, sections), as the analyze endpoint would store
+        them. The feedback holds 'analyzer_version' unless the analysis
+        failed.
+    """
+    resume_id, content, sections = row
+    if sections is None:
+        sections = _service.segment(content)
+    score, feedback = _service.analyze(content, sections=sections)
+    return resume_id, score, feedback, sections
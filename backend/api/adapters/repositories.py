@@ -2,7 +2,62 @@
 Repositories for the resume analyzer application.
 These handle data access and persistence.
 """
+from datetime import datetime, timedelta
+
+from django.db import connections, router
+from django.db.models import Avg, Count, F, Max, Min, Q
+from django.utils import timezone
+
 from api.domain.entities import Resume, User, Feedback
+from api.domain.use_cases import FEEDBACK_CATEGORIES, JobDescription
+
+# Columns of a resume export, in order: the resume's analysis summary and,
+# per feedback category, its score and feedback text
+EXPORT_FIELDS = (
+    'id', 'file_path', 'score', 'job_role', 'analyzer_version', 'created_at', 'updated_at',
+    *(f'{category}_score' for category in FEEDBACK_CATEGORIES),
+    *(f'{category}_feedback' for category in FEEDBACK_CATEGORIES),
+    'improvement_suggestions',
+)
+
+# Bounds of the score distribution buckets; the last one includes 100
+SCORE_BUCKETS = tuple((low, low + 9 if low < 90 else 100) for low in range(0, 100, 10))
+
+
+def resume_filter(user_id, created_after=None, created_before=None, min_score=None, max_score=None,
+                  prefix=''):
+    """
+    Build the filter selecting a user's resumes.
+
+    Args:
+        user_id: The ID of the user.
+        created_after: Optional datetime or date (inclusive) to select from.
+        created_before: Optional datetime or date (inclusive) to select to.
+        min_score: Optional lowest score to select.
+        max_score: Optional highest score to select.
+        prefix: Lookup path to the resume, e.g. 'resume__' to filter feedback.
+
+    Returns:
+        A Q object.
+    """
+    lookups = {f'{prefix}user_id': user_id}
+    # Dates cover the whole day. They are compared as datetimes, which
+    # (unlike created_at__date) range-scan the (user, created_at) index
+    if created_after is not None:
+        if not isinstance(created_after, datetime):
+            created_after = timezone.make_aware(datetime.combine(created_after, datetime.min.time()))
+        lookups[f'{prefix}created_at__gte'] = created_after
+    if created_before is not None:
+        if isinstance(created_before, datetime):
+            lookups[f'{prefix}created_at__lte'] = created_before
+        else:
+            next_day = datetime.combine(created_before + timedelta(days=1), datetime.min.time())
+            lookups[f'{prefix}created_at__lt'] = timezone.make_aware(next_day)
+    if min_score is not None:
+        lookups[f'{prefix}score__gte'] = min_score
+    if max_score is not None:
+        lookups[f'{prefix}score__lte'] = max_score
+    return Q(**lookups)
 
 
 class ResumeRepository:
@@ -77,11 +132,114 @@ class ResumeRepository:
             resume_obj.score = resume.score
         if resume.feedback is not None:
             resume_obj.feedback = resume.feedback
+            # The version describes the feedback, so they change together
+            resume_obj.analyzer_version = resume.analyzer_version
+        if resume.sections is not None:
+            resume_obj.sections = resume.sections
         
         resume_obj.save()
         
         return self._to_entity(resume_obj)
     
+    def save_analyses(self, resumes):
+        """
+        Store the analysis results of many resumes, skipping the resumes
+        that changed since they were read.
+
+        Each resume is written with one conditional UPDATE, so a result
+        saved meanwhile, e.g. by the analyze endpoint, is not overwritten.
+
+        Args:
+            resumes: Resume entities with their score, feedback, sections
+                and analyzer_version set, and updated_at as it was read.
+
+        Returns:
+            The resumes that were saved.
+        """
+        now = timezone.now()
+        return [
+            resume for resume in resumes
+            if self.resume_model.objects.filter(id=resume.id, updated_at=resume.updated_at).update(
+                score=resume.score,
+                feedback=resume.feedback,
+                sections=resume.sections,
+                analyzer_version=resume.analyzer_version,
+                # update() skips auto_now
+                updated_at=now
+            )
+        ]
+
+    def iter_exports(self, user_id, created_after=None, created_before=None, min_score=None, max_score=None,
+                     chunk_size=2000):
+        """
+        Stream the export rows of a user's resumes, in ID order.
+
+        Only the exported values are read: the feedback JSON is projected
+        key by key in the database, and resume content is never loaded.
+        Rows are fetched chunk_size at a time, so memory does not grow with
+        the number of resumes.
+
+        Args:
+            user_id: The ID of the user.
+            created_after: Optional datetime or date (inclusive) to export from.
+            created_before: Optional datetime or date (inclusive) to export to.
+            min_score: Optional lowest score to export.
+            max_score: Optional highest score to export.
+            chunk_size: Rows fetched from the database at a time.
+
+        Yields:
+            Dicts keyed by EXPORT_FIELDS.
+        """
+        resumes = self.resume_model.objects.filter(
+            resume_filter(user_id, created_after, created_before, min_score, max_score)
+        )
+
+        projections = {
+            'job_role': F('feedback__job_role'),
+            'improvement_suggestions': F('feedback__improvement_suggestions'),
+        }
+        for category in FEEDBACK_CATEGORIES:
+            projections[f'{category}_score'] = F(f'feedback__category_scores__{category}')
+            projections[f'{category}_feedback'] = F(f'feedback__{category}')
+        rows = resumes.order_by('id').values(
+            *(field for field in EXPORT_FIELDS if field not in projections), **projections
+        )
+        for row in rows.iterator(chunk_size=chunk_size):
+            yield {field: row[field] for field in EXPORT_FIELDS}
+
+    def get_stats(self, user_id, **filters):
+        """
+        Aggregate the scores of a user's resumes in one database query.
+
+        Args:
+            user_id: The ID of the user.
+            **filters: Optional created_after, created_before, min_score
+                and max_score, as for iter_exports.
+
+        Returns:
+            Dict with the resume 'count', the 'analyzed' count, the
+            'average_score', 'min_score' and 'max_score' (None when nothing
+            is analyzed) and the 'score_distribution': a list of
+            {'min', 'max', 'count'} buckets.
+        """
+        aggregates = {
+            'count': Count('id'),
+            'analyzed': Count('score'),
+            'average_score': Avg('score'),
+            'min_score': Min('score'),
+            'max_score': Max('score'),
+        }
+        for low, high in SCORE_BUCKETS:
+            aggregates[f'bucket_{low}'] = Count('id', filter=Q(score__gte=low, score__lte=high))
+        stats = self.resume_model.objects.filter(resume_filter(user_id, **filters)).aggregate(**aggregates)
+
+        if stats['average_score'] is not None:
+            stats['average_score'] = round(stats['average_score'], 2)
+        stats['score_distribution'] = [
+            {'min': low, 'max': high, 'count': stats.pop(f'bucket_{low}')} for low, high in SCORE_BUCKETS
+        ]
+        return stats
+
     def delete(self, resume_id):
         """
         Delete a resume.
@@ -117,7 +275,9 @@ class ResumeRepository:
             score=resume_obj.score,
             feedback=resume_obj.feedback,
             created_at=resume_obj.created_at,
-            updated_at=resume_obj.updated_at
+            updated_at=resume_obj.updated_at,
+            sections=resume_obj.sections,
+            analyzer_version=resume_obj.analyzer_version
         )
 
 
@@ -149,6 +309,71 @@ class FeedbackRepository:
         
         return self._to_entity(feedback_obj)
     
+    def save(self, resume_id, category, content, score):
+        """
+        Create the feedback for a resume category, or replace it when the
+        resume is analyzed again.
+        
+        Args:
+            resume_id: The ID of the resume.
+            category: The category of the feedback.
+            content: The content of the feedback.
+            score: The score for this feedback category.
+            
+        Returns:
+            A Feedback entity.
+        """
+        feedback_obj, _ = self.feedback_model.objects.update_or_create(
+            resume_id=resume_id,
+            category=category,
+            defaults={'content': content, 'score': score}
+        )
+        
+        return self._to_entity(feedback_obj)
+    
+    def save_many(self, entries):
+        """
+        Create or replace the feedback of many resume categories at once.
+
+        Args:
+            entries: Iterable of (resume_id, category, content, score).
+        """
+        options = {'update_conflicts': True, 'update_fields': ['content', 'score']}
+        # MySQL upserts on any unique key and rejects an explicit one
+        if connections[router.db_for_write(self.feedback_model)].features.supports_update_conflicts_with_target:
+            options['unique_fields'] = ['resume', 'category']
+        self.feedback_model.objects.bulk_create(
+            [
+                self.feedback_model(resume_id=resume_id, category=category, content=content, score=score)
+                for resume_id, category, content, score in entries
+            ],
+            **options
+        )
+
+    def get_category_averages(self, user_id, **filters):
+        """
+        Average the category scores of a user's resumes in one database query.
+
+        Args:
+            user_id: The ID of the user.
+            **filters: Optional created_after, created_before, min_score
+                and max_score of the resumes, as for ResumeRepository.iter_exports.
+
+        Returns:
+            Dict of category to {'average_score', 'count'}, for the
+            categories with feedback.
+        """
+        rows = (
+            self.feedback_model.objects.filter(resume_filter(user_id, prefix='resume__', **filters))
+            .values('category')
+            .annotate(average_score=Avg('score'), count=Count('id'))
+            .order_by('category')
+        )
+        return {
+            row['category']: {'average_score': round(row['average_score'], 2), 'count': row['count']}
+            for row in rows
+        }
+
     def get_by_resume_id(self, resume_id):
         """
         Get all feedback for a resume.
@@ -180,3 +405,223 @@ class FeedbackRepository:
             score=feedback_obj.score,
             created_at=feedback_obj.created_at
         )
+
+
+class JobDescriptionRepository:
+    """Repository for stored JobDescription entities."""
+
+    def __init__(self, job_description_model):
+        self.job_description_model = job_description_model
+
+    def get_by_id(self, job_description_id):
+        """
+        Get a job description by ID.
+
+        Args:
+            job_description_id: The ID of the job description.
+
+        Returns:
+            A JobDescription entity with its precomputed representation, or
+            None if not found.
+        """
+        try:
+            job_obj = self.job_description_model.objects.get(id=job_description_id)
+        except (self.job_description_model.DoesNotExist, ValueError):
+            return None
+        return self._to_entity(job_obj)
+
+    def save_prepared(self, job_description):
+        """
+        Store the recomputed representation of a job description, unless
+        its description was edited meanwhile.
+
+        Args:
+            job_description: The JobDescription entity, with the prepared
+                representation of its description.
+        """
+        self.job_description_model.objects.filter(
+            id=job_description.id, description=job_description.description
+        ).update(prepared=job_description.prepared)
+
+    def _to_entity(self, job_obj):
+        return JobDescription(
+            id=job_obj.id,
+            title=job_obj.title,
+            description=job_obj.description,
+            company=job_obj.company,
+            location=job_obj.location,
+            prepared=job_obj.prepared
+        )
+
+
+class SectionCacheRepository:
+    """Database-backed cache of preprocessed resume sections."""
+
+    def __init__(self, section_model, retention_days=30):
+        self.section_model = section_model
+        self.retention_days = retention_days
+
+    def get_many(self, fingerprints):
+        """
+        Get cached sections.
+
+        Args:
+            fingerprints: Section fingerprints to look up.
+
+        Returns:
+            Dictionary mapping the fingerprints found to preprocessed text.
+        """
+        return dict(
+            self.section_model.objects.filter(fingerprint__in=fingerprints)
+            .values_list('fingerprint', 'preprocessed')
+        )
+
+    def set_many(self, entries):
+        """
+        Store preprocessed sections. Entries past retention are dropped by
+        prune(), outside requests (see the prune_caches command).
+
+        Args:
+            entries: Dictionary mapping fingerprints to preprocessed text.
+        """
+        self.section_model.objects.bulk_create(
+            [self.section_model(fingerprint=key, preprocessed=value) for key, value in entries.items()],
+            ignore_conflicts=True
+        )
+
+    def prune(self):
+        """
+        Drop entries past retention.
+
+        Returns:
+            The number of entries dropped.
+        """
+        cutoff = timezone.now() - timedelta(days=self.retention_days)
+        return self.section_model.objects.filter(created_at__lt=cutoff).delete()[0]
+
+    def delete_many(self, fingerprints):
+        """
+        Drop cached sections.
+
+        Args:
+            fingerprints: Section fingerprints to drop.
+        """
+        self.section_model.objects.filter(fingerprint__in=fingerprints).delete()
+
+
+class IdempotencyRepository:
+    """Database-backed record of requests made with an Idempotency-Key."""
+
+    def __init__(self, key_model, ttl_hours=24):
+        self.key_model = key_model
+        self.ttl_hours = ttl_hours
+
+    def claim(self, user_id, key, path, fingerprint):
+        """
+        Claim a key for a new request, unless it is already in use.
+
+        Expired keys are dropped first, so they can be claimed again.
+
+        Args:
+            user_id: The ID of the user making the request.
+            key: The Idempotency-Key header value.
+            path: The request path.
+            fingerprint: Hash of the request's parameters and body.
+
+        Returns:
+            None if the key was claimed, otherwise the existing record as a
+            dictionary with 'path', 'fingerprint', 'status_code', 'response'
+            and 'created_at'; 'status_code' is None while that request is
+            still in flight.
+        """
+        cutoff = timezone.now() - timedelta(hours=self.ttl_hours)
+        self.key_model.objects.filter(user_id=user_id, key=key, created_at__lt=cutoff).delete()
+
+        record, created = self.key_model.objects.get_or_create(
+            user_id=user_id, key=key, defaults={'path': path, 'fingerprint': fingerprint}
+        )
+        if not created:
+            return self._to_dict(record)
+
+        self.key_model.objects.filter(created_at__lt=cutoff).delete()
+        return None
+
+    def get(self, user_id, key):
+        """Get the record of a key as returned by claim(), or None."""
+        record = self.key_model.objects.filter(user_id=user_id, key=key).first()
+        return self._to_dict(record) if record else None
+
+    def complete(self, user_id, key, status_code, response):
+        """Store the response of the request that claimed a key."""
+        self.key_model.objects.filter(user_id=user_id, key=key).update(
+            status_code=status_code, response=response
+        )
+
+    def release(self, user_id, key):
+        """Give up a claimed key, letting a retry run the request again."""
+        self.key_model.objects.filter(user_id=user_id, key=key, status_code__isnull=True).delete()
+
+    def _to_dict(self, record):
+        return {
+            'path': record.path,
+            'fingerprint': record.fingerprint,
+            'status_code': record.status_code,
+            'response': record.response,
+            'created_at': record.created_at,
+        }
+
+
+class MatchCacheRepository:
+    """Database-backed cache of match results."""
+
+    def __init__(self, match_model, max_entries=100000, retention_days=30):
+        self.match_model = match_model
+        self.max_entries = max_entries
+        self.retention_days = retention_days
+
+    def get(self, resume_hash, job_hash, matcher_version, taxonomy_version):
+        """
+        Get a cached match result.
+
+        Returns:
+            The match result, or None if it is not cached or has expired.
+        """
+        cutoff = timezone.now() - timedelta(days=self.retention_days)
+        return self.match_model.objects.filter(
+            resume_hash=resume_hash,
+            job_hash=job_hash,
+            matcher_version=matcher_version,
+            taxonomy_version=taxonomy_version,
+            created_at__gte=cutoff
+        ).values_list('result', flat=True).first()
+
+    def set(self, resume_hash, job_hash, matcher_version, taxonomy_version, result):
+        """
+        Store a match result. The cache is bounded by prune(), which runs
+        outside requests (see the prune_caches command).
+        """
+        self.match_model.objects.bulk_create(
+            [self.match_model(
+                resume_hash=resume_hash, job_hash=job_hash, matcher_version=matcher_version,
+                taxonomy_version=taxonomy_version, result=result
+            )],
+            ignore_conflicts=True
+        )
+
+    def prune(self):
+        """
+        Drop entries past retention, then the oldest entries beyond
+        max_entries. Entries of older matcher and taxonomy versions are
+        never read again and age out the same way.
+
+        Returns:
+            The number of entries dropped.
+        """
+        cutoff = timezone.now() - timedelta(days=self.retention_days)
+        dropped, _ = self.match_model.objects.filter(created_at__lt=cutoff).delete()
+
+        excess = self.match_model.objects.count() - self.max_entries
+        if excess > 0:
+            oldest = self.match_model.objects.order_by('created_at').values_list('id', flat=True)[:excess]
+            dropped += self.match_model.objects.filter(id__in=list(oldest)).delete()[0]
+        return dropped
@@ -2,15 +2,49 @@
 Services for the resume analyzer application.
 These handle external dependencies and business logic.
 """
+import hashlib
+import logging
 import os
 import uuid
-from ..ai.resume_analyzer import AdvancedResumeAnalyzer
-from ..ai.job_matcher import JobMatcher
+from time import perf_counter
+from ..ai import engines
+from ..ai.sections import segment
+from ..observability.metrics import REGISTRY
+from ..observability.timing import span
+
+ENGINE_SECONDS = REGISTRY.histogram(
+    'resume_analyzer_engine_duration_seconds',
+    'Wall time of engine calls, by engine and operation.',
+    labelnames=('engine', 'operation'),
+)
+ENGINE_SCORES = REGISTRY.histogram(
+    'resume_analyzer_engine_score',
+    'Scores returned by each engine, for side-by-side comparison.',
+    labelnames=('engine', 'operation'),
+    buckets=(10, 20, 30, 40, 50, 60, 70, 80, 90, 100),
+)
+ENGINE_DEGRADED = REGISTRY.counter(
+    'resume_analyzer_engine_degraded',
+    'Engine calls that ran out of time budget and returned partial results.',
+    labelnames=('engine', 'operation'),
+)
+ENGINE_ERRORS = REGISTRY.counter(
+    'resume_analyzer_engine_errors',
+    'Engine calls that raised and fell back to default results.',
+    labelnames=('engine', 'operation'),
+)
+
+logger = logging.getLogger(__name__)
 
 
 class FileService:
     """Service for handling file operations."""
 
+    # Uploads are spread over SHARD_LEVELS nested directories, each named
+    # by SHARD_WIDTH hex characters of the filename hash (e.g. resumes/3f/a2/).
+    SHARD_LEVELS = 2
+    SHARD_WIDTH = 2
+
     def __init__(self, media_root):
         self.media_root = media_root
         self.upload_dir = os.path.join(media_root, 'resumes')
@@ -18,9 +52,26 @@ class FileService:
         # Create the upload directory if it doesn't exist
         os.makedirs(self.upload_dir, exist_ok=True)
 
+    def shard_dir(self, filename):
+        """
+        Get the sharded directory a file belongs in.
+
+        Args:
+            filename: The base name of the stored file.
+
+        Returns:
+            The absolute path of the shard directory.
+        """
+        digest = hashlib.sha1(filename.encode('utf-8')).hexdigest()
+        parts = [
+            digest[level * self.SHARD_WIDTH:(level + 1) * self.SHARD_WIDTH]
+            for level in range(self.SHARD_LEVELS)
+        ]
+        return os.path.join(self.upload_dir, *parts)
+
     def save(self, file):
         """
-        Save a file to the upload directory.
+        Save a file to its shard of the upload directory.
 
         Args:
             file: The file to save.
@@ -30,7 +81,9 @@ class FileService:
         """
         # Generate a unique filename
         filename = f"{uuid.uuid4()}_{file.name}"
-        file_path = os.path.join(self.upload_dir, filename)
+        shard_dir = self.shard_dir(filename)
+        os.makedirs(shard_dir, exist_ok=True)
+        file_path = os.path.join(shard_dir, filename)
 
         # Save the file
         with open(file_path, 'wb+') as destination:
@@ -39,6 +92,74 @@ class FileService:
 
         return file_path
 
+    def delete(self, file_path):
+        """
+        Delete a stored file.
+
+        Paths outside the upload directory are ignored, so a stale or
+        tampered file_path can never remove anything else on disk.
+
+        Args:
+            file_path: The path to the file.
+
+        Returns:
+            True if a file was removed, False otherwise.
+        """
+        if not self.is_managed(file_path):
+            return False
+
+        try:
+            os.remove(file_path)
+            return True
+        except FileNotFoundError:
+            return False
+
+    def is_managed(self, file_path):
+        """Check whether a path lives inside the upload directory."""
+        upload_dir = os.path.abspath(self.upload_dir)
+        return os.path.commonpath([upload_dir, os.path.abspath(file_path)]) == upload_dir
+
+    def iter_shards(self):
+        """
+        Iterate over shard directories in a stable, sorted order.
+
+        The unsharded upload directory itself is yielded first as the shard
+        ``''`` so files stored before sharding are still visited. Only one
+        directory listing per level is held in memory at a time.
+
+        Yields:
+            Tuples of (shard key, absolute directory path), e.g. ('3f/a2', ...).
+        """
+        yield '', self.upload_dir
+        yield from self._iter_shard_level(self.upload_dir, [], self.SHARD_LEVELS)
+
+    def _iter_shard_level(self, directory, prefix, levels_left):
+        names = sorted(
+            entry.name for entry in os.scandir(directory)
+            if entry.is_dir(follow_symlinks=False) and self._is_shard_name(entry.name)
+        )
+        for name in names:
+            path = os.path.join(directory, name)
+            if levels_left == 1:
+                yield '/'.join(prefix + [name]), path
+            else:
+                yield from self._iter_shard_level(path, prefix + [name], levels_left - 1)
+
+    def _is_shard_name(self, name):
+        return len(name) == self.SHARD_WIDTH and all(c in '0123456789abcdef' for c in name)
+
+    def iter_files(self, directory):
+        """
+        Stream the regular files directly inside a directory.
+
+        Yields:
+            os.DirEntry objects, in directory order.
+        """
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.is_file(follow_symlinks=False):
+                    yield entry
+
     def extract_text(self, file_path):
         """
         Extract text from a file.
@@ -55,125 +176,314 @@ class FileService:
 
         file_extension = os.path.splitext(file_path)[1].lower()
 
-        if file_extension == '.txt':
-            with open(file_path, 'r', encoding='utf-8') as file:
-                return file.read()
-        elif file_extension == '.pdf':
-            # Placeholder for PDF extraction
-            # In a real app, use PyPDF2 or similar
-            return "PDF text extraction placeholder"
-        elif file_extension in ['.docx', '.doc']:
-            # Placeholder for Word document extraction
-            # In a real app, use docx2txt or similar
-            return "Word document text extraction placeholder"
-        else:
-            return "Unsupported file format"
+        with span('file_service', 'extract_text'):
+            if file_extension == '.txt':
+                with open(file_path, 'r', encoding='utf-8') as file:
+                    return file.read()
+            elif file_extension == '.pdf':
+                # Placeholder for PDF extraction
+                # In a real app, use PyPDF2 or similar
+                return "PDF text extraction placeholder"
+            elif file_extension in ['.docx', '.doc']:
+                # Placeholder for Word document extraction
+                # In a real app, use docx2txt or similar
+                return "Word document text extraction placeholder"
+            else:
+                return "Unsupported file format"
 
 
 class ResumeAnalyzerService:
     """Service for analyzing resumes using advanced NLP techniques."""
 
-    def __init__(self, feedback_repository):
+    def __init__(self, feedback_repository, engine=None):
+        """
+        Args:
+            feedback_repository: Repository for category feedback.
+            engine: The analysis engine to use, or None to select one from
+                the ANALYSIS_ENGINE settings.
+        """
         self.feedback_repository = feedback_repository
+        self.engine = engine or engines.select_engine()
+
+    @property
+    def analyzer_version(self):
+        """The version stored with this engine's analyses (see api.ai.engines)."""
+        return getattr(self.engine, 'version', None) or self.engine.name
+
+    def _record(self, operation, start, score=None, failed=False, degraded=False):
+        labels = (self.engine.name, operation)
+        ENGINE_SECONDS.observe(perf_counter() - start, labels)
+        if failed:
+            ENGINE_ERRORS.inc(labels)
+        elif score is not None:
+            ENGINE_SCORES.observe(score, labels)
+        if degraded:
+            ENGINE_DEGRADED.inc(labels)
+
+    def segment(self, resume_content):
+        """
+        Split a resume into sections.
+
+        Args:
+            resume_content: The text content of the resume.
 
-        # Initialize the advanced resume analyzer and job matcher
-        self.analyzer = AdvancedResumeAnalyzer()
-        self.job_matcher = JobMatcher()
+        Returns:
+            List of [name, start, end] section offsets, suitable for storing
+            on the resume and passing back to analyze().
+        """
+        with span('analyzer', 'segment'):
+            return segment(resume_content)
 
-    def analyze(self, resume_content, job_description=None):
+    def analyze(self, resume_content, job_description=None, sections=None, fields=None, budget=None,
+                prepared_job=None):
         """
         Analyze a resume and generate a score and feedback.
 
         Args:
             resume_content: The text content of the resume.
             job_description: Optional job description to compare with the resume.
+            sections: Optional stored section offsets of the resume.
+            fields: Optional subset of ANALYSIS_FIELDS to compute; the
+                overall score is always included. None computes everything.
+            budget: Optional time budget in seconds. Stages run in priority
+                order and, once the budget is spent, the remaining ones are
+                skipped; the feedback then records 'degraded' and the
+                'completed_stages'.
+            prepared_job: Optional stored prepare_job() result for the job
+                description.
 
         Returns:
             A tuple of (score, feedback) where score is a number from 0-100
-            and feedback is a dictionary of category-specific feedback.
+            and feedback is a dictionary of category-specific feedback. The
+            feedback of a complete, non-degraded analysis also holds the
+            'analyzer_version' to store with it.
+        """
+        if fields is not None:
+            fields = set(fields) | {'score'}
+
+        start = perf_counter()
+        deadline = start + budget if budget else None
+        try:
+            # Use the selected engine to analyze the resume
+            results = self.engine.analyze_resume(
+                resume_content, sections=sections, fields=fields, deadline=deadline
+            )
+            overall_score, feedback = self._complete_analysis(
+                resume_content, job_description, results, fields, deadline, prepared_job
+            )
+            self._record('analyze', start, overall_score, degraded=feedback.get('degraded', False))
+            return overall_score, feedback
+        except Exception as e:
+            # Handle errors gracefully
+            print(f"Error analyzing resume: {str(e)}")
+            self._record('analyze', start, failed=True)
+
+            # Provide default values in case of error
+            return 50, self._default_feedback()
+
+    def stream_analysis(self, resume_content, job_description=None, sections=None, fields=None, budget=None,
+                        prepared_job=None):
         """
+        Analyze a resume, yielding results as soon as each one is computed.
+
+        Takes the same arguments as analyze(). Closing the generator, e.g.
+        when the client disconnects, stops the analysis.
+
+        Yields:
+            (event, data) tuples: ('category_score', {'category', 'score'}),
+            ('stage', {'stage', 'results'}) per completed stage, including
+            'job_match', then ('complete', {'score', 'feedback'}) with the
+            same result analyze() returns, or ('error', {'error'}).
+        """
+        if fields is not None:
+            fields = set(fields) | {'score'}
+
+        start = perf_counter()
+        deadline = start + budget if budget else None
         try:
-            # Use the advanced analyzer to analyze the resume
-            results = self.analyzer.analyze_resume(resume_content)
-
-            # Extract the overall score and feedback
-            overall_score = results['score']
-            feedback = results['feedback']
-
-            # Add additional analysis results to the feedback
-            feedback['improvement_suggestions'] = results['improvement_suggestions']
-            feedback['key_strengths'] = results['key_strengths']
-            feedback['job_role'] = results['job_role']
-            feedback['job_role_confidence'] = results['job_role_confidence']
-            feedback['keywords'] = results['keywords']
-
-            # If job description is provided, compare with resume
-            if job_description:
-                match_results = self.job_matcher.calculate_match_score(resume_content, job_description)
-                job_suggestions = self.job_matcher.generate_improvement_suggestions(match_results)
-
-                # Add job match results to feedback
-                feedback['job_match'] = {
-                    'overall_match_score': match_results['overall_match_score'],
-                    'similarity_score': match_results['similarity_score'],
-                    'skill_match_scores': match_results['skill_match_scores'],
-                    'missing_skills': match_results['missing_skills'],
-                    'matched_skills': match_results['matched_skills'],
-                    'job_specific_suggestions': job_suggestions
-                }
+            iter_analysis = getattr(self.engine, 'iter_analysis', None)
+            if iter_analysis is None:
+                # Engines without streaming support report everything at once
+                results = self.engine.analyze_resume(
+                    resume_content, sections=sections, fields=fields, deadline=deadline
+                )
+                yield 'stage', {'stage': 'analysis', 'results': results}
+            else:
+                results = {}
+                events = iter_analysis(resume_content, sections=sections, fields=fields, deadline=deadline)
+                try:
+                    for event, data in events:
+                        if event == 'stage':
+                            results.update(data['results'])
+                        elif event == 'done':
+                            if deadline is not None:
+                                results.update(data)
+                            continue
+                        yield event, data
+                finally:
+                    events.close()
+
+            overall_score, feedback = self._complete_analysis(
+                resume_content, job_description, results, fields, deadline, prepared_job
+            )
+            if 'job_match' in feedback:
+                yield 'stage', {'stage': 'job_match', 'results': {'job_match': feedback['job_match']}}
+        except Exception as e:
+            logger.exception("Error analyzing resume")
+            self._record('analyze', start, failed=True)
+            yield 'error', {'error': str(e)}
+            return
+
+        self._record('analyze', start, overall_score, degraded=feedback.get('degraded', False))
+        yield 'complete', {'score': overall_score, 'feedback': feedback}
+
+    def _complete_analysis(self, resume_content, job_description, results, fields, deadline, prepared_job):
+        """Build the stored feedback from engine results and run the job match."""
+        # Extract the overall score and feedback
+        overall_score = results['score']
+        feedback = results.get('feedback', {})
+
+        # Add additional analysis results to the feedback
+        for field in ('category_scores', 'improvement_suggestions', 'key_strengths',
+                      'job_role', 'job_role_confidence', 'keywords'):
+            if field in results:
+                feedback[field] = results[field]
+        feedback['engine'] = self.engine.name
+        if fields is not None:
+            feedback['fields'] = sorted(fields)
+
+        completed_stages = list(results.get('completed_stages', []))
+        degraded = results.get('degraded', False)
+
+        # If job description is provided, compare with resume
+        if job_description and deadline is not None and perf_counter() >= deadline:
+            degraded = True
+        elif job_description:
+            match_results = self._match(resume_content, job_description, prepared_job)
+            job_suggestions = self.engine.generate_improvement_suggestions(match_results)
+
+            # Add job match results to feedback
+            feedback['job_match'] = {
+                'overall_match_score': match_results['overall_match_score'],
+                'similarity_score': match_results['similarity_score'],
+                'skill_match_scores': match_results['skill_match_scores'],
+                'missing_skills': match_results['missing_skills'],
+                'matched_skills': match_results['matched_skills'],
+                'job_specific_suggestions': job_suggestions
+            }
 
+            if 'improvement_suggestions' in feedback:
                 # Add job-specific suggestions to improvement suggestions
                 feedback['improvement_suggestions'].extend(job_suggestions)
 
                 # Remove duplicates from improvement suggestions
                 feedback['improvement_suggestions'] = list(set(feedback['improvement_suggestions']))
+            completed_stages.append('job_match')
+
+        if deadline is not None:
+            feedback['completed_stages'] = completed_stages
+            feedback['degraded'] = degraded
+        if not degraded and fields is None:
+            # Stored on the resume rather than in its feedback; partial and
+            # degraded results stay unversioned, so reanalyze completes them
+            feedback['analyzer_version'] = self.analyzer_version
+        return overall_score, feedback
+
+    def prepare_job(self, job_description):
+        """
+        Precompute the job side of future matches with this engine.
 
-            return overall_score, feedback
-        except Exception as e:
-            # Handle errors gracefully
-            print(f"Error analyzing resume: {str(e)}")
+        Args:
+            job_description: The text content of the job description.
 
-            # Provide default values in case of error
-            default_feedback = {
-                'technical_skills': "Unable to analyze technical skills due to an error.",
-                'education': "Unable to analyze education due to an error.",
-                'experience': "Unable to analyze experience due to an error.",
-                'achievements': "Unable to analyze achievements due to an error.",
-                'formatting': "Unable to analyze formatting due to an error.",
-                'improvement_suggestions': ["Ensure your resume is in a standard format"],
-                'key_strengths': ["Unable to identify key strengths due to an error"],
-                'job_role': "Unknown",
-                'job_role_confidence': 0,
-                'keywords': []
-            }
+        Returns:
+            A JSON-serializable representation to store with the job
+            description, or None if the engine does not support it.
+        """
+        prepare_job = getattr(self.engine, 'prepare_job', None)
+        return prepare_job(job_description) if prepare_job is not None else None
+
+    def refresh_prepared_job(self, job_description, prepared_job):
+        """
+        Recompute a stored prepare_job() result that is missing or out of
+        date, e.g. after a new taxonomy is published.
 
-            return 50, default_feedback
+        Args:
+            job_description: The text content of the job description.
+            prepared_job: The stored prepare_job() result, or None.
 
-    def compare_with_job(self, resume_content, job_description):
+        Returns:
+            The new result to store, or None if the stored one is current or
+            the engine cannot tell.
+        """
+        is_current = getattr(self.engine, 'is_prepared_current', None)
+        if is_current is None or (prepared_job is not None and is_current(prepared_job)):
+            return None
+        return self.prepare_job(job_description)
+
+    def _match(self, resume_content, job_description, prepared_job):
+        if prepared_job is not None and hasattr(self.engine, 'prepare_job'):
+            return self.engine.calculate_match_score(resume_content, job_description, prepared_job=prepared_job)
+        return self.engine.calculate_match_score(resume_content, job_description)
+
+    def _default_feedback(self):
+        return {
+            'technical_skills': "Unable to analyze technical skills due to an error.",
+            'education': "Unable to analyze education due to an error.",
+            'experience': "Unable to analyze experience due to an error.",
+            'achievements': "Unable to analyze achievements due to an error.",
+            'formatting': "Unable to analyze formatting due to an error.",
+            'improvement_suggestions': ["Ensure your resume is in a standard format"],
+            'key_strengths': ["Unable to identify key strengths due to an error"],
+            'job_role': "Unknown",
+            'job_role_confidence': 0,
+            'keywords': [],
+            'engine': self.engine.name
+        }
+
+    def compare_with_job(self, resume_content, job_description, budget=None, prepared_job=None):
         """
         Compare a resume with a job description.
 
         Args:
             resume_content: The text content of the resume.
             job_description: The text content of the job description.
+            budget: Optional time budget in seconds. The match scores are
+                always computed; suggestions are skipped once it is spent.
+            prepared_job: Optional stored prepare_job() result for the job
+                description.
 
         Returns:
             Dictionary with match results.
         """
+        start = perf_counter()
+        deadline = start + budget if budget else None
         try:
             # Calculate match score
-            match_results = self.job_matcher.calculate_match_score(resume_content, job_description)
+            match_results = self._match(resume_content, job_description, prepared_job)
+            completed_stages = ['match_score']
 
             # Generate improvement suggestions
-            job_suggestions = self.job_matcher.generate_improvement_suggestions(match_results)
+            degraded = deadline is not None and perf_counter() >= deadline
+            if degraded:
+                job_suggestions = []
+            else:
+                job_suggestions = self.engine.generate_improvement_suggestions(match_results)
+                completed_stages.append('suggestions')
 
             # Add suggestions to results
             match_results['job_specific_suggestions'] = job_suggestions
+            match_results['engine'] = self.engine.name
+            if deadline is not None:
+                match_results['completed_stages'] = completed_stages
+                match_results['degraded'] = degraded
 
+            self._record('compare_job', start, match_results['overall_match_score'], degraded=degraded)
             return match_results
         except Exception as e:
             # Handle errors gracefully
             print(f"Error comparing resume with job description: {str(e)}")
+            self._record('compare_job', start, failed=True)
 
             # Provide default values in case of error
             default_results = {
@@ -182,7 +492,8 @@ class ResumeAnalyzerService:
                 'skill_match_scores': {'technical': 50, 'soft': 50, 'domain': 50},
                 'missing_skills': {'technical': [], 'soft': [], 'domain': []},
                 'matched_skills': {'technical': [], 'soft': [], 'domain': []},
-                'job_specific_suggestions': ["Unable to generate job-specific suggestions due to an error."]
+                'job_specific_suggestions': ["Unable to generate job-specific suggestions due to an error."],
+                'engine': self.engine.name
             }
 
             return default_results
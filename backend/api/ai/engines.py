@@ -0,0 +1,319 @@
+"""
+Registry of analysis engines.
+
+An engine bundles a resume analyzer and a job matcher behind one interface:
+``analyze_resume(resume_text, sections=None, fields=None, deadline=None)``,
+``calculate_match_score(resume_text, job_description)`` and
+``generate_improvement_suggestions(match_result)``, returning the same
+shapes as AdvancedResumeAnalyzer and JobMatcher. ``sections`` carries the
+stored section offsets of the resume (see api.ai.sections) when known,
+``fields`` limits the analysis to a subset of ANALYSIS_FIELDS, and
+``deadline`` is a time.perf_counter() value after which the engine should
+return what it has, flagged with 'degraded' and 'completed_stages'. Engines
+may also provide ``iter_analysis`` with the same arguments, yielding results
+as they are computed (see AdvancedResumeAnalyzer.iter_analysis), and
+``prepare_job(job_description)``, whose JSON result is stored with a job
+description and passed back as ``calculate_match_score(...,
+prepared_job=...)`` so the job side is not recomputed per match, with
+``is_prepared_current(prepared_job)`` telling when a stored result is out
+of date and should be recomputed and stored again, and ``version``, a string stored with each analysis that changes whenever the
+engine would analyze the same resume differently; it defaults to the
+engine name. Analyses stored under another version are stale and are
+brought up to date by the reanalyze command.
+
+Engines are created once per process and shared between requests, so they
+must be safe to call from several threads at once. The engine for a request
+is chosen, in order, by an explicit name, by the ANALYSIS_ENGINE_CANARY
+traffic split, or by the ANALYSIS_ENGINE default.
+"""
+import importlib
+import random
+import threading
+
+from django.conf import settings
+
+from .taxonomy import current as current_taxonomy
+
+
+class UnknownEngineError(ValueError):
+    """Raised when an engine name is not registered."""
+
+
+class LegacyEngine:
+    """The original exact analyzer and matcher."""
+
+    name = 'legacy'
+
+    def __init__(self, section_cache=None, match_cache=None):
+        """
+        Args:
+            section_cache: Optional cache of preprocessed resume sections
+                shared across analyses (see api.ai.sections).
+            match_cache: Optional MatchCache of match results (see
+                api.ai.match_cache).
+        """
+        from .job_matcher import JobMatcher
+        from .resume_analyzer import AdvancedResumeAnalyzer
+
+        self.analyzer = AdvancedResumeAnalyzer()
+        self.job_matcher = JobMatcher()
+        self.section_cache = section_cache
+        self.match_cache = match_cache
+
+    section_scoring = False
+
+    @property
+    def version(self):
+        from .resume_analyzer import ANALYZER_VERSION
+
+        return f"{self.name}:{ANALYZER_VERSION}:{current_taxonomy().version}"
+
+    def analyze_resume(self, resume_text, sections=None, fields=None, deadline=None):
+        return self.analyzer.analyze_resume(
+            resume_text,
+            section_cache=self.section_cache,
+            sections=sections,
+            section_scoring=self.section_scoring,
+            fields=fields,
+            deadline=deadline,
+        )
+
+    def iter_analysis(self, resume_text, sections=None, fields=None, deadline=None):
+        return self.analyzer.iter_analysis(
+            resume_text,
+            section_cache=self.section_cache,
+            sections=sections,
+            section_scoring=self.section_scoring,
+            fields=fields,
+            deadline=deadline,
+        )
+
+    def prepare_job(self, job_description):
+        return self.job_matcher.prepare_job(job_description)
+
+    def is_prepared_current(self, prepared_job):
+        return self.job_matcher.is_prepared_current(prepared_job)
+
+    def calculate_match_score(self, resume_text, job_description, prepared_job=None):
+        # One snapshot for the match and its cache key
+        taxonomy = current_taxonomy()
+
+        def compute():
+            return self.job_matcher.calculate_match_score(
+                resume_text, job_description, prepared_job=prepared_job, taxonomy=taxonomy
+            )
+
+        if self.match_cache is None:
+            return compute()
+        return self.match_cache.get_or_compute(resume_text, job_description, compute, taxonomy.version)
+
+    def generate_improvement_suggestions(self, match_result):
+        return self.job_matcher.generate_improvement_suggestions(match_result)
+
+
+class SectionedEngine(LegacyEngine):
+    """
+    Scores each category on its relevant resume sections, such as skills
+    for technical_skills, falling back to the whole resume when a section
+    is missing.
+    """
+
+    name = 'sectioned'
+    section_scoring = True
+
+
+class SeededRoleClassifier:
+    """
+    Role classifier trained from the role keywords of the analyzer's
+    taxonomy, retrained once for each new taxonomy version.
+    """
+
+    def __init__(self, analyzer):
+        self.analyzer = analyzer
+
+    def predict(self, preprocessed_text, k=1):
+        from .role_classifier import RoleClassifier, seed_documents
+
+        taxonomy = self.analyzer.taxonomy
+        classifier = taxonomy.derive(
+            'role_classifier', lambda: RoleClassifier.train(seed_documents(self.analyzer, taxonomy))
+        )
+        return classifier.predict(preprocessed_text, k=k)
+
+
+class CentroidEngine(LegacyEngine):
+    """
+    Identifies the job role with a nearest-centroid classifier (see
+    api.ai.role_classifier), loaded from ROLE_CLASSIFIER_PATH or, when no
+    artifact is configured, trained from the taxonomy's role keywords. Its
+    job_role_confidence is the classifier's calibrated confidence rather
+    than a cosine similarity.
+    """
+
+    name = 'centroid'
+
+    def __init__(self, section_cache=None, match_cache=None):
+        super().__init__(section_cache=section_cache, match_cache=match_cache)
+        from .role_classifier import RoleClassifier
+
+        path = settings.ROLE_CLASSIFIER_PATH
+        if path:
+            self.analyzer.role_classifier = RoleClassifier.load(path)
+        else:
+            self.analyzer.role_classifier = SeededRoleClassifier(self.analyzer)
+
+
+_factories = {}
+_instances = {}
+_lock = threading.Lock()
+
+
+def register(name, factory):
+    """
+    Register an engine factory under a name.
+
+    Args:
+        name: The name used in settings and requests.
+        factory: A class or zero-argument callable returning an engine.
+    """
+    with _lock:
+        _factories[name] = factory
+        _instances.pop(name, None)
+
+
+def import_factory(path):
+    """
+    Import an engine factory from 'package.module.Name' or 'package.module:Name'.
+    """
+    module_path, _, attribute = path.replace(':', '.').rpartition('.')
+    if not module_path:
+        raise ValueError(f"Engine path '{path}' must include a module")
+    return getattr(importlib.import_module(module_path), attribute)
+
+
+def _load_configured():
+    # Engines registered through settings, as name -> dotted path
+    for name, path in getattr(settings, 'ANALYSIS_ENGINES', {}).items():
+        if name not in _factories:
+            _factories[name] = import_factory(path)
+
+
+def available():
+    """Get the names of all registered engines."""
+    with _lock:
+        _load_configured()
+        return sorted(_factories)
+
+
+def get_engine(name):
+    """
+    Get the shared instance of an engine, creating it on first use.
+
+    Raises:
+        UnknownEngineError: If no engine is registered under the name.
+    """
+    engine = _instances.get(name)
+    if engine is not None:
+        return engine
+
+    with _lock:
+        _load_configured()
+        if name not in _instances:
+            if name not in _factories:
+                raise UnknownEngineError(f"Unknown analysis engine '{name}'")
+            engine = _factories[name]()
+            engine.name = name
+            _instances[name] = engine
+        return _instances[name]
+
+
+def create_engine(name, cached=True):
+    """
+    Create a new engine instance that is not shared.
+
+    Args:
+        name: The registered engine name.
+        cached: False creates a built-in engine without its database-backed
+            section and match caches, for work that runs without a database.
+
+    Raises:
+        UnknownEngineError: If no engine is registered under the name.
+    """
+    with _lock:
+        _load_configured()
+        factory = _factories.get(name)
+    if factory is None:
+        raise UnknownEngineError(f"Unknown analysis engine '{name}'")
+    if not cached:
+        factory = getattr(factory, 'engine_class', factory)
+    engine = factory()
+    engine.name = name
+    return engine
+
+
+def select_engine(requested=None):
+    """
+    Choose the engine for one request.
+
+    Args:
+        requested: An explicit engine name, e.g. from the request, or None.
+
+    Returns:
+        The engine instance.
+    """
+    if requested:
+        return get_engine(requested)
+
+    # Canary split: each listed engine takes its fraction of the traffic
+    roll = random.random()
+    for name, fraction in getattr(settings, 'ANALYSIS_ENGINE_CANARY', {}).items():
+        if roll < fraction:
+            return get_engine(name)
+        roll -= fraction
+
+    return get_engine(settings.ANALYSIS_ENGINE)
+
+
+def reset():
+    """Drop the shared engine instances, e.g. after changing settings in tests."""
+    with _lock:
+        _instances.clear()
+
+
+def _with_caches(engine_class):
+    def factory():
+        section_cache = None
+        if settings.ANALYSIS_SECTION_CACHE_ENABLED:
+            from ..adapters.repositories import SectionCacheRepository
+            from ..models import AnalysisSection
+
+            section_cache = SectionCacheRepository(
+                AnalysisSection, retention_days=settings.ANALYSIS_SECTION_CACHE_RETENTION_DAYS
+            )
+
+        match_cache = None
+        if settings.ANALYSIS_MATCH_CACHE_ENABLED:
+            from ..adapters.repositories import MatchCacheRepository
+            from ..models import MatchResult
+            from .match_cache import MatchCache, MemoryMatchCache
+
+            retention_days = settings.ANALYSIS_MATCH_CACHE_RETENTION_DAYS
+            match_cache = MatchCache(
+                memory=MemoryMatchCache(
+                    max_entries=settings.ANALYSIS_MATCH_CACHE_MEMORY_ENTRIES,
+                    max_age_seconds=retention_days * 24 * 60 * 60
+                ),
+                persistent=MatchCacheRepository(
+                    MatchResult,
+                    max_entries=settings.ANALYSIS_MATCH_CACHE_DB_ENTRIES,
+                    retention_days=retention_days
+                )
+            )
+        return engine_class(section_cache=section_cache, match_cache=match_cache)
+    factory.engine_class = engine_class
+    return factory
+
+
+register('legacy', _with_caches(LegacyEngine))
+register('sectioned', _with_caches(SectionedEngine))
+register('centroid', _with_caches(CentroidEngine))
@@ -6,10 +6,18 @@ import nltk
 from nltk.tokenize import word_tokenize
 from nltk.corpus import stopwords
 from nltk.stem import WordNetLemmatizer
+from sklearn.base import clone
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.metrics.pairwise import cosine_similarity
 import numpy as np
 
+from ..observability.timing import span
+from .taxonomy import current as current_taxonomy
+
+# Bump when preprocessing, skill extraction or scoring changes, so stored
+# job representations are recomputed
+MATCHER_VERSION = 1
+
 class JobMatcher:
     """Job description matcher for resume analysis."""
 
@@ -18,30 +26,11 @@ class JobMatcher:
         self.stopwords = set(stopwords.words('english'))
         self.lemmatizer = WordNetLemmatizer()
         self.vectorizer = TfidfVectorizer(stop_words='english')
-        
-        # Skills categories for matching
-        self.skill_categories = {
-            'technical': [
-                'programming', 'coding', 'software', 'development', 'engineering', 
-                'python', 'java', 'javascript', 'typescript', 'c++', 'c#', 'ruby', 'go',
-                'react', 'angular', 'vue', 'node', 'django', 'flask', 'spring', 
-                'database', 'sql', 'mysql', 'postgresql', 'mongodb', 'nosql',
-                'aws', 'azure', 'cloud', 'docker', 'kubernetes', 'devops',
-                'git', 'github', 'gitlab', 'ci/cd', 'jenkins', 'testing'
-            ],
-            'soft': [
-                'communication', 'teamwork', 'leadership', 'problem-solving', 
-                'critical thinking', 'time management', 'organization', 'adaptability',
-                'creativity', 'collaboration', 'interpersonal', 'presentation',
-                'negotiation', 'conflict resolution', 'decision making', 'flexibility'
-            ],
-            'domain': [
-                'finance', 'healthcare', 'education', 'retail', 'manufacturing',
-                'marketing', 'sales', 'customer service', 'human resources', 'operations',
-                'project management', 'product management', 'data analysis', 'research',
-                'consulting', 'legal', 'compliance', 'security', 'quality assurance'
-            ]
-        }
+
+    @property
+    def skill_categories(self):
+        """Skill category -> skills, from the taxonomy in use (see api.ai.taxonomy)."""
+        return current_taxonomy().skill_categories
 
     def preprocess_text(self, text):
         """
@@ -53,21 +42,22 @@ class JobMatcher:
         Returns:
             Preprocessed text.
         """
-        # Convert to lowercase
-        text = text.lower()
-        
-        # Remove special characters and numbers
-        text = re.sub(r'[^a-zA-Z\s]', '', text)
-        
-        # Tokenize
-        tokens = word_tokenize(text)
-        
-        # Remove stopwords and lemmatize
-        tokens = [self.lemmatizer.lemmatize(token) for token in tokens if token not in self.stopwords]
-        
-        # Join tokens back into text
-        preprocessed_text = ' '.join(tokens)
-        
+        with span('job_matcher', 'preprocess'):
+            # Convert to lowercase
+            text = text.lower()
+
+            # Remove special characters and numbers
+            text = re.sub(r'[^a-zA-Z\s]', '', text)
+
+            # Tokenize
+            tokens = word_tokenize(text)
+
+            # Remove stopwords and lemmatize
+            tokens = [self.lemmatizer.lemmatize(token) for token in tokens if token not in self.stopwords]
+
+            # Join tokens back into text
+            preprocessed_text = ' '.join(tokens)
+
         return preprocessed_text
 
     def extract_skills(self, text):
@@ -80,52 +70,84 @@ class JobMatcher:
         Returns:
             Dictionary of categorized skills.
         """
-        preprocessed_text = self.preprocess_text(text)
-        tokens = preprocessed_text.split()
+        return self._categorize_skills(self.preprocess_text(text), current_taxonomy())
+
+    def _categorize_skills(self, preprocessed_text, taxonomy):
+        return taxonomy.categorize(preprocessed_text.split())
+
+    def prepare_job(self, job_description, taxonomy=None):
+        """
+        Compute the job side of a match once, so it can be stored and reused.
         
-        categorized_skills = {
-            'technical': [],
-            'soft': [],
-            'domain': []
+        Args:
+            job_description: The text content of the job description.
+            taxonomy: Optional Taxonomy snapshot to extract skills with;
+                defaults to the one in use.
+            
+        Returns:
+            JSON-serializable dictionary with the preprocessed text, the
+            extracted skills, and the MATCHER_VERSION and taxonomy version
+            they were computed with.
+        """
+        taxonomy = taxonomy or current_taxonomy()
+        preprocessed_job = self.preprocess_text(job_description)
+        return {
+            'version': MATCHER_VERSION,
+            'taxonomy_version': taxonomy.version,
+            'preprocessed': preprocessed_job,
+            'skills': self._categorize_skills(preprocessed_job, taxonomy)
         }
-        
-        for token in tokens:
-            for category, skills in self.skill_categories.items():
-                if token in skills:
-                    if token not in categorized_skills[category]:
-                        categorized_skills[category].append(token)
-        
-        return categorized_skills
 
-    def calculate_match_score(self, resume_text, job_description):
+    def is_prepared_current(self, prepared_job, taxonomy=None):
+        """
+        Check whether a prepare_job() result was computed with this
+        MATCHER_VERSION and the taxonomy version in use.
+        """
+        taxonomy = taxonomy or current_taxonomy()
+        return (prepared_job.get('version') == MATCHER_VERSION
+                and prepared_job.get('taxonomy_version') == taxonomy.version)
+
+    def calculate_match_score(self, resume_text, job_description, prepared_job=None, taxonomy=None):
         """
         Calculate the match score between a resume and job description.
         
         Args:
             resume_text: The text content of the resume.
             job_description: The text content of the job description.
+            prepared_job: Optional result of prepare_job(job_description);
+                recomputed when missing or from another MATCHER_VERSION or
+                taxonomy version.
+            taxonomy: Optional Taxonomy snapshot to match with; defaults to
+                the one in use.
             
         Returns:
             Dictionary with match scores and details.
         """
+        taxonomy = taxonomy or current_taxonomy()
+
         # Preprocess texts
+        if prepared_job is None or not self.is_prepared_current(prepared_job, taxonomy):
+            prepared_job = self.prepare_job(job_description, taxonomy)
         preprocessed_resume = self.preprocess_text(resume_text)
-        preprocessed_job = self.preprocess_text(job_description)
+        preprocessed_job = prepared_job['preprocessed']
         
         # Calculate overall similarity
-        documents = [preprocessed_resume, preprocessed_job]
-        tfidf_matrix = self.vectorizer.fit_transform(documents)
-        overall_similarity = cosine_similarity(tfidf_matrix[0:1], tfidf_matrix[1:2])[0][0]
+        with span('job_matcher', 'vectorize'):
+            documents = [preprocessed_resume, preprocessed_job]
+            # Fit a fresh copy so one instance can serve concurrent requests
+            tfidf_matrix = clone(self.vectorizer).fit_transform(documents)
+            overall_similarity = cosine_similarity(tfidf_matrix[0:1], tfidf_matrix[1:2])[0][0]
         
         # Extract skills
-        resume_skills = self.extract_skills(resume_text)
-        job_skills = self.extract_skills(job_description)
+        with span('job_matcher', 'skill_extraction'):
+            resume_skills = self._categorize_skills(preprocessed_resume, taxonomy)
+            job_skills = prepared_job['skills']
         
         # Calculate skill match scores
         skill_match_scores = {}
         missing_skills = {}
         
-        for category in self.skill_categories.keys():
+        for category in taxonomy.skill_categories.keys():
             resume_category_skills = set(resume_skills[category])
             job_category_skills = set(job_skills[category])
             
@@ -160,7 +182,7 @@ class JobMatcher:
             'missing_skills': missing_skills,
             'matched_skills': {
                 category: list(set(resume_skills[category]).intersection(set(job_skills[category])))
-                for category in self.skill_categories.keys()
+                for category in taxonomy.skill_categories.keys()
             }
         }
         
@@ -0,0 +1,117 @@
+"""
+Cache of resume/job match results.
+
+A match result depends only on the resume text, the job description text,
+the matcher and the skill taxonomy, so results are stored under the
+content hashes of both texts, the MATCHER_VERSION and the taxonomy version
+(see api.ai.taxonomy). Editing either side, changing the matcher or
+publishing a taxonomy produces a new key; the entries left behind age out.
+
+Lookups go to a bounded in-process LRU first and then to an optional
+persistent tier shared by all workers, such as the database-backed
+MatchCacheRepository. Results found in the persistent tier are promoted
+to the in-process one.
+"""
+import copy
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from ..observability.metrics import REGISTRY
+from .job_matcher import MATCHER_VERSION
+
+MATCH_CACHE_LOOKUPS = REGISTRY.counter(
+    'resume_analyzer_match_cache_lookups',
+    'Match results looked up in the match cache, by tier and result.',
+    labelnames=('tier', 'result'),
+)
+
+
+def content_hash(text):
+    """Content address of one side of a match."""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+class MemoryMatchCache:
+    """A bounded in-process LRU cache of match results with an age limit."""
+
+    def __init__(self, max_entries=1024, max_age_seconds=None):
+        self.max_entries = max_entries
+        self.max_age_seconds = max_age_seconds
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            stored_at, result = entry
+            if self.max_age_seconds is not None and time.monotonic() - stored_at > self.max_age_seconds:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+        # Callers add to the results they get, so hand out copies
+        return copy.deepcopy(result)
+
+    def set(self, key, result):
+        result = copy.deepcopy(result)
+        with self._lock:
+            self._entries[key] = (time.monotonic(), result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+class MatchCache:
+    """Two-tier cache of match results."""
+
+    def __init__(self, memory=None, persistent=None):
+        """
+        Args:
+            memory: Optional MemoryMatchCache, checked first.
+            persistent: Optional object with get(resume_hash, job_hash,
+                matcher_version, taxonomy_version) and set(resume_hash,
+                job_hash, matcher_version, taxonomy_version, result), e.g.
+                MatchCacheRepository.
+        """
+        self.memory = memory
+        self.persistent = persistent
+
+    def get_or_compute(self, resume_text, job_description, compute, taxonomy_version):
+        """
+        Get the cached match of a resume and job description, computing and
+        storing it on a miss.
+
+        Args:
+            resume_text: The text content of the resume.
+            job_description: The text content of the job description.
+            compute: Zero-argument callable returning the match result.
+            taxonomy_version: Version of the taxonomy compute matches with.
+
+        Returns:
+            The match result, which the caller may modify.
+        """
+        key = (content_hash(resume_text), content_hash(job_description), MATCHER_VERSION, taxonomy_version)
+
+        if self.memory is not None:
+            result = self.memory.get(key)
+            MATCH_CACHE_LOOKUPS.inc(('memory', 'miss' if result is None else 'hit'))
+            if result is not None:
+                return result
+
+        if self.persistent is not None:
+            result = self.persistent.get(*key)
+            MATCH_CACHE_LOOKUPS.inc(('persistent', 'miss' if result is None else 'hit'))
+            if result is not None:
+                if self.memory is not None:
+                    self.memory.set(key, result)
+                return result
+
+        result = compute()
+        if self.persistent is not None:
+            self.persistent.set(*key, result)
+        if self.memory is not None:
+            self.memory.set(key, result)
+        return result
@@ -1,21 +1,68 @@
 """
 Advanced resume analyzer using NLP and machine learning.
 """
+import contextvars
 import re
 import nltk
 from nltk.tokenize import word_tokenize, sent_tokenize
 from nltk.corpus import stopwords
 from nltk.stem import WordNetLemmatizer
+from sklearn.base import clone
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.metrics.pairwise import cosine_similarity
 import pandas as pd
 import random
+from time import perf_counter
+
+from ..observability.timing import span
+from .sections import category_sections, join_preprocessed, preprocess_sections, segment
+from .taxonomy import current as current_taxonomy
 
 # Download required NLTK data
 nltk.download('punkt', quiet=True)
 nltk.download('stopwords', quiet=True)
 nltk.download('wordnet', quiet=True)
 
+# Preprocessed texts of the analysis running in the current context; the
+# pipeline preprocesses the same resume and descriptions many times over
+_preprocess_memo = contextvars.ContextVar('preprocess_memo', default=None)
+# Keyword rankings and job roles computed by the current analysis, by text
+_result_memo = contextvars.ContextVar('result_memo', default=None)
+# Taxonomy snapshot of the analysis running in the current context
+_taxonomy = contextvars.ContextVar('taxonomy', default=None)
+
+# Bump when scores or feedback change for the same resume and taxonomy, so
+# stored analyses are flagged stale (see LegacyEngine.version)
+ANALYZER_VERSION = 1
+
+# Outputs of analyze_resume
+ANALYSIS_FIELDS = (
+    'score', 'category_scores', 'feedback', 'improvement_suggestions',
+    'key_strengths', 'job_role', 'job_role_confidence', 'keywords',
+)
+
+# Analysis stages in priority order, with the outputs each one serves. Under
+# a deadline the first stage always runs and later ones are skipped once the
+# deadline has passed.
+ANALYSIS_STAGES = (
+    ('category_scores', {'score', 'category_scores', 'feedback', 'improvement_suggestions', 'key_strengths'}),
+    ('improvement_suggestions', {'improvement_suggestions'}),
+    ('job_role', {'job_role', 'job_role_confidence'}),
+    ('feedback', {'feedback'}),
+    ('key_strengths', {'key_strengths'}),
+    ('keywords', {'keywords'}),
+)
+
+
+def _memoized(kind, text, compute):
+    memo = _result_memo.get()
+    if memo is None:
+        return compute()
+    key = (kind, text)
+    if key not in memo:
+        memo[key] = compute()
+    return memo[key]
+
 
 class AdvancedResumeAnalyzer:
     """Advanced resume analyzer using NLP and machine learning."""
@@ -26,127 +73,6 @@ class AdvancedResumeAnalyzer:
         self.lemmatizer = WordNetLemmatizer()
         self.vectorizer = TfidfVectorizer(stop_words='english')
         
-        # Job descriptions for different categories
-        self.job_descriptions = {
-            'technical_skills': """
-                Programming Languages: Python Java JavaScript TypeScript C++ C# PHP Ruby Go Rust Swift Kotlin
-                Web Development: HTML CSS React Angular Vue.js Node.js Express.js Django Flask Spring Boot
-                Data Science: Machine Learning Deep Learning TensorFlow PyTorch scikit-learn Pandas NumPy
-                Database: SQL MySQL PostgreSQL MongoDB Redis Cassandra Oracle
-                Cloud: AWS Azure Google Cloud Kubernetes Docker Terraform
-                DevOps: CI/CD Jenkins GitHub Actions Travis CI CircleCI
-                Mobile: iOS Android React Native Flutter
-                Tools: Git GitHub GitLab Jira Confluence Slack
-            """,
-            'education': """
-                Degree Bachelor Master PhD MBA Associate Diploma Certificate
-                University College School Institute Academy
-                GPA Academic Honors Dean's List Cum Laude Magna Cum Laude Summa Cum Laude
-                Scholarship Fellowship Grant Award
-                Major Minor Concentration Specialization
-                Coursework Projects Research Thesis Dissertation
-                Graduated Completed Earned Received
-            """,
-            'experience': """
-                Years Experience Professional Career Job Work Position Role
-                Responsibility Duties Tasks Achievements Accomplishments Results
-                Team Lead Manage Supervise Coordinate Collaborate
-                Project Develop Implement Design Create Build Maintain
-                Improve Enhance Optimize Streamline Increase Decrease
-                Client Customer Stakeholder User
-                Business Strategy Objective Goal Target Metric
-                Problem Solution Challenge Opportunity Initiative
-            """,
-            'achievements': """
-                Achievement Award Recognition Accomplishment Success
-                Improved Increased Decreased Reduced Enhanced Optimized
-                Saved Generated Delivered Launched Implemented
-                Led Managed Supervised Coordinated Collaborated
-                Exceeded Target Goal Objective Metric KPI
-                Innovation Creative Solution Approach Method
-                Impact Result Outcome Effect Benefit Value
-                Recognized Awarded Honored Commended Praised
-            """,
-            'formatting': """
-                Format Layout Structure Organization Design
-                Clear Concise Consistent Professional Readable
-                Bullet Points Sections Headings Subheadings
-                Font Size Spacing Margin Alignment
-                Resume CV Curriculum Vitae
-                One Page Two Page Length
-                Contact Information Header Footer
-                Summary Profile Objective Statement
-                Keywords ATS Applicant Tracking System
-            """
-        }
-        
-        # Keywords for different job roles
-        self.job_role_keywords = {
-            'software_engineer': """
-                Software Engineer Developer Programmer Coder Full-stack Backend Frontend
-                Python Java JavaScript TypeScript C++ C# PHP Ruby Go
-                React Angular Vue.js Node.js Express.js Django Flask Spring Boot
-                Git GitHub GitLab Version Control
-                Agile Scrum Kanban Jira
-                API REST GraphQL Microservices
-                Testing Unit Integration Automated
-                Database SQL NoSQL MySQL PostgreSQL MongoDB
-                Cloud AWS Azure Google Cloud
-                DevOps CI/CD Docker Kubernetes
-            """,
-            'data_scientist': """
-                Data Scientist Analyst Machine Learning Engineer AI
-                Python R SQL
-                Machine Learning Deep Learning Neural Networks
-                TensorFlow PyTorch Keras scikit-learn
-                Data Analysis Data Visualization Data Mining
-                Statistics Probability Regression Classification Clustering
-                Pandas NumPy SciPy Matplotlib Seaborn
-                Big Data Hadoop Spark
-                A/B Testing Hypothesis Testing
-                NLP Computer Vision Time Series
-            """,
-            'product_manager': """
-                Product Manager Product Owner
-                Product Development Product Strategy Product Roadmap
-                User Experience UX UI Design
-                Market Research Competitive Analysis
-                Customer Feedback User Testing
-                Agile Scrum Kanban
-                Stakeholder Management
-                Business Requirements Technical Requirements
-                KPIs Metrics Analytics
-                Go-to-market Launch Strategy
-                Cross-functional Teams
-                Prioritization Backlog Management
-            """,
-            'marketing': """
-                Marketing Digital Marketing Content Marketing Social Media Marketing
-                SEO SEM PPC Google Ads Facebook Ads
-                Content Strategy Content Creation
-                Social Media Management
-                Email Marketing Campaigns
-                Analytics Google Analytics
-                CRM Customer Relationship Management
-                Brand Management Brand Strategy
-                Market Research Competitive Analysis
-                Lead Generation Conversion Rate Optimization
-                Marketing Automation
-            """,
-            'finance': """
-                Finance Financial Accounting Accountant
-                Financial Analysis Financial Reporting Financial Planning
-                Budgeting Forecasting Modeling
-                Excel VBA PowerPoint
-                Profit Loss Balance Sheet Cash Flow
-                Audit Tax Compliance
-                Risk Management
-                Investment Banking Valuation
-                CPA CFA MBA
-                SAP Oracle Quickbooks
-            """
-        }
-        
         # Common resume improvement suggestions
         self.improvement_suggestions = [
             "Add measurable achievements with specific metrics",
@@ -171,6 +97,35 @@ class AdvancedResumeAnalyzer:
             "Use reverse chronological order for experience"
         ]
 
+        # Optional RoleClassifier replacing the per-role TF-IDF comparison
+        # in identify_job_role (see api.ai.role_classifier)
+        self.role_classifier = None
+
+        # Preprocess the category descriptions and role keywords up front
+        self._static_preprocessed(current_taxonomy())
+
+    @property
+    def taxonomy(self):
+        """The taxonomy of the running analysis, or else the one in use (see api.ai.taxonomy)."""
+        return _taxonomy.get() or current_taxonomy()
+
+    @property
+    def job_descriptions(self):
+        """Resume category -> the description it is scored against."""
+        return self.taxonomy.category_descriptions
+
+    @property
+    def job_role_keywords(self):
+        """Job role -> its keywords."""
+        return self.taxonomy.job_role_keywords
+
+    def _static_preprocessed(self, taxonomy):
+        # The category descriptions and role keywords only change with the taxonomy
+        def compute():
+            texts = list(taxonomy.category_descriptions.values()) + list(taxonomy.job_role_keywords.values())
+            return {text: self.preprocess_text(text) for text in texts}
+        return taxonomy.derive('preprocessed', compute)
+
     def preprocess_text(self, text):
         """
         Preprocess text by tokenizing, removing stopwords, and lemmatizing.
@@ -181,21 +136,29 @@ class AdvancedResumeAnalyzer:
         Returns:
             Preprocessed text.
         """
-        # Convert to lowercase
-        text = text.lower()
-        
-        # Remove special characters and numbers
-        text = re.sub(r'[^a-zA-Z\s]', '', text)
-        
-        # Tokenize
-        tokens = word_tokenize(text)
-        
-        # Remove stopwords and lemmatize
-        tokens = [self.lemmatizer.lemmatize(token) for token in tokens if token not in self.stopwords]
-        
-        # Join tokens back into text
-        preprocessed_text = ' '.join(tokens)
-        
+        memo = _preprocess_memo.get()
+        if memo is not None and text in memo:
+            return memo[text]
+        original = text
+
+        with span('analyzer', 'preprocess'):
+            # Convert to lowercase
+            text = text.lower()
+
+            # Remove special characters and numbers
+            text = re.sub(r'[^a-zA-Z\s]', '', text)
+
+            # Tokenize
+            tokens = word_tokenize(text)
+
+            # Remove stopwords and lemmatize
+            tokens = [self.lemmatizer.lemmatize(token) for token in tokens if token not in self.stopwords]
+
+            # Join tokens back into text
+            preprocessed_text = ' '.join(tokens)
+
+        if memo is not None:
+            memo[original] = preprocessed_text
         return preprocessed_text
 
     def extract_keywords(self, text, top_n=20):
@@ -209,6 +172,9 @@ class AdvancedResumeAnalyzer:
         Returns:
             List of top keywords.
         """
+        return _memoized('keywords', text, lambda: self._rank_keywords(text))[:top_n]
+
+    def _rank_keywords(self, text):
         # Preprocess text
         preprocessed_text = self.preprocess_text(text)
         
@@ -228,8 +194,8 @@ class AdvancedResumeAnalyzer:
             # Create a dictionary of feature names and scores
             word_scores = {feature_names[i]: tfidf_scores[i] for i in range(len(feature_names))}
             
-            # Sort by score and get top_n
-            top_keywords = sorted(word_scores.items(), key=lambda x: x[1], reverse=True)[:top_n]
+            # Sort by score
+            top_keywords = sorted(word_scores.items(), key=lambda x: x[1], reverse=True)
             
             return [keyword for keyword, score in top_keywords]
         except:
@@ -242,7 +208,7 @@ class AdvancedResumeAnalyzer:
                 else:
                     word_freq[word] = 1
             
-            top_keywords = sorted(word_freq.items(), key=lambda x: x[1], reverse=True)[:top_n]
+            top_keywords = sorted(word_freq.items(), key=lambda x: x[1], reverse=True)
             return [keyword for keyword, freq in top_keywords]
 
     def identify_job_role(self, resume_text):
@@ -255,8 +221,15 @@ class AdvancedResumeAnalyzer:
         Returns:
             The most likely job role and similarity score.
         """
+        return _memoized('job_role', resume_text, lambda: self._rank_job_roles(resume_text))
+
+    def _rank_job_roles(self, resume_text):
         # Preprocess resume text
         preprocessed_resume = self.preprocess_text(resume_text)
+
+        if self.role_classifier is not None:
+            with span('analyzer', 'role_classification'):
+                return self.role_classifier.predict(preprocessed_resume)[0]
         
         # Calculate similarity with each job role
         similarities = {}
@@ -264,12 +237,14 @@ class AdvancedResumeAnalyzer:
         for role, keywords in self.job_role_keywords.items():
             preprocessed_keywords = self.preprocess_text(keywords)
             
-            # Vectorize
-            documents = [preprocessed_resume, preprocessed_keywords]
-            tfidf_matrix = self.vectorizer.fit_transform(documents)
-            
-            # Calculate similarity
-            similarity = cosine_similarity(tfidf_matrix[0:1], tfidf_matrix[1:2])[0][0]
+            with span('analyzer', 'vectorize'):
+                # Vectorize
+                documents = [preprocessed_resume, preprocessed_keywords]
+                # Fit a fresh copy so one instance can serve concurrent requests
+                tfidf_matrix = clone(self.vectorizer).fit_transform(documents)
+
+                # Calculate similarity
+                similarity = cosine_similarity(tfidf_matrix[0:1], tfidf_matrix[1:2])[0][0]
             similarities[role] = similarity
         
         # Get the role with highest similarity
@@ -288,6 +263,25 @@ class AdvancedResumeAnalyzer:
         Returns:
             A tuple of (score, feedback) for the category.
         """
+        score = self.score_category(resume_text, category)
+
+        # Generate feedback
+        with span('analyzer', 'feedback'):
+            feedback = self.generate_feedback(score, category, resume_text)
+
+        return score, feedback
+
+    def score_category(self, resume_text, category):
+        """
+        Score a specific category of the resume, without feedback.
+
+        Args:
+            resume_text: The text content of the resume.
+            category: The category to score.
+
+        Returns:
+            The score from 0-100.
+        """
         # Preprocess resume text
         preprocessed_resume = self.preprocess_text(resume_text)
         
@@ -295,20 +289,17 @@ class AdvancedResumeAnalyzer:
         category_description = self.job_descriptions.get(category, "")
         preprocessed_category = self.preprocess_text(category_description)
         
-        # Vectorize
-        documents = [preprocessed_resume, preprocessed_category]
-        tfidf_matrix = self.vectorizer.fit_transform(documents)
-        
-        # Calculate similarity
-        similarity = cosine_similarity(tfidf_matrix[0:1], tfidf_matrix[1:2])[0][0]
+        with span('analyzer', 'vectorize'):
+            # Vectorize
+            documents = [preprocessed_resume, preprocessed_category]
+            # Fit a fresh copy so one instance can serve concurrent requests
+            tfidf_matrix = clone(self.vectorizer).fit_transform(documents)
+
+            # Calculate similarity
+            similarity = cosine_similarity(tfidf_matrix[0:1], tfidf_matrix[1:2])[0][0]
         
         # Convert similarity to a score from 0-100
-        score = min(100, max(0, round(similarity * 100)))
-        
-        # Generate feedback
-        feedback = self.generate_feedback(score, category, resume_text)
-        
-        return score, feedback
+        return min(100, max(0, round(similarity * 100)))
 
     def generate_feedback(self, score, category, resume_text):
         """
@@ -459,59 +450,167 @@ class AdvancedResumeAnalyzer:
         unique_strengths = list(set(strengths))
         return unique_strengths[:5]
 
-    def analyze_resume(self, resume_text):
+    def analyze_resume(self, resume_text, section_cache=None, sections=None, section_scoring=False,
+                       fields=None, deadline=None):
         """
         Perform comprehensive analysis of a resume.
         
         Args:
             resume_text: The text content of the resume.
+            section_cache: Optional cache of preprocessed resume sections
+                (see api.ai.sections), so re-analyzing an edited resume only
+                preprocesses the sections that changed.
+            sections: Section offsets from api.ai.sections.segment, if
+                already known for this resume.
+            section_scoring: Score each category on its relevant sections
+                instead of the whole resume.
+            fields: Optional subset of ANALYSIS_FIELDS to compute. Only the
+                stages those outputs depend on are run; None computes all.
+            deadline: Optional time.perf_counter() value after which no
+                further stages are started (see ANALYSIS_STAGES).
             
         Returns:
-            Dictionary containing analysis results.
+            Dictionary containing analysis results, limited to fields. With a
+            deadline it also holds 'completed_stages' and 'degraded', which
+            is True when a requested stage was skipped.
         """
-        # Analyze each category
-        category_scores = {}
-        feedback = {}
-        
-        for category in self.job_descriptions.keys():
-            score, category_feedback = self.analyze_category(resume_text, category)
-            category_scores[category] = score
-            feedback[category] = category_feedback
-        
-        # Calculate overall score (weighted average)
-        weights = {
-            'technical_skills': 0.3,
-            'education': 0.2,
-            'experience': 0.3,
-            'achievements': 0.1,
-            'formatting': 0.1
-        }
-        
-        overall_score = sum(category_scores[cat] * weights[cat] for cat in weights)
-        overall_score = round(overall_score)
-        
-        # Get improvement suggestions
-        improvement_suggestions = self.get_improvement_suggestions(resume_text, category_scores)
-        
-        # Identify key strengths
-        key_strengths = self.identify_key_strengths(resume_text, category_scores)
-        
-        # Identify likely job role
-        job_role, confidence = self.identify_job_role(resume_text)
-        
-        # Extract keywords
-        keywords = self.extract_keywords(resume_text, top_n=20)
-        
-        # Compile results
-        results = {
-            'score': overall_score,
-            'category_scores': category_scores,
-            'feedback': feedback,
-            'improvement_suggestions': improvement_suggestions,
-            'key_strengths': key_strengths,
-            'job_role': job_role.replace('_', ' ').title(),
-            'job_role_confidence': round(confidence * 100),
-            'keywords': keywords
-        }
-        
+        results = {}
+        for event, data in self.iter_analysis(
+            resume_text, section_cache=section_cache, sections=sections,
+            section_scoring=section_scoring, fields=fields, deadline=deadline,
+        ):
+            if event == 'stage':
+                results.update(data['results'])
+            elif event == 'done' and deadline is not None:
+                results.update(data)
         return results
+
+    def iter_analysis(self, resume_text, section_cache=None, sections=None, section_scoring=False,
+                      fields=None, deadline=None):
+        """
+        Analyze a resume stage by stage, yielding results as they are ready.
+
+        Takes the same arguments as analyze_resume. The analysis runs in its
+        own context, so the consumer can do other work between events, and
+        closing the generator stops the analysis.
+
+        Yields:
+            (event, data) tuples:
+            ('category_score', {'category', 'score'}) as each category is scored,
+            ('stage', {'stage', 'results'}) as each stage of ANALYSIS_STAGES
+            completes, with the outputs it produced, and finally
+            ('done', {'completed_stages', 'degraded'}).
+        """
+        fields = set(ANALYSIS_FIELDS if fields is None else fields)
+        unknown = fields - set(ANALYSIS_FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown analysis fields: {', '.join(sorted(unknown))}")
+
+        context = contextvars.copy_context()
+        events = self._iter_analysis(resume_text, section_cache, sections, section_scoring, fields, deadline)
+        try:
+            while True:
+                try:
+                    event = context.run(next, events)
+                except StopIteration:
+                    return
+                yield event
+        finally:
+            context.run(events.close)
+
+    def _iter_analysis(self, resume_text, section_cache, sections, section_scoring, fields, deadline):
+        if sections is None:
+            with span('analyzer', 'segment'):
+                sections = segment(resume_text)
+
+        # Hot-swapping the taxonomy does not affect analyses already running
+        taxonomy = current_taxonomy()
+        taxonomy_token = _taxonomy.set(taxonomy)
+        memo = dict(self._static_preprocessed(taxonomy))
+        token = _preprocess_memo.set(memo)
+        result_token = _result_memo.set({})
+        try:
+            parts = preprocess_sections(resume_text, self.preprocess_text, section_cache, sections)
+            memo[resume_text] = join_preprocessed(preprocessed for _, preprocessed in parts)
+
+            # Categories scored on their own sections reuse those sections' preprocessing
+            category_texts = {}
+            if section_scoring:
+                for category in self.job_descriptions:
+                    chosen = category_sections(sections, parts, category)
+                    if chosen:
+                        text = ''.join(section_text for section_text, _ in chosen)
+                        memo[text] = join_preprocessed(preprocessed for _, preprocessed in chosen)
+                        category_texts[category] = text
+
+            yield from self._iter_stages(resume_text, category_texts, fields, deadline)
+        finally:
+            _result_memo.reset(result_token)
+            _preprocess_memo.reset(token)
+            _taxonomy.reset(taxonomy_token)
+
+    def _iter_stages(self, resume_text, category_texts, fields, deadline):
+        category_scores = {}
+        completed, degraded = [], False
+
+        for stage, outputs in ANALYSIS_STAGES:
+            if not fields & outputs:
+                continue
+            if completed and deadline is not None and perf_counter() >= deadline:
+                degraded = True
+                break
+
+            results = {}
+            if stage == 'category_scores':
+                for category in self.job_descriptions.keys():
+                    with span('analyzer', 'category_scoring'):
+                        text = category_texts.get(category, resume_text)
+                        category_scores[category] = self.score_category(text, category)
+                    yield 'category_score', {'category': category, 'score': category_scores[category]}
+                if 'category_scores' in fields:
+                    results['category_scores'] = category_scores
+
+                if 'score' in fields:
+                    # Calculate overall score (weighted average)
+                    weights = {
+                        'technical_skills': 0.3,
+                        'education': 0.2,
+                        'experience': 0.3,
+                        'achievements': 0.1,
+                        'formatting': 0.1
+                    }
+
+                    overall_score = sum(category_scores[cat] * weights[cat] for cat in weights)
+                    results['score'] = round(overall_score)
+
+            elif stage == 'improvement_suggestions':
+                with span('analyzer', 'improvement_suggestions'):
+                    results['improvement_suggestions'] = self.get_improvement_suggestions(resume_text, category_scores)
+
+            elif stage == 'job_role':
+                with span('analyzer', 'role_identification'):
+                    role, confidence = self.identify_job_role(resume_text)
+                if 'job_role' in fields:
+                    results['job_role'] = role.replace('_', ' ').title()
+                if 'job_role_confidence' in fields:
+                    results['job_role_confidence'] = round(confidence * 100)
+
+            elif stage == 'feedback':
+                with span('analyzer', 'feedback'):
+                    results['feedback'] = {
+                        category: self.generate_feedback(score, category, category_texts.get(category, resume_text))
+                        for category, score in category_scores.items()
+                    }
+
+            elif stage == 'key_strengths':
+                with span('analyzer', 'key_strengths'):
+                    results['key_strengths'] = self.identify_key_strengths(resume_text, category_scores)
+
+            elif stage == 'keywords':
+                with span('analyzer', 'keyword_extraction'):
+                    results['keywords'] = self.extract_keywords(resume_text, top_n=20)
+
+            completed.append(stage)
+            yield 'stage', {'stage': stage, 'results': results}
+
+        yield 'done', {'completed_stages': completed, 'degraded': degraded}
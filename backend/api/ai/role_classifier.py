@@ -0,0 +1,191 @@
+"""
+Nearest-centroid job role classifier.
+
+Each role is represented by the normalized mean TF-IDF vector (its
+centroid) of its training documents: labeled resumes, the role keyword
+seeds of the taxonomy (see api.ai.taxonomy), or both. Classifying a resume is one
+sparse product of its TF-IDF vector with the centroid matrix, however many
+roles there are, followed by a softmax over the cosine similarities. The
+softmax temperature is calibrated on held-out labeled resumes, so the
+confidence of the top role approximates the probability that it is right.
+
+Models are trained offline with the train_role_classifier command and
+stored as .npz artifacts holding only arrays, so loading one never
+unpickles code.
+"""
+import numpy as np
+from scipy import sparse
+from sklearn.feature_extraction.text import CountVectorizer, TfidfVectorizer
+from sklearn.preprocessing import normalize
+
+# Bump when the artifact layout changes
+ARTIFACT_VERSION = 1
+# Used until the model is calibrated on held-out documents
+DEFAULT_TEMPERATURE = 0.1
+CALIBRATION_TEMPERATURES = np.geomspace(0.01, 1.0, 41)
+
+
+def seed_documents(analyzer, taxonomy=None):
+    """
+    Training documents from the role keyword seeds of the taxonomy.
+
+    Args:
+        analyzer: An AdvancedResumeAnalyzer, to preprocess the seeds.
+        taxonomy: Optional Taxonomy to take the seeds from; defaults to the
+            analyzer's.
+
+    Returns:
+        List of (role, preprocessed text) pairs, one per role.
+    """
+    role_keywords = (taxonomy or analyzer.taxonomy).job_role_keywords
+    return [(role, analyzer.preprocess_text(keywords)) for role, keywords in role_keywords.items()]
+
+
+def _softmax(scores):
+    scores = scores - scores.max(axis=-1, keepdims=True)
+    weights = np.exp(scores)
+    return weights / weights.sum(axis=-1, keepdims=True)
+
+
+class RoleClassifier:
+    """Assigns resumes to the job role with the nearest centroid."""
+
+    def __init__(self, roles, vocabulary, idf, centroids, temperature=DEFAULT_TEMPERATURE):
+        """
+        Args:
+            roles: Role names, one per centroid row.
+            vocabulary: Terms, one per centroid column.
+            idf: Inverse document frequency of each term.
+            centroids: Sparse matrix of normalized role centroids.
+            temperature: Softmax temperature turning similarities into
+                confidences.
+        """
+        self.roles = list(roles)
+        self.vocabulary = list(vocabulary)
+        self.idf = np.asarray(idf, dtype=np.float64)
+        self.centroids = sparse.csr_matrix(centroids)
+        self.temperature = float(temperature)
+        self._counter = CountVectorizer(vocabulary=self.vocabulary)
+
+    @classmethod
+    def train(cls, documents, holdout=None):
+        """
+        Train a classifier.
+
+        Args:
+            documents: Iterable of (role, preprocessed text) pairs.
+            holdout: Optional (role, preprocessed text) pairs, not used for
+                training, to calibrate the temperature on.
+
+        Returns:
+            The trained RoleClassifier.
+        """
+        labels, texts = zip(*documents)
+        vectorizer = TfidfVectorizer(stop_words='english')
+        matrix = vectorizer.fit_transform(texts)
+
+        # Sum each role's document vectors with one sparse product
+        roles = sorted(set(labels))
+        row_of = {role: row for row, role in enumerate(roles)}
+        rows = [row_of[label] for label in labels]
+        membership = sparse.csr_matrix(
+            (np.ones(len(rows)), (rows, np.arange(len(rows)))), shape=(len(roles), len(rows))
+        )
+        centroids = normalize(membership @ matrix)
+
+        classifier = cls(roles, vectorizer.get_feature_names_out(), vectorizer.idf_, centroids)
+        if holdout:
+            classifier.calibrate(holdout)
+        return classifier
+
+    def vectorize(self, preprocessed_texts):
+        """TF-IDF vectors of preprocessed texts over the model's vocabulary."""
+        counts = self._counter.transform(preprocessed_texts)
+        return normalize(sparse.csr_matrix(counts.multiply(self.idf)))
+
+    def similarities(self, preprocessed_texts):
+        """Cosine similarity of each text to each role centroid."""
+        return (self.vectorize(preprocessed_texts) @ self.centroids.T).toarray()
+
+    def predict(self, preprocessed_text, k=1):
+        """
+        Rank the roles for a preprocessed resume.
+
+        Args:
+            preprocessed_text: The resume, preprocessed as for training.
+            k: Number of roles to return.
+
+        Returns:
+            List of up to k (role, confidence) pairs, most likely first.
+        """
+        confidences = _softmax(self.similarities([preprocessed_text])[0] / self.temperature)
+        k = min(k, len(self.roles))
+        top = np.argpartition(-confidences, k - 1)[:k] if k < len(self.roles) else np.arange(k)
+        top = top[np.argsort(-confidences[top], kind='stable')]
+        return [(self.roles[i], float(confidences[i])) for i in top]
+
+    def calibrate(self, documents):
+        """
+        Choose the temperature minimizing the negative log-likelihood of the
+        true roles of labeled documents.
+
+        Args:
+            documents: (role, preprocessed text) pairs; roles the model does
+                not know are ignored.
+
+        Returns:
+            The chosen temperature.
+        """
+        row_of = {role: row for row, role in enumerate(self.roles)}
+        documents = [(role, text) for role, text in documents if role in row_of]
+        if not documents:
+            return self.temperature
+        labels = np.array([row_of[role] for role, _ in documents])
+        similarities = self.similarities([text for _, text in documents])
+
+        def loss(temperature):
+            probabilities = _softmax(similarities / temperature)[np.arange(len(labels)), labels]
+            return -np.log(np.maximum(probabilities, 1e-12)).mean()
+
+        self.temperature = float(min(CALIBRATION_TEMPERATURES, key=loss))
+        return self.temperature
+
+    def save(self, path):
+        """Write the model to an .npz artifact."""
+        np.savez_compressed(
+            path,
+            version=ARTIFACT_VERSION,
+            roles=np.array(self.roles),
+            vocabulary=np.array(self.vocabulary),
+            idf=self.idf,
+            data=self.centroids.data,
+            indices=self.centroids.indices,
+            indptr=self.centroids.indptr,
+            shape=np.array(self.centroids.shape),
+            temperature=self.temperature,
+        )
+
+    @classmethod
+    def load(cls, path):
+        """
+        Read a model written by save().
+
+        Raises:
+            ValueError: If the artifact has another layout version.
+        """
+        with np.load(path, allow_pickle=False) as artifact:
+            if int(artifact['version']) != ARTIFACT_VERSION:
+                raise ValueError(
+                    f"Role classifier artifact {path} has version {int(artifact['version'])}, "
+                    f"expected {ARTIFACT_VERSION}; retrain it with train_role_classifier"
+                )
+            centroids = sparse.csr_matrix(
+                (artifact['data'], artifact['indices'], artifact['indptr']), shape=tuple(artifact['shape'])
+            )
+            return cls(
+                artifact['roles'].tolist(),
+                artifact['vocabulary'].tolist(),
+                artifact['idf'],
+                centroids,
+                float(artifact['temperature']),
+            )
@@ -0,0 +1,181 @@
+"""
+Resume sectioning and per-section preprocessing cache.
+
+A resume is split into sections at heading lines (Skills, Education,
+Experience, ...). Sections always end on a line boundary and concatenate
+back to the original text, and preprocessing works token by token, so the
+preprocessed resume is exactly the preprocessed sections joined together.
+That lets an edited resume reuse the preprocessing of every section that
+did not change.
+"""
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+
+from ..observability.metrics import REGISTRY
+
+# Bump when preprocess_text changes, so cached sections are not reused
+PREPROCESS_VERSION = 1
+
+SECTION_CACHE_LOOKUPS = REGISTRY.counter(
+    'resume_analyzer_section_cache_lookups',
+    'Resume sections looked up in the preprocessing cache, by result.',
+    labelnames=('result',),
+)
+
+SECTION_HEADINGS = {
+    'summary': ('summary', 'profile', 'objective', 'about me', 'professional summary'),
+    'skills': ('skills', 'technical skills', 'core competencies', 'technologies'),
+    'experience': ('experience', 'work experience', 'professional experience', 'employment history'),
+    'education': ('education', 'academic background', 'qualifications'),
+    'projects': ('projects', 'personal projects', 'selected projects'),
+    'achievements': ('achievements', 'awards', 'honors', 'accomplishments'),
+    'certifications': ('certifications', 'licenses', 'certificates'),
+}
+
+# Which sections each scored category reads; categories not listed, such
+# as formatting, are judged on the whole document
+CATEGORY_SECTIONS = {
+    'technical_skills': ('skills', 'certifications'),
+    'education': ('education', 'certifications'),
+    'experience': ('experience', 'projects'),
+    'achievements': ('achievements',),
+}
+
+# One alternation over every heading, so segmentation is a single linear
+# scan of the text. A heading is a line holding only the heading words,
+# optionally followed by a colon.
+_HEADING_PATTERN = re.compile(
+    r'^[ \t]*(?:'
+    + '|'.join(
+        f"(?P<{name}>{'|'.join(re.escape(heading) for heading in headings)})"
+        for name, headings in SECTION_HEADINGS.items()
+    )
+    + r')[ \t]*:?[ \t]*\r?$',
+    re.IGNORECASE | re.MULTILINE,
+)
+
+
+def segment(text):
+    """
+    Find the sections of a resume.
+
+    Args:
+        text: The resume text.
+
+    Returns:
+        List of [name, start, end] offsets covering the whole text, in
+        order. Text before the first heading is named 'header'.
+    """
+    sections = []
+    name, start = 'header', 0
+    for match in _HEADING_PATTERN.finditer(text):
+        if match.start() > start:
+            sections.append([name, start, match.start()])
+        name, start = match.lastgroup, match.start()
+    if start < len(text):
+        sections.append([name, start, len(text)])
+    return sections
+
+
+def split_sections(text, sections=None):
+    """
+    Split a resume into sections at heading lines.
+
+    Args:
+        text: The resume text.
+        sections: Offsets from segment(), if already known.
+
+    Returns:
+        List of (name, text) tuples whose texts concatenate to the input.
+    """
+    if sections is None:
+        sections = segment(text)
+    return [(name, text[start:end]) for name, start, end in sections]
+
+
+def category_sections(sections, items, category):
+    """
+    Pick the items belonging to the sections a category is scored on.
+
+    Args:
+        sections: Offsets from segment().
+        items: One item per section, in the same order, e.g. the result of
+            preprocess_sections().
+        category: The scored category, e.g. 'technical_skills'.
+
+    Returns:
+        The matching items, or an empty list when the category reads the
+        whole document or the resume has none of its sections.
+    """
+    wanted = CATEGORY_SECTIONS.get(category, ())
+    return [item for (name, _, _), item in zip(sections, items) if name in wanted]
+
+
+def fingerprint(section_text):
+    """Content address of a section's preprocessing result."""
+    return hashlib.sha256(f"{PREPROCESS_VERSION}\0{section_text}".encode('utf-8')).hexdigest()
+
+
+class MemorySectionCache:
+    """A bounded in-process LRU cache of preprocessed sections."""
+
+    def __init__(self, max_entries=4096):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_many(self, fingerprints):
+        found = {}
+        with self._lock:
+            for key in fingerprints:
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                    found[key] = self._entries[key]
+        return found
+
+    def set_many(self, entries):
+        with self._lock:
+            self._entries.update(entries)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+def preprocess_sections(text, preprocess, cache=None, sections=None):
+    """
+    Preprocess a resume section by section, reusing cached sections.
+
+    Args:
+        text: The resume text.
+        preprocess: Function preprocessing one piece of text.
+        cache: Optional object with get_many(fingerprints) and
+            set_many({fingerprint: preprocessed}), e.g. MemorySectionCache
+            or the database-backed SectionCacheRepository.
+        sections: Offsets from segment(), if already known.
+
+    Returns:
+        List of (section text, preprocessed text) in document order. Joining
+        the non-empty preprocessed texts with spaces gives exactly
+        preprocess(text).
+    """
+    parts = [(fingerprint(section_text), section_text) for _, section_text in split_sections(text, sections)]
+    cached = cache.get_many([key for key, _ in parts]) if cache is not None else {}
+
+    computed = {}
+    for key, section_text in parts:
+        if key not in cached and key not in computed:
+            computed[key] = preprocess(section_text)
+
+    if cache is not None:
+        SECTION_CACHE_LOOKUPS.inc(('hit',), len(parts) - len(computed))
+        SECTION_CACHE_LOOKUPS.inc(('miss',), len(computed))
+        if computed:
+            cache.set_many(computed)
+
+    return [(section_text, cached.get(key, computed.get(key))) for key, section_text in parts]
+
+
+def join_preprocessed(parts):
+    """Join preprocessed texts as preprocessing the whole text would."""
+    return ' '.join(part for part in parts if part)
@@ -0,0 +1,259 @@
+"""
+Versioned skill and role taxonomy.
+
+The skills JobMatcher looks for, the category descriptions resumes are
+scored against and the job roles AdvancedResumeAnalyzer recognizes are
+read from a JSON taxonomy file (TAXONOMY_PATH, by default the
+taxonomy.json next to this module)::
+
+    {
+        "version": 2,
+        "skills": {"technical": [...], "soft": [...], "domain": [...]},
+        "categories": {"technical_skills": "...", "education": "...", ...},
+        "roles": {"software_engineer": "...", ...}
+    }
+
+Each process compiles the file once into a read-only Taxonomy holding the
+lookup structures the engines need, and checks it for a new version at
+most every TAXONOMY_CHECK_SECONDS. A new version is compiled while the old
+one keeps serving, then swapped in with one reference assignment:
+analyses that already started finish on the snapshot they took, and a
+version that fails to compile is logged and ignored. The version number
+keys everything derived from the taxonomy (stored job preparations, cached
+matches), so a changed file must come with a new version; publish_taxonomy
+validates a file and replaces the published one atomically.
+"""
+import json
+import logging
+import os
+import threading
+import time
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'taxonomy.json')
+
+# The matcher weights these skill categories and the analyzer these resume
+# categories, so a taxonomy must define exactly them
+SKILL_CATEGORIES = ('technical', 'soft', 'domain')
+RESUME_CATEGORIES = ('technical_skills', 'education', 'experience', 'achievements', 'formatting')
+
+
+class TaxonomyError(ValueError):
+    """Raised when a taxonomy file is missing or invalid."""
+
+
+class Taxonomy:
+    """A compiled taxonomy version. Never modified once compiled."""
+
+    def __init__(self, version, skill_categories, category_descriptions, job_role_keywords):
+        """
+        Args:
+            version: The taxonomy version.
+            skill_categories: Skill category -> list of skills.
+            category_descriptions: Resume category -> description text.
+            job_role_keywords: Job role -> keyword text.
+        """
+        self.version = version
+        self.skill_categories = skill_categories
+        self.category_descriptions = category_descriptions
+        self.job_role_keywords = job_role_keywords
+
+        # Skill -> the categories listing it, in category order, so skill
+        # extraction is one lookup per token however many skills there are
+        self.skill_index = {}
+        for category, skills in skill_categories.items():
+            for skill in skills:
+                categories = self.skill_index.setdefault(skill, ())
+                if category not in categories:
+                    self.skill_index[skill] = categories + (category,)
+
+        self._derived = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def compile(cls, data):
+        """
+        Validate and compile a parsed taxonomy file.
+
+        Raises:
+            TaxonomyError: If the data is not a valid taxonomy.
+        """
+        if not isinstance(data, dict):
+            raise TaxonomyError("A taxonomy must be a JSON object")
+        version = data.get('version')
+        if not isinstance(version, int) or isinstance(version, bool) or version < 1:
+            raise TaxonomyError("'version' must be a positive integer")
+
+        skills = data.get('skills')
+        if not isinstance(skills, dict) or set(skills) != set(SKILL_CATEGORIES):
+            raise TaxonomyError(f"'skills' must have exactly the categories {', '.join(SKILL_CATEGORIES)}")
+        skill_categories = {}
+        for category in SKILL_CATEGORIES:
+            entries = skills[category]
+            if not isinstance(entries, list) or not all(isinstance(s, str) and s.strip() for s in entries):
+                raise TaxonomyError(f"'skills.{category}' must be a list of non-empty strings")
+            skill_categories[category] = [skill.strip().lower() for skill in entries]
+
+        categories = data.get('categories')
+        if not isinstance(categories, dict) or set(categories) != set(RESUME_CATEGORIES):
+            raise TaxonomyError(f"'categories' must have exactly the categories {', '.join(RESUME_CATEGORIES)}")
+        roles = data.get('roles')
+        if not isinstance(roles, dict) or not roles:
+            raise TaxonomyError("'roles' must be a non-empty object")
+        for field, texts in (('categories', categories), ('roles', roles)):
+            for name, text in texts.items():
+                if not isinstance(text, str) or not text.strip():
+                    raise TaxonomyError(f"'{field}.{name}' must be a non-empty string")
+
+        return cls(
+            version,
+            skill_categories,
+            {category: categories[category] for category in RESUME_CATEGORIES},
+            dict(roles),
+        )
+
+    @classmethod
+    def load(cls, path):
+        """
+        Read and compile a taxonomy file.
+
+        Raises:
+            TaxonomyError: If the file cannot be read or is not valid.
+        """
+        try:
+            with open(path, encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            raise TaxonomyError(f"Cannot read taxonomy {path}: {e}")
+        return cls.compile(data)
+
+    def categorize(self, tokens):
+        """
+        Find the skills among tokens.
+
+        Args:
+            tokens: Preprocessed tokens.
+
+        Returns:
+            Skill category -> the skills found, each once, in order of
+            first appearance.
+        """
+        found = {category: [] for category in self.skill_categories}
+        seen = set()
+        for token in tokens:
+            if token in seen:
+                continue
+            seen.add(token)
+            for category in self.skill_index.get(token, ()):
+                found[category].append(token)
+        return found
+
+    def derive(self, name, compute):
+        """
+        Get a structure derived from this version, computing it once.
+
+        Engines keep what they build from the taxonomy (preprocessed texts,
+        trained models) here, so it is rebuilt only for a new version.
+
+        Args:
+            name: Name of the structure.
+            compute: Zero-argument callable building it.
+        """
+        value = self._derived.get(name)
+        if value is None:
+            with self._lock:
+                value = self._derived.get(name)
+                if value is None:
+                    value = compute()
+                    self._derived[name] = value
+        return value
+
+
+def taxonomy_path():
+    """The taxonomy file in use."""
+    return getattr(settings, 'TAXONOMY_PATH', '') or DEFAULT_PATH
+
+
+def _stamp(path):
+    stat = os.stat(path)
+    return path, stat.st_mtime_ns, stat.st_size
+
+
+_current = None
+_stamp_seen = None
+_checked_at = 0.0
+_lock = threading.Lock()
+
+
+def _refresh():
+    global _current, _stamp_seen, _checked_at
+
+    path = taxonomy_path()
+    try:
+        stamp = _stamp(path)
+    except OSError as e:
+        if _current is None:
+            raise TaxonomyError(f"Cannot read taxonomy {path}: {e}")
+        logger.error("Cannot read taxonomy %s, keeping version %s: %s", path, _current.version, e)
+        _checked_at = time.monotonic()
+        return
+
+    if stamp != _stamp_seen:
+        # Remember the stamp even if the file is rejected, so a bad file is
+        # not recompiled on every check
+        _stamp_seen = stamp
+        try:
+            taxonomy = Taxonomy.load(path)
+        except TaxonomyError:
+            if _current is None:
+                raise
+            logger.exception("Ignoring invalid taxonomy %s, keeping version %s", path, _current.version)
+        else:
+            if _current is None or taxonomy.version != _current.version:
+                if _current is not None:
+                    logger.info("Taxonomy version %s replaces %s", taxonomy.version, _current.version)
+                _current = taxonomy
+            else:
+                logger.warning(
+                    "Taxonomy %s changed without a new version; keeping version %s", path, _current.version
+                )
+    _checked_at = time.monotonic()
+
+
+def current():
+    """
+    Get the taxonomy in use, compiling it on first use and picking up newly
+    published versions.
+
+    Callers should take one snapshot per request and use it throughout.
+
+    Raises:
+        TaxonomyError: If no taxonomy has been compiled yet and the file is
+            missing or invalid.
+    """
+    taxonomy = _current
+    if taxonomy is not None and time.monotonic() - _checked_at < settings.TAXONOMY_CHECK_SECONDS:
+        return taxonomy
+
+    # Only the first use waits; while another thread checks or compiles a
+    # new version, requests keep the one they have
+    if not _lock.acquire(blocking=taxonomy is None):
+        return taxonomy
+    try:
+        if _current is None or time.monotonic() - _checked_at >= settings.TAXONOMY_CHECK_SECONDS:
+            _refresh()
+        return _current
+    finally:
+        _lock.release()
+
+
+def reset():
+    """Forget the compiled taxonomy, e.g. after changing settings in tests."""
+    global _current, _stamp_seen, _checked_at
+    with _lock:
+        _current = None
+        _stamp_seen = None
+        _checked_at = 0.0
@@ -4,3 +4,16 @@ from django.apps import AppConfig
 class ApiConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "api"
+
+    def ready(self):
+        from django.conf import settings
+
+        from . import signals  # noqa: F401
+        from .observability import memory, timing
+
+        timing.configure(settings.STAGE_TIMING_ENABLED)
+        memory.configure(
+            settings.MEMORY_PROFILING_ENABLED,
+            top_n=settings.MEMORY_PROFILING_TOP_N,
+            frames=settings.MEMORY_PROFILING_FRAMES,
+        )
@@ -0,0 +1,3 @@
+"""
+Benchmark tooling for the analysis and matching hot paths.
+"""
@@ -0,0 +1,213 @@
+"""
+Seeded synthetic resume and job description generator.
+
+Documents are assembled from fixed vocabularies with a ``random.Random``
+seeded by the caller, so the same seed always yields byte-identical text.
+That makes timings comparable across runs and releases.
+"""
+import random
+
+# Approximate number of words per generated document for each size class
+DOCUMENT_SIZES = {
+    'small': 150,
+    'typical': 600,
+    'large': 8000,
+}
+
+SKILLS = [
+    'Python', 'Java', 'JavaScript', 'TypeScript', 'C++', 'Go', 'Ruby', 'SQL',
+    'React', 'Angular', 'Vue.js', 'Node.js', 'Django', 'Flask', 'Spring Boot',
+    'PostgreSQL', 'MySQL', 'MongoDB', 'Redis', 'AWS', 'Azure', 'Docker',
+    'Kubernetes', 'Terraform', 'Jenkins', 'Git', 'TensorFlow', 'PyTorch',
+    'Pandas', 'NumPy', 'scikit-learn', 'Spark', 'Excel', 'Tableau', 'SAP',
+    'Google Analytics', 'SEO', 'Jira', 'Agile', 'Scrum',
+]
+
+SOFT_SKILLS = [
+    'communication', 'teamwork', 'leadership', 'problem-solving', 'creativity',
+    'collaboration', 'adaptability', 'negotiation', 'presentation', 'organization',
+]
+
+DOMAINS = [
+    'finance', 'healthcare', 'education', 'retail', 'marketing', 'sales',
+    'operations', 'research', 'consulting', 'security', 'compliance',
+]
+
+ROLES = [
+    'Software Engineer', 'Backend Developer', 'Data Scientist', 'Product Manager',
+    'Marketing Manager', 'Financial Analyst', 'DevOps Engineer', 'Data Analyst',
+]
+
+DEGREES = ['Bachelor of Science', 'Master of Science', 'MBA', 'PhD', 'Associate Degree']
+FIELDS = ['Computer Science', 'Mathematics', 'Statistics', 'Finance', 'Marketing', 'Economics']
+SCHOOLS = ['State University', 'Institute of Technology', 'City College', 'Business School']
+COMPANIES = ['Acme Corp', 'Globex', 'Initech', 'Umbrella Labs', 'Stark Industries', 'Hooli']
+
+VERBS = [
+    'Led', 'Developed', 'Designed', 'Implemented', 'Managed', 'Improved',
+    'Optimized', 'Delivered', 'Launched', 'Reduced', 'Increased', 'Built',
+    'Automated', 'Coordinated', 'Streamlined', 'Collaborated on',
+]
+
+OBJECTS = [
+    'a customer-facing web platform', 'the data ingestion pipeline',
+    'an internal analytics dashboard', 'the payments service', 'a mobile application',
+    'the CI/CD workflow', 'quarterly marketing campaigns', 'the financial forecasting model',
+    'a recommendation engine', 'cross-functional product roadmaps',
+]
+
+AWARDS = ['Employee of the Year', "Dean's List", 'Top Performer', 'Hackathon Winner']
+
+OUTCOMES = [
+    'reducing latency by {n}%', 'increasing revenue by {n}%', 'saving {n} hours per week',
+    'cutting costs by {n}%', 'improving conversion by {n}%', 'serving {n}k daily users',
+]
+
+
+def _sentence(rng):
+    outcome = rng.choice(OUTCOMES).format(n=rng.randint(5, 90))
+    tools = ', '.join(rng.sample(SKILLS, 2))
+    return f"{rng.choice(VERBS)} {rng.choice(OBJECTS)} using {tools}, {outcome}."
+
+
+def generate_resume(rng, size='typical'):
+    """
+    Generate a synthetic resume.
+
+    Args:
+        rng: A seeded ``random.Random`` instance.
+        size: One of the keys of DOCUMENT_SIZES.
+
+    Returns:
+        The resume text.
+    """
+    target_words = DOCUMENT_SIZES[size]
+    role = rng.choice(ROLES)
+    lines = [
+        f"{role}",
+        "",
+        "SUMMARY",
+        f"{role} with {rng.randint(1, 20)} years of experience in "
+        f"{rng.choice(DOMAINS)} and {rng.choice(DOMAINS)}.",
+        "",
+        "SKILLS",
+        ', '.join(rng.sample(SKILLS, 12)),
+        ', '.join(rng.sample(SOFT_SKILLS, 4)),
+        "",
+        "EDUCATION",
+        f"{rng.choice(DEGREES)} in {rng.choice(FIELDS)}, {rng.choice(SCHOOLS)}, "
+        f"GPA {rng.randint(30, 40) / 10}",
+        "",
+        "EXPERIENCE",
+    ]
+
+    words = sum(len(line.split()) for line in lines)
+    while words < target_words:
+        header = f"{rng.choice(ROLES)} at {rng.choice(COMPANIES)} ({rng.randint(2005, 2024)})"
+        lines.append(header)
+        words += len(header.split())
+        for _ in range(rng.randint(3, 6)):
+            bullet = f"- {_sentence(rng)}"
+            lines.append(bullet)
+            words += len(bullet.split())
+        lines.append("")
+
+    lines.extend([
+        "ACHIEVEMENTS",
+        f"- Awarded {rng.choice(AWARDS)}",
+        f"- {_sentence(rng)}",
+    ])
+    return '\n'.join(lines)
+
+
+def generate_job_description(rng, size='typical'):
+    """
+    Generate a synthetic job description.
+
+    Args:
+        rng: A seeded ``random.Random`` instance.
+        size: One of the keys of DOCUMENT_SIZES; job descriptions are a
+            quarter of the resume length for the same size class.
+
+    Returns:
+        The job description text.
+    """
+    target_words = max(40, DOCUMENT_SIZES[size] // 4)
+    role = rng.choice(ROLES)
+    lines = [
+        f"We are hiring a {role} to join our {rng.choice(DOMAINS)} team.",
+        f"Required skills: {', '.join(rng.sample(SKILLS, 8))}.",
+        f"You bring strong {', '.join(rng.sample(SOFT_SKILLS, 3))}.",
+        "Responsibilities:",
+    ]
+    words = sum(len(line.split()) for line in lines)
+    while words < target_words:
+        duty = f"- {_sentence(rng)}"
+        lines.append(duty)
+        words += len(duty.split())
+    return '\n'.join(lines)
+
+
+def build_corpus(seed=42, sizes=None, count=1):
+    """
+    Build a deterministic corpus of resume/job description pairs.
+
+    Args:
+        seed: Seed for the random generator.
+        sizes: Size classes to include (defaults to all of DOCUMENT_SIZES).
+        count: Number of pairs per size class.
+
+    Returns:
+        Dictionary mapping size class to a list of (resume, job_description) tuples.
+    """
+    rng = random.Random(seed)
+    corpus = {}
+    for size in sizes or DOCUMENT_SIZES.keys():
+        corpus[size] = [
+            (generate_resume(rng, size), generate_job_description(rng, size))
+            for _ in range(count)
+        ]
+    return corpus
+
+
+SYLLABLES = ['ka', 'lo', 'mi', 'tor', 'vex', 'dra', 'sul', 'pen', 'qui', 'ro', 'zan', 'bel']
+
+
+def generate_taxonomy(rng, skills=10000, roles=50):
+    """
+    Generate a large synthetic taxonomy file (see api.ai.taxonomy).
+
+    Args:
+        rng: A seeded ``random.Random`` instance.
+        skills: Number of skills, spread over the skill categories; the
+            benchmark vocabularies come first.
+        roles: Number of job roles.
+
+    Returns:
+        The parsed taxonomy dictionary.
+    """
+    names = [skill.lower() for skill in SKILLS + SOFT_SKILLS + DOMAINS]
+    seen = set(names)
+    while len(names) < skills:
+        name = ''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4)))
+        if name not in seen:
+            seen.add(name)
+            names.append(name)
+    names = names[:skills]
+
+    def keywords(count):
+        return ' '.join(rng.sample(names, count))
+
+    return {
+        'version': 1,
+        'skills': {
+            'technical': names[0::3],
+            'soft': names[1::3],
+            'domain': names[2::3],
+        },
+        'categories': {
+            category: keywords(60)
+            for category in ('technical_skills', 'education', 'experience', 'achievements', 'formatting')
+        },
+        'roles': {f'role_{i}': keywords(80) for i in range(roles)},
+    }
@@ -0,0 +1,155 @@
+"""
+Score-equivalence verification between a reference and a candidate engine.
+
+An engine is any object with ``analyze_resume(resume_text, ...)`` and
+``calculate_match_score(resume_text, job_description)`` returning the same
+shapes as AdvancedResumeAnalyzer and JobMatcher. Both engines are run over
+the same corpus and the user-visible outputs are compared field by field
+against configurable tolerances.
+"""
+import time
+
+from ..ai import engines
+from ..ai.engines import LegacyEngine
+
+# Maximum allowed drift per field: the absolute difference for scores, and
+# 1 - Jaccard overlap for the keyword sets
+DEFAULT_TOLERANCES = {
+    'score': 0,
+    'category_scores': 0,
+    'job_role_confidence': 0,
+    'overall_match_score': 0,
+    'keywords': 0.0,
+}
+
+
+class ReferenceEngine(LegacyEngine):
+    """The current production analyzer and matcher behind one object."""
+
+    name = 'reference'
+
+
+def load_engine(name_or_path):
+    """
+    Instantiate an engine by registered name or dotted path.
+
+    Args:
+        name_or_path: A name from the engine registry, such as 'legacy', or
+            'package.module.Name' / 'package.module:Name', where Name is a
+            class or a zero-argument factory returning an engine.
+    """
+    if name_or_path in engines.available():
+        return engines.get_engine(name_or_path)
+    return engines.import_factory(name_or_path)()
+
+
+def _keyword_drift(left, right):
+    left, right = set(left), set(right)
+    if not left and not right:
+        return 0.0
+    return 1 - len(left & right) / len(left | right)
+
+
+def compare_results(reference, candidate, tolerances):
+    """
+    Compare the analysis and match outputs for one document.
+
+    Args:
+        reference: Dictionary with 'analysis' and optional 'match' results.
+        candidate: The same shape, from the candidate engine.
+        tolerances: Dictionary like DEFAULT_TOLERANCES.
+
+    Returns:
+        Tuple of (drift, violations). drift maps each field to its drift as
+        defined for DEFAULT_TOLERANCES; violations lists human readable
+        descriptions of fields outside tolerance.
+    """
+    drift, violations = {}, []
+    ref_analysis, cand_analysis = reference['analysis'], candidate['analysis']
+
+    for field in ('score', 'job_role_confidence'):
+        drift[field] = abs(ref_analysis[field] - cand_analysis[field])
+        if drift[field] > tolerances[field]:
+            violations.append(f"{field}: {ref_analysis[field]} != {cand_analysis[field]}")
+
+    category_drift = 0
+    for category, ref_score in ref_analysis['category_scores'].items():
+        cand_score = cand_analysis['category_scores'].get(category)
+        if cand_score is None:
+            violations.append(f"category_scores.{category}: missing")
+            continue
+        difference = abs(ref_score - cand_score)
+        category_drift = max(category_drift, difference)
+        if difference > tolerances['category_scores']:
+            violations.append(f"category_scores.{category}: {ref_score} != {cand_score}")
+    drift['category_scores'] = category_drift
+
+    drift['job_role'] = 0 if ref_analysis['job_role'] == cand_analysis['job_role'] else 1
+    if drift['job_role']:
+        violations.append(f"job_role: {ref_analysis['job_role']} != {cand_analysis['job_role']}")
+
+    drift['keywords'] = round(_keyword_drift(ref_analysis['keywords'], cand_analysis['keywords']), 4)
+    if drift['keywords'] > tolerances['keywords']:
+        violations.append(f"keywords: {drift['keywords']:.2f} of the combined set differs")
+
+    if reference.get('match') is not None:
+        ref_match = reference['match']['overall_match_score']
+        cand_match = candidate['match']['overall_match_score']
+        drift['overall_match_score'] = abs(ref_match - cand_match)
+        if drift['overall_match_score'] > tolerances['overall_match_score']:
+            violations.append(f"overall_match_score: {ref_match} != {cand_match}")
+
+    return drift, violations
+
+
+def _run(engine, resume_text, job_description):
+    start = time.perf_counter()
+    result = {'analysis': engine.analyze_resume(resume_text), 'match': None}
+    if job_description:
+        result['match'] = engine.calculate_match_score(resume_text, job_description)
+    return result, time.perf_counter() - start
+
+
+def verify_equivalence(reference, candidate, documents, tolerances=None):
+    """
+    Run both engines over a corpus and report drift and speedup.
+
+    Args:
+        reference: The engine whose outputs are treated as correct.
+        candidate: The engine under test.
+        documents: Iterable of (label, resume_text, job_description or None).
+        tolerances: Overrides for DEFAULT_TOLERANCES.
+
+    Returns:
+        Report dictionary with 'passed', per-field 'max_drift', the failing
+        'documents', and reference/candidate timings with the 'speedup'.
+    """
+    tolerances = {**DEFAULT_TOLERANCES, **(tolerances or {})}
+    max_drift = {}
+    failures = []
+    reference_seconds = candidate_seconds = 0.0
+    count = 0
+
+    for label, resume_text, job_description in documents:
+        ref_result, ref_elapsed = _run(reference, resume_text, job_description)
+        cand_result, cand_elapsed = _run(candidate, resume_text, job_description)
+        reference_seconds += ref_elapsed
+        candidate_seconds += cand_elapsed
+        count += 1
+
+        drift, violations = compare_results(ref_result, cand_result, tolerances)
+        for field, value in drift.items():
+            max_drift[field] = max(max_drift.get(field, 0), value)
+        if violations:
+            failures.append({'document': label, 'violations': violations})
+
+    return {
+        'passed': not failures,
+        'documents_checked': count,
+        'tolerances': tolerances,
+        'max_drift': max_drift,
+        'failures': failures,
+        'reference_seconds': round(reference_seconds, 4),
+        'candidate_seconds': round(candidate_seconds, 4),
+        'speedup': round(reference_seconds / candidate_seconds, 3) if candidate_seconds else None,
+    }
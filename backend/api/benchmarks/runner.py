@@ -0,0 +1,125 @@
+"""
+Timing and baseline comparison helpers for the benchmark suite.
+"""
+import gc
+import json
+import platform
+import statistics
+import time
+
+
+def time_callable(func, repeat=5, warmup=1, setup=None):
+    """
+    Time repeated calls of a callable.
+
+    Args:
+        func: The callable to time. Called with no arguments, or with the
+            return value of setup when one is given.
+        repeat: Number of timed calls.
+        warmup: Number of untimed calls made first (caches, lazy loading).
+        setup: Optional callable run untimed before every call.
+
+    Returns:
+        Dictionary of timing statistics in milliseconds.
+    """
+    def call():
+        if setup is None:
+            start = time.perf_counter()
+            func()
+        else:
+            arg = setup()
+            start = time.perf_counter()
+            func(arg)
+        return (time.perf_counter() - start) * 1000
+
+    for _ in range(warmup):
+        call()
+
+    samples = []
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            samples.append(call())
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+    samples.sort()
+    return {
+        'runs': len(samples),
+        'min_ms': round(samples[0], 3),
+        'median_ms': round(statistics.median(samples), 3),
+        'mean_ms': round(statistics.fmean(samples), 3),
+        'max_ms': round(samples[-1], 3),
+    }
+
+
+def build_report(results, seed, repeat):
+    """
+    Wrap benchmark results with the metadata needed to compare runs.
+
+    Args:
+        results: Dictionary mapping case name to timing statistics.
+        seed: Corpus seed used for the run.
+        repeat: Number of timed calls per case.
+
+    Returns:
+        The machine-readable report dictionary.
+    """
+    return {
+        'meta': {
+            'seed': seed,
+            'repeat': repeat,
+            'python': platform.python_version(),
+            'machine': platform.machine(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        },
+        'results': results,
+    }
+
+
+def compare_to_baseline(results, baseline, tolerance=0.25, min_delta_ms=1.0):
+    """
+    Find cases whose median time regressed past the stored baseline.
+
+    Args:
+        results: Dictionary mapping case name to timing statistics.
+        baseline: A report previously produced by build_report.
+        tolerance: Allowed fractional slowdown of the median (0.25 = 25%).
+        min_delta_ms: Slowdowns smaller than this are treated as noise.
+
+    Returns:
+        List of regression dictionaries, empty when every case is in budget.
+        Cases missing from either side are ignored.
+    """
+    regressions = []
+    baseline_results = baseline.get('results', {})
+
+    for case, stats in sorted(results.items()):
+        reference = baseline_results.get(case)
+        if not reference:
+            continue
+
+        current_ms = stats['median_ms']
+        baseline_ms = reference['median_ms']
+        allowed_ms = baseline_ms * (1 + tolerance)
+
+        if current_ms > allowed_ms and current_ms - baseline_ms >= min_delta_ms:
+            regressions.append({
+                'case': case,
+                'baseline_ms': baseline_ms,
+                'current_ms': current_ms,
+                'slowdown': round(current_ms / baseline_ms, 3) if baseline_ms else None,
+            })
+
+    return regressions
+
+
+def load_report(path):
+    """Load a report written by the benchmark command, or None if absent."""
+    try:
+        with open(path, 'r', encoding='utf-8') as report:
+            return json.load(report)
+    except FileNotFoundError:
+        return None
@@ -7,13 +7,16 @@ class Resume:
     """Resume entity representing a user's resume."""
     
     def __init__(self, id=None, user_id=None, file_path=None, content=None, 
-                 score=None, feedback=None, created_at=None, updated_at=None):
+                 score=None, feedback=None, created_at=None, updated_at=None,
+                 sections=None, analyzer_version=None):
         self.id = id
         self.user_id = user_id
         self.file_path = file_path
         self.content = content
         self.score = score
         self.feedback = feedback
+        self.sections = sections
+        self.analyzer_version = analyzer_version
         self.created_at = created_at
         self.updated_at = updated_at
     
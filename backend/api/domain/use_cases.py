@@ -11,6 +11,85 @@ class JobDescription:
     description: str
     company: str = ""
     location: str = ""
+    # Set for stored job descriptions
+    id: int = None
+    prepared: dict = None
+
+# Categories whose feedback is also stored as detailed Feedback rows
+FEEDBACK_CATEGORIES = ('technical_skills', 'education', 'experience', 'achievements', 'formatting')
+
+# Keys of a complete analysis feedback
+FEEDBACK_FIELDS = (
+    *FEEDBACK_CATEGORIES, 'category_scores', 'improvement_suggestions', 'key_strengths',
+    'job_role', 'job_role_confidence', 'keywords',
+)
+
+# Feedback keys describing how one analysis was run rather than its results
+ANALYSIS_MARKERS = ('fields', 'completed_stages', 'degraded')
+
+def category_feedback(resume):
+    """
+    Get the detailed feedback of an analyzed resume's main categories.
+
+    Returns:
+        List of (category, content, score) for each category in the
+        resume's feedback.
+    """
+    return [
+        (category, resume.feedback[category], resume.feedback.get('category_scores', {}).get(category, resume.score))
+        for category in FEEDBACK_CATEGORIES
+        if category in resume.feedback
+    ]
+
+def apply_analysis(resume, score, feedback):
+    """
+    Store the results of an analysis on a resume.
+
+    A partial (``fields``) or degraded result is merged into the resume's
+    stored feedback, keeping the outputs it did not compute and the
+    stored analyzer version. Other results replace the stored feedback.
+
+    Args:
+        resume: The Resume entity to update.
+        score: The overall score of the analysis.
+        feedback: The feedback of the analysis, with its 'analyzer_version'.
+
+    Returns:
+        The feedback of this analysis, with the outputs it did not compute
+        set to None.
+    """
+    analyzer_version = feedback.pop('analyzer_version', None)
+    resume.score = score
+    if ('fields' in feedback or feedback.get('degraded')) and resume.feedback:
+        stored = {key: value for key, value in resume.feedback.items() if key not in ANALYSIS_MARKERS}
+        resume.feedback = {**stored, **feedback}
+    else:
+        resume.feedback = feedback
+        resume.analyzer_version = analyzer_version
+    return {**dict.fromkeys(FEEDBACK_FIELDS), **feedback}
+
+def keep_job_match(feedback, stored):
+    """
+    Carry the job match of a stored analysis over to a new analysis made
+    without the job description, e.g. by reanalyze.
+
+    The job-specific suggestions are added back to the improvement
+    suggestions, as the analysis with the job description added them.
+
+    Args:
+        feedback: The feedback of the new analysis, updated in place.
+        stored: The resume's stored feedback, or None.
+    """
+    job_match = (stored or {}).get('job_match')
+    if job_match is None or 'job_match' in feedback:
+        return
+    feedback['job_match'] = job_match
+    if 'improvement_suggestions' in feedback:
+        suggestions = feedback['improvement_suggestions']
+        feedback['improvement_suggestions'] = suggestions + [
+            suggestion for suggestion in job_match.get('job_specific_suggestions', [])
+            if suggestion not in suggestions
+        ]
 
 class ResumeAnalysisUseCase:
     """Use case for analyzing a resume using advanced AI techniques."""
@@ -19,15 +98,18 @@ class ResumeAnalysisUseCase:
         self.resume_repository = resume_repository
         self.analyzer_service = analyzer_service
 
-    def execute(self, resume_id):
+    def execute(self, resume_id, fields=None, budget=None):
         """
         Analyze a resume and save the results.
 
         Args:
             resume_id: The ID of the resume to analyze.
+            fields: Optional subset of the analysis outputs to compute.
+            budget: Optional time budget in seconds for the analysis.
 
         Returns:
-            The analyzed resume with score and feedback.
+            The analyzed resume and the feedback of this analysis (see
+            apply_analysis).
         """
         # Get the resume from the repository
         resume = self.resume_repository.get_by_id(resume_id)
@@ -35,17 +117,70 @@ class ResumeAnalysisUseCase:
         if not resume:
             raise ValueError(f"Resume with ID {resume_id} not found")
 
+        # Segment the resume once and keep the sections for later analyses
+        if resume.sections is None:
+            resume.sections = self.analyzer_service.segment(resume.content)
+
         # Analyze the resume
-        score, feedback = self.analyzer_service.analyze(resume.content)
+        score, feedback = self.analyzer_service.analyze(
+            resume.content, sections=resume.sections, fields=fields, budget=budget
+        )
 
         # Update the resume with the analysis results
-        resume.score = score
-        resume.feedback = feedback
+        feedback = apply_analysis(resume, score, feedback)
 
         # Save the updated resume
         updated_resume = self.resume_repository.update(resume)
 
-        return updated_resume
+        return updated_resume, feedback
+
+    def stream(self, resume_id, job_description=None, fields=None, budget=None):
+        """
+        Analyze a resume, reporting results as they are computed, and save
+        the final result.
+
+        The resume is looked up before this returns, so a missing resume
+        fails immediately rather than on the first event.
+
+        Args:
+            resume_id: The ID of the resume to analyze.
+            job_description: Optional JobDescription to match against.
+            fields: Optional subset of the analysis outputs to compute.
+            budget: Optional time budget in seconds for the analysis.
+
+        Returns:
+            A generator of (event, data) tuples from the analyzer service,
+            where the final 'complete' event carries the updated resume and
+            the feedback of this analysis (see apply_analysis).
+            Closing it early stops the analysis and saves nothing.
+        """
+        resume = self.resume_repository.get_by_id(resume_id)
+
+        if not resume:
+            raise ValueError(f"Resume with ID {resume_id} not found")
+
+        if resume.sections is None:
+            resume.sections = self.analyzer_service.segment(resume.content)
+
+        events = self.analyzer_service.stream_analysis(
+            resume.content,
+            job_description.description if job_description else None,
+            sections=resume.sections,
+            fields=fields,
+            budget=budget,
+            prepared_job=job_description.prepared if job_description else None
+        )
+        return self._save_when_complete(resume, events)
+
+    def _save_when_complete(self, resume, events):
+        try:
+            for event, data in events:
+                if event == 'complete':
+                    feedback = apply_analysis(resume, data['score'], data['feedback'])
+                    data = self.resume_repository.update(resume), feedback
+                yield event, data
+        finally:
+            events.close()
 
 
 class ResumeUploadUseCase:
@@ -101,6 +236,31 @@ class GetUserResumesUseCase:
         return self.resume_repository.get_by_user_id(user_id)
 
 
+class ResumeStatsUseCase:
+    """Use case for summarizing the analyses of a user's resumes."""
+
+    def __init__(self, resume_repository, feedback_repository):
+        self.resume_repository = resume_repository
+        self.feedback_repository = feedback_repository
+
+    def execute(self, user_id, **filters):
+        """
+        Summarize a user's resumes.
+
+        Args:
+            user_id: The ID of the user.
+            **filters: Optional created_after, created_before, min_score
+                and max_score selecting the resumes.
+
+        Returns:
+            The resume count and score aggregates, the score distribution
+            and the per-category averages.
+        """
+        stats = self.resume_repository.get_stats(user_id, **filters)
+        stats['category_averages'] = self.feedback_repository.get_category_averages(user_id, **filters)
+        return stats
+
+
 class JobComparisonUseCase:
     """Use case for comparing a resume with a job description."""
 
@@ -108,13 +268,14 @@ class JobComparisonUseCase:
         self.resume_repository = resume_repository
         self.analyzer_service = analyzer_service
 
-    def execute(self, resume_id, job_description):
+    def execute(self, resume_id, job_description, budget=None):
         """
         Compare a resume with a job description.
 
         Args:
             resume_id: The ID of the resume to compare.
             job_description: The job description to compare with.
+            budget: Optional time budget in seconds for the comparison.
 
         Returns:
             Dictionary with match results.
@@ -128,7 +289,9 @@ class JobComparisonUseCase:
         # Compare the resume with the job description
         match_results = self.analyzer_service.compare_with_job(
             resume.content,
-            job_description.description
+            job_description.description,
+            budget=budget,
+            prepared_job=job_description.prepared
         )
 
         return match_results
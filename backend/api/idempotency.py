@@ -0,0 +1,149 @@
+"""
+Idempotency-Key support for API actions that create or recompute data.
+
+Clients retrying a request after a network failure send the same
+Idempotency-Key header with every attempt. The first attempt claims the key
+and runs; its response is stored and replayed to retries until the key
+expires after IDEMPOTENCY_KEY_TTL_HOURS. A retry arriving while the first
+attempt is still running waits for it, on the attempt itself within the
+same process, or by polling the stored record for up to
+IDEMPOTENCY_WAIT_SECONDS when the attempt runs in another process.
+
+Keys are scoped to the user. Reusing a key for a different path, or with
+different query parameters or body, is rejected. Server errors are not
+stored, so retrying after a 5xx runs the request again.
+"""
+import functools
+import hashlib
+import json
+import time
+
+from django.conf import settings
+from django.core.files.uploadedfile import UploadedFile
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+
+from .adapters.coalescing import flight_key, get_single_flight
+from .adapters.repositories import IdempotencyRepository
+from .models import IdempotencyKey
+from .observability.metrics import REGISTRY
+
+IDEMPOTENCY_HEADER = 'Idempotency-Key'
+MAX_KEY_LENGTH = 255
+POLL_INTERVAL_SECONDS = 0.1
+# Attempts still in flight after this long are assumed lost, e.g. with a
+# crashed worker, and the next retry runs the request again
+ABANDONED_AFTER_SECONDS = 10 * 60
+
+IDEMPOTENT_REQUESTS = REGISTRY.counter(
+    'resume_analyzer_idempotent_requests',
+    'Requests carrying an Idempotency-Key, by action and outcome.',
+    labelnames=('action', 'outcome'),
+)
+
+
+def idempotent(view_method):
+    """
+    Make a viewset action honour the Idempotency-Key request header.
+
+    Requests without the header run as usual. Replayed responses carry an
+    'Idempotent-Replayed: true' header.
+    """
+    @functools.wraps(view_method)
+    def wrapper(self, request, *args, **kwargs):
+        key = request.headers.get(IDEMPOTENCY_HEADER)
+        if not key or not settings.IDEMPOTENCY_ENABLED:
+            return view_method(self, request, *args, **kwargs)
+        if len(key) > MAX_KEY_LENGTH:
+            return Response(
+                {'error': f"{IDEMPOTENCY_HEADER} must be at most {MAX_KEY_LENGTH} characters"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        repository = IdempotencyRepository(IdempotencyKey, ttl_hours=settings.IDEMPOTENCY_KEY_TTL_HOURS)
+        fingerprint = request_fingerprint(request)
+
+        def run():
+            return _run_once(
+                repository, request.user.id, key, request.path, fingerprint,
+                lambda: view_method(self, request, *args, **kwargs)
+            )
+
+        # Retries reaching this process wait on the first attempt directly
+        outcome, status_code, data = get_single_flight('idempotency').do(
+            flight_key(request.user.id, key, request.path, fingerprint), run
+        )
+        IDEMPOTENT_REQUESTS.inc((self.action, outcome))
+
+        response = Response(data, status=status_code)
+        if outcome == 'replayed':
+            response['Idempotent-Replayed'] = 'true'
+        return response
+    return wrapper
+
+
+def request_fingerprint(request):
+    """
+    A SHA-256 hex digest of a request's method, query parameters and body.
+
+    Uploaded files are included by name and content.
+    """
+    data = request.data
+    if hasattr(data, 'lists'):
+        data = sorted((name, [_file_digest(value) for value in values]) for name, values in data.lists())
+    params = sorted(request.query_params.lists())
+    canonical = json.dumps([request.method, params, data], sort_keys=True, default=str)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def _file_digest(value):
+    if not isinstance(value, UploadedFile):
+        return value
+    digest = hashlib.sha256()
+    for chunk in value.chunks():
+        digest.update(chunk)
+    value.seek(0)
+    return {'name': value.name, 'sha256': digest.hexdigest()}
+
+
+def _run_once(repository, user_id, key, path, fingerprint, call):
+    deadline = time.monotonic() + settings.IDEMPOTENCY_WAIT_SECONDS
+    while True:
+        existing = repository.claim(user_id, key, path, fingerprint)
+        if existing is None:
+            break
+        if existing['path'] != path:
+            return 'rejected', status.HTTP_422_UNPROCESSABLE_ENTITY, {
+                'error': f"{IDEMPOTENCY_HEADER} was already used for {existing['path']}"
+            }
+        if existing['fingerprint'] != fingerprint:
+            return 'rejected', status.HTTP_422_UNPROCESSABLE_ENTITY, {
+                'error': f"{IDEMPOTENCY_HEADER} was already used for a request with different parameters"
+            }
+        if existing['status_code'] is not None:
+            return 'replayed', existing['status_code'], existing['response']
+
+        if (timezone.now() - existing['created_at']).total_seconds() > ABANDONED_AFTER_SECONDS:
+            repository.release(user_id, key)
+        elif time.monotonic() >= deadline:
+            return 'in_flight', status.HTTP_409_CONFLICT, {
+                'error': f"A request with this {IDEMPOTENCY_HEADER} is still in progress"
+            }
+        else:
+            time.sleep(POLL_INTERVAL_SECONDS)
+
+    try:
+        response = call()
+    except BaseException:
+        repository.release(user_id, key)
+        raise
+
+    # Store plain JSON, as the client received it
+    data = json.loads(JSONRenderer().render(response.data)) if response.data is not None else None
+    if response.status_code >= 500:
+        repository.release(user_id, key)
+    else:
+        repository.complete(user_id, key, response.status_code, data)
+    return 'executed', response.status_code, data
@@ -0,0 +1,150 @@
+"""
+Analyze a dump of resumes offline, without HTTP or the database.
+"""
+import itertools
+import os
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError, OutputWrapper
+
+from api.adapters import batch
+from api.ai import engines
+from api.ai.resume_analyzer import ANALYSIS_FIELDS
+
+# Files FileService.extract_text knows how to read
+EXTENSIONS = ('.txt', '.pdf', '.doc', '.docx')
+
+
+class Command(BaseCommand):
+    help = (
+        "Analyze the resumes in a directory (recursively) or an NDJSON file of "
+        "{\"id\", \"text\"} or {\"id\", \"path\"} records on a pool of worker processes, "
+        "writing one NDJSON result per resume as work units complete. Nothing is read "
+        "from or written to the database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('source', help="Directory of resume files, or an NDJSON file.")
+        parser.add_argument('--output', default='-',
+                            help="Where to write the NDJSON results ('-' for stdout, the default).")
+        parser.add_argument('--engine', default=None, help="Engine to analyze with (default: ANALYSIS_ENGINE).")
+        parser.add_argument('--fields', default=None,
+                            help="Comma-separated subset of the analysis outputs to compute (default: all).")
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                            help="Worker processes (default: one per CPU); 0 analyzes in this process.")
+        parser.add_argument('--chunk-size', type=int, default=20,
+                            help="Resumes per work unit sent to a worker (default: 20).")
+        parser.add_argument('--max-in-flight', type=int, default=None,
+                            help="Most work units queued or running at once, which bounds memory "
+                                 "(default: twice the workers).")
+        parser.add_argument('--unordered', action='store_true',
+                            help="Write results as work units finish instead of in input order.")
+        parser.add_argument('--progress-seconds', type=float, default=5,
+                            help="Seconds between progress reports on stderr (default: 5).")
+        parser.add_argument('--nice', type=int, default=0, help="Niceness added to the worker processes.")
+
+    def handle(self, *args, **options):
+        source = options['source']
+        if os.path.isdir(source):
+            items = self._walk(source)
+        elif os.path.isfile(source):
+            items = self._read_ndjson(source)
+        else:
+            raise CommandError(f"{source} does not exist")
+
+        engine_name = options['engine'] or settings.ANALYSIS_ENGINE
+        if engine_name not in engines.available():
+            raise CommandError(f"Unknown analysis engine '{engine_name}'")
+        fields = None
+        if options['fields']:
+            fields = [field.strip() for field in options['fields'].split(',') if field.strip()]
+            unknown = set(fields) - set(ANALYSIS_FIELDS)
+            if unknown:
+                raise CommandError(f"Unknown analysis fields: {', '.join(sorted(unknown))}")
+
+        chunk_size = max(1, options['chunk_size'])
+        workers = max(0, options['workers'])
+        window = max(1, options['max_in_flight'] or workers * 2)
+        chunks = iter(lambda: list(itertools.islice(items, chunk_size)), [])
+
+        output_file = None if options['output'] == '-' else open(options['output'], 'w', encoding='utf-8')
+        output = self.stdout if output_file is None else OutputWrapper(output_file)
+        self.started = self.reported = time.monotonic()
+        self.documents = self.errors = 0
+        self.progress_seconds = options['progress_seconds']
+        try:
+            def emit(lines):
+                for failed, line in lines:
+                    output.write(line)
+                    self.errors += failed
+                self.documents += len(lines)
+                output.flush()
+                self._report_progress()
+
+            if not workers:
+                batch.init_worker(engine_name, fields, options['nice'])
+                for chunk in chunks:
+                    emit(batch.analyze_chunk(chunk))
+            else:
+                with ProcessPoolExecutor(
+                    workers, initializer=batch.init_worker, initargs=(engine_name, fields, options['nice'])
+                ) as pool:
+                    # Only `window` work units exist at a time, however large the input
+                    pending = deque()
+                    for chunk in chunks:
+                        pending.append(pool.submit(batch.analyze_chunk, chunk))
+                        if len(pending) >= window:
+                            self._collect(pending, options['unordered'], emit)
+                    while pending:
+                        self._collect(pending, options['unordered'], emit)
+        finally:
+            if output_file is not None:
+                output_file.close()
+
+        elapsed = time.monotonic() - self.started
+        self.stderr.write(self.style.SUCCESS(
+            f"Analyzed {self.documents} resumes in {elapsed:.1f}s "
+            f"({self.documents / elapsed if elapsed else 0:.1f}/s); {self.errors} failed."
+        ))
+
+    def _collect(self, pending, unordered, emit):
+        """Wait for a work unit and write its results: the oldest one, or any when unordered."""
+        if not unordered:
+            emit(pending.popleft().result())
+            return
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            pending.remove(future)
+            emit(future.result())
+
+    def _report_progress(self):
+        now = time.monotonic()
+        if now - self.reported < self.progress_seconds:
+            return
+        self.reported = now
+        elapsed = now - self.started
+        self.stderr.write(
+            f"{self.documents} resumes, {self.errors} failed, {self.documents / elapsed:.1f}/s"
+        )
+
+    def _walk(self, root):
+        """Yield ('path', relative path, path) for each resume file, in sorted order."""
+        with os.scandir(root) as entries:
+            entries = sorted(entries, key=lambda entry: entry.name)
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                for kind, relative, path in self._walk(entry.path):
+                    yield kind, os.path.join(entry.name, relative), path
+            elif entry.is_file() and os.path.splitext(entry.name)[1].lower() in EXTENSIONS:
+                yield 'path', entry.name, entry.path
+
+    def _read_ndjson(self, path):
+        """Yield ('ndjson', (line number, directory), line) for each non-blank line."""
+        directory = os.path.dirname(os.path.abspath(path))
+        with open(path, encoding='utf-8') as f:
+            for number, line in enumerate(f, 1):
+                if line.strip():
+                    yield 'ndjson', (number, directory), line
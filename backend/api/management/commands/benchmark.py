@@ -0,0 +1,246 @@
+"""
+Benchmark the resume analysis and job matching hot paths.
+"""
+import itertools
+import json
+import os
+import random
+import tracemalloc
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.urls import reverse
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from api.ai.job_matcher import JobMatcher
+from api.ai.match_cache import MatchCache, MemoryMatchCache
+from api.ai.resume_analyzer import AdvancedResumeAnalyzer
+from api.ai.role_classifier import RoleClassifier, seed_documents
+from api.ai.sections import segment
+from api.ai.taxonomy import Taxonomy, current as current_taxonomy
+from api.benchmarks.corpus import DOCUMENT_SIZES, build_corpus, generate_taxonomy
+from api.benchmarks.runner import build_report, compare_to_baseline, load_report, time_callable
+from api.models import Feedback, Resume
+from api.renderers import FastJSONRenderer
+from api.serializers import ResumeSerializer, resume_plain_serializer, with_raw_json
+
+DEFAULT_BASELINE = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    'benchmarks', 'baseline.json',
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Time the NLP stages and the analyze/compare_job endpoints on a seeded "
+        "synthetic corpus, and fail if any case regressed past the stored baseline."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', nargs='+', choices=list(DOCUMENT_SIZES), default=list(DOCUMENT_SIZES),
+                            help="Document size classes to benchmark (default: all).")
+        parser.add_argument('--seed', type=int, default=42, help="Corpus seed (default: 42).")
+        parser.add_argument('--repeat', type=int, default=5, help="Timed runs per case (default: 5).")
+        parser.add_argument('--warmup', type=int, default=1, help="Untimed runs per case (default: 1).")
+        parser.add_argument('--cases', nargs='+', default=None,
+                            help="Only run cases whose name contains one of these substrings.")
+        parser.add_argument('--skip-http', action='store_true', help="Skip the HTTP endpoint cases.")
+        parser.add_argument('--output', default='-',
+                            help="Where to write the JSON report ('-' for stdout, the default).")
+        parser.add_argument('--baseline', default=DEFAULT_BASELINE,
+                            help="Baseline report to compare against.")
+        parser.add_argument('--tolerance', type=float, default=0.25,
+                            help="Allowed fractional slowdown of the median (default: 0.25).")
+        parser.add_argument('--save-baseline', action='store_true',
+                            help="Store this run as the new baseline instead of comparing.")
+        parser.add_argument('--allow-missing-baseline', action='store_true',
+                            help="Only write the report when there is no baseline, instead of failing.")
+
+    def handle(self, *args, **options):
+        self.repeat = max(1, options['repeat'])
+        self.warmup = max(0, options['warmup'])
+        self.filters = options['cases']
+
+        # Checked before running, so a missing baseline fails fast
+        baseline = None
+        if not options['save_baseline']:
+            baseline = load_report(options['baseline'])
+            if baseline is None and not options['allow_missing_baseline']:
+                raise CommandError(
+                    f"No baseline at {options['baseline']}; record one with --save-baseline, "
+                    "or pass --allow-missing-baseline to skip the regression check."
+                )
+
+        corpus = build_corpus(seed=options['seed'], sizes=options['sizes'])
+
+        results = {}
+        results.update(self._run_engine_cases(corpus))
+        results.update(self._run_serialization_cases(corpus))
+        if not options['skip_http']:
+            results.update(self._run_http_cases(corpus))
+
+        report = build_report(results, options['seed'], self.repeat)
+        self._write(report, options['output'])
+
+        if options['save_baseline']:
+            self._write(report, options['baseline'])
+            self.stderr.write(f"Baseline saved to {options['baseline']}")
+            return
+
+        if baseline is None:
+            self.stderr.write(f"No baseline at {options['baseline']}; skipping regression check.")
+            return
+
+        regressions = compare_to_baseline(results, baseline, tolerance=options['tolerance'])
+        for regression in regressions:
+            self.stderr.write(
+                f"REGRESSION {regression['case']}: {regression['baseline_ms']}ms -> "
+                f"{regression['current_ms']}ms (x{regression['slowdown']})"
+            )
+        if regressions:
+            raise CommandError(f"{len(regressions)} benchmark case(s) regressed past the baseline")
+
+    def _selected(self, name):
+        return not self.filters or any(f in name for f in self.filters)
+
+    def _time(self, results, name, func, setup=None):
+        if self._selected(name):
+            self.stderr.write(f"running {name}")
+            results[name] = time_callable(func, repeat=self.repeat, warmup=self.warmup, setup=setup)
+
+    def _run_engine_cases(self, corpus):
+        analyzer = AdvancedResumeAnalyzer()
+        centroid_analyzer = AdvancedResumeAnalyzer()
+        centroid_analyzer.role_classifier = RoleClassifier.train(seed_documents(centroid_analyzer))
+        job_matcher = JobMatcher()
+        # In-process tier only; warmed by the first timed call
+        cached_matches = MatchCache(memory=MemoryMatchCache())
+        results = {}
+
+        # Compiling a large taxonomy, as each worker does for a new version
+        large_taxonomy = generate_taxonomy(random.Random(0), skills=10000)
+        self._time(results, "compile_taxonomy/10k_skills", lambda: Taxonomy.compile(large_taxonomy))
+        if "compile_taxonomy/10k_skills" in results:
+            tracemalloc.start()
+            compiled = Taxonomy.compile(large_taxonomy)
+            results["compile_taxonomy/10k_skills"]['compiled_kib'] = round(
+                tracemalloc.get_traced_memory()[0] / 1024, 1)
+            tracemalloc.stop()
+        else:
+            compiled = Taxonomy.compile(large_taxonomy)
+
+        for size, pairs in corpus.items():
+            resume, job = pairs[0]
+            self._time(results, f"preprocess_text/{size}", lambda: analyzer.preprocess_text(resume))
+            self._time(results, f"extract_keywords/{size}", lambda: analyzer.extract_keywords(resume))
+            self._time(results, f"identify_job_role/{size}", lambda: analyzer.identify_job_role(resume))
+            self._time(results, f"identify_job_role_centroid/{size}",
+                       lambda: centroid_analyzer.identify_job_role(resume))
+            self._time(results, f"segment/{size}", lambda: segment(resume))
+            self._time(results, f"analyze_resume/{size}", lambda: analyzer.analyze_resume(resume))
+            self._time(results, f"analyze_resume_sectioned/{size}",
+                       lambda: analyzer.analyze_resume(resume, section_scoring=True))
+            self._time(results, f"analyze_resume_score_only/{size}",
+                       lambda: analyzer.analyze_resume(resume, fields=['score', 'category_scores']))
+            self._time(results, f"calculate_match_score/{size}",
+                       lambda: job_matcher.calculate_match_score(resume, job))
+            prepared_job = job_matcher.prepare_job(job)
+            self._time(results, f"calculate_match_score_prepared/{size}",
+                       lambda: job_matcher.calculate_match_score(resume, job, prepared_job=prepared_job))
+            self._time(results, f"calculate_match_score_cached/{size}",
+                       lambda: cached_matches.get_or_compute(
+                           resume, job, lambda: job_matcher.calculate_match_score(resume, job),
+                           current_taxonomy().version))
+            preprocessed_resume = job_matcher.preprocess_text(resume).split()
+            self._time(results, f"extract_skills_10k_taxonomy/{size}",
+                       lambda: compiled.categorize(preprocessed_resume))
+
+        return results
+
+    def _run_serialization_cases(self, corpus, count=50):
+        """
+        Time reading and rendering a list of analyzed resumes, through the
+        ModelSerializer and JSONRenderer and through the fast read path.
+        Every row written is rolled back.
+        """
+        results = {}
+        if not any(self._selected(f"serialize_resumes_{path}") for path in ('drf', 'fast')):
+            return results
+        analyzer = AdvancedResumeAnalyzer()
+
+        with transaction.atomic():
+            for size, pairs in corpus.items():
+                resume_text = pairs[0][0]
+                user = User.objects.create_user(f'benchmark-serialization-{size}', password=None)
+                feedback = analyzer.analyze_resume(resume_text)
+                sections = [[name, start, end] for name, start, end in segment(resume_text)]
+                resumes = Resume.objects.bulk_create(
+                    Resume(user=user, file_path=f"benchmark-{i}.txt", content=resume_text, score=feedback['score'],
+                           feedback=feedback, sections=sections)
+                    for i in range(count)
+                )
+                Feedback.objects.bulk_create(
+                    Feedback(resume=resume, category=category, content=feedback['feedback'][category],
+                             score=feedback['category_scores'][category])
+                    for resume in resumes for category in feedback['category_scores']
+                )
+                resumes = Resume.objects.filter(user=user).select_related('user').prefetch_related('detailed_feedback')
+
+                self._time(results, f"serialize_resumes_drf/{size}",
+                           lambda: JSONRenderer().render(ResumeSerializer(resumes.all(), many=True).data))
+                self._time(results, f"serialize_resumes_fast/{size}",
+                           lambda: FastJSONRenderer().render(resume_plain_serializer.many(
+                               with_raw_json(resumes.all(), 'feedback', 'sections'))))
+
+            transaction.set_rollback(True)
+
+        return results
+
+    def _run_http_cases(self, corpus):
+        """Time the endpoints end to end; every row written is rolled back."""
+        results = {}
+
+        with transaction.atomic():
+            user = User.objects.create_user('benchmark-user', password=None)
+            client = APIClient()
+            client.force_authenticate(user=user)
+            counter = itertools.count()
+
+            for size, pairs in corpus.items():
+                resume_text, job = pairs[0]
+
+                def new_resume():
+                    # Analysis stores per-category feedback, so each timed
+                    # request gets a fresh resume.
+                    return Resume.objects.create(
+                        user=user,
+                        file_path=f"benchmark-{next(counter)}.txt",
+                        content=resume_text,
+                    ).id
+
+                def post(action, resume_id, data=None):
+                    response = client.post(reverse(f'resume-{action}', args=[resume_id]), data or {})
+                    if response.status_code != 200:
+                        raise CommandError(f"{action} returned {response.status_code}: {response.data}")
+
+                self._time(results, f"http.analyze/{size}",
+                           lambda resume_id: post('analyze', resume_id), setup=new_resume)
+                self._time(results, f"http.compare_job/{size}",
+                           lambda resume_id: post('compare-job', resume_id,
+                                                  {'job_title': 'Engineer', 'job_description': job}),
+                           setup=new_resume)
+
+            transaction.set_rollback(True)
+
+        return results
+
+    def _write(self, report, destination):
+        payload = json.dumps(report, indent=2, sort_keys=True)
+        if destination == '-':
+            self.stdout.write(payload)
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(destination)), exist_ok=True)
+        with open(destination, 'w', encoding='utf-8') as output:
+            output.write(payload + '\n')
@@ -0,0 +1,128 @@
+"""
+Remove stored resume files that no Resume row references any more.
+"""
+import itertools
+import json
+import os
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from api.adapters.services import FileService
+from api.models import Resume
+
+
+class Command(BaseCommand):
+    help = (
+        "Garbage-collect orphaned files under media/resumes. Work is done one "
+        "shard at a time in fixed-size batches and checkpointed, so the command "
+        "can be interrupted and resumed."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help="Number of files checked against the database per query (default: 1000).",
+        )
+        parser.add_argument(
+            '--grace-seconds',
+            type=int,
+            default=3600,
+            help="Never delete files modified more recently than this (default: 3600). "
+                 "Protects uploads whose Resume row is not committed yet.",
+        )
+        parser.add_argument(
+            '--checkpoint',
+            default=None,
+            help="Checkpoint file (default: <MEDIA_ROOT>/.gc_media_checkpoint).",
+        )
+        parser.add_argument(
+            '--restart',
+            action='store_true',
+            help="Ignore any existing checkpoint and start from the first shard.",
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help="Report orphans without deleting them.",
+        )
+
+    def handle(self, *args, **options):
+        file_service = FileService(settings.MEDIA_ROOT)
+        batch_size = max(1, options['batch_size'])
+        cutoff = time.time() - options['grace_seconds']
+        dry_run = options['dry_run']
+        checkpoint_path = options['checkpoint'] or os.path.join(
+            settings.MEDIA_ROOT, '.gc_media_checkpoint'
+        )
+
+        last_done = None if options['restart'] else self._read_checkpoint(checkpoint_path)
+        if last_done is not None:
+            self.stdout.write(f"Resuming after shard '{last_done}'")
+
+        scanned = orphaned = 0
+        for shard, directory in file_service.iter_shards():
+            # Shards are visited in sorted order with the flat directory ('')
+            # first, so everything up to the checkpoint is already done.
+            if last_done is not None and shard <= last_done:
+                continue
+
+            entries = file_service.iter_files(directory)
+            while True:
+                batch = list(itertools.islice(entries, batch_size))
+                if not batch:
+                    break
+                scanned += len(batch)
+                orphaned += self._collect_batch(file_service, batch, cutoff, dry_run)
+
+            if not dry_run:
+                self._write_checkpoint(checkpoint_path, shard)
+
+        if not dry_run and os.path.exists(checkpoint_path):
+            os.remove(checkpoint_path)
+
+        verb = "Found" if dry_run else "Removed"
+        self.stdout.write(self.style.SUCCESS(
+            f"Scanned {scanned} files. {verb} {orphaned} orphaned files."
+        ))
+
+    def _collect_batch(self, file_service, batch, cutoff, dry_run):
+        """Delete the files in one batch that no Resume references."""
+        paths = [entry.path for entry in batch]
+        referenced = set(
+            Resume.objects.filter(file_path__in=paths).values_list('file_path', flat=True)
+        )
+
+        orphaned = 0
+        for entry in batch:
+            if entry.path in referenced:
+                continue
+            try:
+                if entry.stat(follow_symlinks=False).st_mtime > cutoff:
+                    continue
+            except FileNotFoundError:
+                continue
+
+            orphaned += 1
+            if dry_run:
+                self.stdout.write(f"orphan: {entry.path}")
+            else:
+                file_service.delete(entry.path)
+
+        return orphaned
+
+    def _read_checkpoint(self, path):
+        try:
+            with open(path, 'r', encoding='utf-8') as checkpoint:
+                return json.load(checkpoint).get('last_shard')
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def _write_checkpoint(self, path, shard):
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as checkpoint:
+            json.dump({'last_shard': shard}, checkpoint)
+        os.replace(tmp_path, path)
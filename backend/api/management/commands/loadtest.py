@@ -0,0 +1,298 @@
+"""
+Drive mixed API traffic against a running server and report latency.
+"""
+import json
+import math
+import random
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+from importlib import import_module
+
+from django.conf import settings
+from django.contrib.auth import BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.crypto import get_random_string
+
+from api.benchmarks.corpus import DOCUMENT_SIZES, generate_job_description, generate_resume
+
+USER_PREFIX = 'loadtest-'
+DEFAULT_MIX = 'upload=1,analyze=3,compare_job=2,list=2,retrieve=2'
+ENDPOINTS = ('upload', 'analyze', 'compare_job', 'list', 'retrieve')
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = math.ceil(fraction * len(sorted_values))
+    return sorted_values[max(0, min(len(sorted_values), rank) - 1)]
+
+
+def encode_multipart(fields, files=None):
+    """
+    Encode form fields and files as multipart/form-data.
+
+    Returns:
+        Tuple of (body bytes, content type header).
+    """
+    boundary = uuid.uuid4().hex
+    parts = []
+    for name, value in fields.items():
+        parts.append(
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode('utf-8')
+        )
+    for name, (filename, content) in (files or {}).items():
+        parts.append(
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"; filename="{filename}"\r\n'
+            f'Content-Type: text/plain\r\n\r\n'.encode('utf-8') + content + b'\r\n'
+        )
+    parts.append(f'--{boundary}--\r\n'.encode('utf-8'))
+    return b''.join(parts), f'multipart/form-data; boundary={boundary}'
+
+
+class LoadClient:
+    """
+    A minimal HTTP client for one load test user.
+
+    Requests authenticate with a pre-created session rather than Basic
+    auth, so password hashing does not dominate the measured latency.
+    """
+
+    def __init__(self, base_url, session_key, csrf_token, timeout):
+        self.base_url = base_url.rstrip('/')
+        self.cookie = (
+            f'{settings.SESSION_COOKIE_NAME}={session_key}; {settings.CSRF_COOKIE_NAME}={csrf_token}'
+        )
+        self.csrf_token = csrf_token
+        self.timeout = timeout
+        self.resume_ids = []
+        self.lock = threading.Lock()
+
+    def request(self, method, path, fields=None, files=None):
+        """
+        Send a request.
+
+        Returns:
+            Tuple of (status code, decoded JSON body or None).
+        """
+        headers = {'Cookie': self.cookie, 'X-CSRFToken': self.csrf_token, 'Accept': 'application/json'}
+        body = None
+        if fields is not None or files is not None:
+            body, headers['Content-Type'] = encode_multipart(fields or {}, files)
+
+        request = urllib.request.Request(self.base_url + path, data=body, headers=headers, method=method)
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                payload = response.read()
+                status = response.status
+        except urllib.error.HTTPError as e:
+            payload, status = e.read(), e.code
+
+        try:
+            return status, json.loads(payload) if payload else None
+        except ValueError:
+            return status, None
+
+    def upload(self, resume_text):
+        status, data = self.request(
+            'POST', '/api/resumes/upload/',
+            files={'file': (f'{uuid.uuid4().hex}.txt', resume_text.encode('utf-8'))},
+        )
+        if status == 201 and data:
+            with self.lock:
+                self.resume_ids.append(data['id'])
+        return status
+
+    def pick_resume(self, rng):
+        with self.lock:
+            return rng.choice(self.resume_ids) if self.resume_ids else None
+
+
+class Command(BaseCommand):
+    help = (
+        "Create load test users, upload synthetic resumes and drive concurrent "
+        "mixed traffic against a running server, reporting throughput, latency "
+        "percentiles and error rates per endpoint."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--base-url', default='http://127.0.0.1:8000',
+                            help="Server to load (default: http://127.0.0.1:8000).")
+        parser.add_argument('--users', type=int, default=5, help="Test users to create (default: 5).")
+        parser.add_argument('--resumes-per-user', type=int, default=3,
+                            help="Resumes uploaded per user before traffic starts (default: 3).")
+        parser.add_argument('--concurrency', type=int, default=8, help="Worker threads (default: 8).")
+        parser.add_argument('--rate', type=float, default=0,
+                            help="Target requests per second across all workers; 0 sends as fast "
+                                 "as the workers can (default: 0).")
+        parser.add_argument('--duration', type=float, default=30, help="Seconds of traffic (default: 30).")
+        parser.add_argument('--mix', default=DEFAULT_MIX,
+                            help=f"Endpoint weights (default: {DEFAULT_MIX}).")
+        parser.add_argument('--size', choices=list(DOCUMENT_SIZES), default='typical',
+                            help="Synthetic document size (default: typical).")
+        parser.add_argument('--seed', type=int, default=42, help="Seed for documents and traffic (default: 42).")
+        parser.add_argument('--timeout', type=float, default=60, help="Per-request timeout in seconds (default: 60).")
+        parser.add_argument('--keep-users', action='store_true',
+                            help="Keep the test users and their resumes afterwards.")
+        parser.add_argument('--json', action='store_true', help="Print the report as JSON.")
+
+    def handle(self, *args, **options):
+        mix = self._parse_mix(options['mix'])
+        self.size = options['size']
+        rng = random.Random(options['seed'])
+
+        clients = self._create_users(options)
+        try:
+            self.stderr.write(f"Uploading {options['resumes_per_user']} resumes for {len(clients)} users")
+            for client in clients:
+                for _ in range(options['resumes_per_user']):
+                    status = client.upload(generate_resume(rng, self.size))
+                    if status != 201:
+                        raise CommandError(f"Seeding upload failed with status {status}; is the server running?")
+
+            self.stderr.write(
+                f"Running {options['duration']}s of traffic with {options['concurrency']} workers"
+            )
+            samples, elapsed = self._run_traffic(clients, mix, options)
+        finally:
+            if not options['keep_users']:
+                User.objects.filter(username__startswith=USER_PREFIX).delete()
+
+        report = self._build_report(samples, elapsed)
+        if options['json']:
+            self.stdout.write(json.dumps(report, indent=2))
+        else:
+            self._print(report)
+
+    def _parse_mix(self, spec):
+        mix = {}
+        for item in spec.split(','):
+            name, _, weight = item.partition('=')
+            name = name.strip()
+            if name not in ENDPOINTS:
+                raise CommandError(f"Unknown endpoint '{name}' in --mix; choose from {', '.join(ENDPOINTS)}")
+            mix[name] = float(weight or 1)
+        if not any(mix.values()):
+            raise CommandError("--mix needs at least one positive weight")
+        return mix
+
+    def _create_users(self, options):
+        User.objects.filter(username__startswith=USER_PREFIX).delete()
+        session_store = import_module(settings.SESSION_ENGINE).SessionStore
+        clients = []
+        for index in range(max(1, options['users'])):
+            user = User.objects.create_user(f'{USER_PREFIX}{index}', password=None)
+
+            # Log the user in server-side, as django.contrib.auth.login would
+            session = session_store()
+            session[SESSION_KEY] = str(user.pk)
+            session[BACKEND_SESSION_KEY] = 'django.contrib.auth.backends.ModelBackend'
+            session[HASH_SESSION_KEY] = user.get_session_auth_hash()
+            session.create()
+
+            csrf_token = get_random_string(32)
+            clients.append(LoadClient(options['base_url'], session.session_key, csrf_token, options['timeout']))
+        return clients
+
+    def _run_traffic(self, clients, mix, options):
+        endpoints, weights = zip(*mix.items())
+        samples = []
+        samples_lock = threading.Lock()
+        slot_lock = threading.Lock()
+        next_slot = [0]
+        interval = 1.0 / options['rate'] if options['rate'] > 0 else 0
+        start = time.perf_counter()
+        deadline = start + options['duration']
+
+        def worker(worker_id):
+            rng = random.Random(options['seed'] * 1000 + worker_id)
+            while True:
+                if interval:
+                    # Open-loop pacing: each request takes the next global send slot
+                    with slot_lock:
+                        send_at = start + next_slot[0] * interval
+                        next_slot[0] += 1
+                    delay = send_at - time.perf_counter()
+                    if delay > 0:
+                        time.sleep(delay)
+                if time.perf_counter() >= deadline:
+                    return
+
+                endpoint = rng.choices(endpoints, weights)[0]
+                client = rng.choice(clients)
+                sent = time.perf_counter()
+                try:
+                    status = self._call(endpoint, client, rng)
+                except OSError:
+                    status = None
+                latency = time.perf_counter() - sent
+                with samples_lock:
+                    samples.append((endpoint, latency, status))
+
+        threads = [threading.Thread(target=worker, args=(i,), daemon=True)
+                   for i in range(max(1, options['concurrency']))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        return samples, time.perf_counter() - start
+
+    def _call(self, endpoint, client, rng):
+        if endpoint == 'upload':
+            return client.upload(generate_resume(rng, self.size))
+        if endpoint == 'list':
+            return client.request('GET', '/api/resumes/')[0]
+
+        resume_id = client.pick_resume(rng)
+        if endpoint == 'retrieve':
+            return client.request('GET', f'/api/resumes/{resume_id}/')[0]
+        if endpoint == 'analyze':
+            return client.request('POST', f'/api/resumes/{resume_id}/analyze/', fields={})[0]
+        return client.request('POST', f'/api/resumes/{resume_id}/compare_job/', fields={
+            'job_title': 'Engineer',
+            'job_description': generate_job_description(rng, self.size),
+        })[0]
+
+    def _build_report(self, samples, elapsed):
+        per_endpoint = {}
+        for endpoint in ENDPOINTS:
+            rows = [(latency, status) for name, latency, status in samples if name == endpoint]
+            if not rows:
+                continue
+            latencies = sorted(latency * 1000 for latency, _ in rows)
+            errors = sum(1 for _, status in rows if status is None or status >= 400)
+            per_endpoint[endpoint] = {
+                'requests': len(rows),
+                'errors': errors,
+                'error_rate': round(errors / len(rows), 4),
+                'throughput_rps': round(len(rows) / elapsed, 2),
+                'p50_ms': round(percentile(latencies, 0.50), 1),
+                'p95_ms': round(percentile(latencies, 0.95), 1),
+                'p99_ms': round(percentile(latencies, 0.99), 1),
+            }
+
+        total_errors = sum(stats['errors'] for stats in per_endpoint.values())
+        return {
+            'duration_s': round(elapsed, 2),
+            'requests': len(samples),
+            'throughput_rps': round(len(samples) / elapsed, 2) if elapsed else 0,
+            'error_rate': round(total_errors / len(samples), 4) if samples else 0,
+            'endpoints': per_endpoint,
+        }
+
+    def _print(self, report):
+        self.stdout.write(
+            f"{report['requests']} requests in {report['duration_s']}s "
+            f"({report['throughput_rps']} req/s, {report['error_rate']:.2%} errors)"
+        )
+        self.stdout.write(f"{'endpoint':<12} {'reqs':>6} {'rps':>7} {'err%':>6} {'p50ms':>8} {'p95ms':>8} {'p99ms':>8}")
+        for endpoint, stats in report['endpoints'].items():
+            self.stdout.write(
+                f"{endpoint:<12} {stats['requests']:>6} {stats['throughput_rps']:>7} "
+                f"{stats['error_rate'] * 100:>6.1f} {stats['p50_ms']:>8} {stats['p95_ms']:>8} {stats['p99_ms']:>8}"
+            )
@@ -0,0 +1,29 @@
+"""
+Bound the database caches that requests only ever insert into.
+"""
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from api.adapters.repositories import MatchCacheRepository, SectionCacheRepository
+from api.models import AnalysisSection, MatchResult
+
+
+class Command(BaseCommand):
+    help = (
+        "Drop expired entries of the database match and section caches, and the "
+        "oldest match cache entries beyond ANALYSIS_MATCH_CACHE_DB_ENTRIES. Run it "
+        "periodically, e.g. daily; requests only insert into the caches."
+    )
+
+    def handle(self, *args, **options):
+        match_cache = MatchCacheRepository(
+            MatchResult,
+            max_entries=settings.ANALYSIS_MATCH_CACHE_DB_ENTRIES,
+            retention_days=settings.ANALYSIS_MATCH_CACHE_RETENTION_DAYS
+        )
+        self.stdout.write(f"Dropped {match_cache.prune()} match cache entries")
+
+        section_cache = SectionCacheRepository(
+            AnalysisSection, retention_days=settings.ANALYSIS_SECTION_CACHE_RETENTION_DAYS
+        )
+        self.stdout.write(f"Dropped {section_cache.prune()} section cache entries")
@@ -0,0 +1,77 @@
+"""
+Validate a skill and role taxonomy and publish it to the running workers.
+"""
+import json
+import os
+import tempfile
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from api.ai.taxonomy import Taxonomy, TaxonomyError, taxonomy_path
+
+
+class Command(BaseCommand):
+    help = (
+        "Compile a taxonomy JSON file and atomically replace the published one at "
+        "TAXONOMY_PATH, which must be set. Workers swap to the new version within "
+        "TAXONOMY_CHECK_SECONDS."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('source', help="Taxonomy JSON file to publish.")
+        parser.add_argument('--check', action='store_true', help="Only validate the file.")
+
+    def handle(self, *args, **options):
+        try:
+            with open(options['source'], encoding='utf-8') as f:
+                data = json.load(f)
+            taxonomy = Taxonomy.compile(data)
+        except (OSError, ValueError) as e:
+            raise CommandError(f"Invalid taxonomy {options['source']}: {e}")
+
+        skills = sum(len(skills) for skills in taxonomy.skill_categories.values())
+        summary = f"version {taxonomy.version}: {skills} skills, {len(taxonomy.job_role_keywords)} roles"
+        if options['check']:
+            self.stdout.write(self.style.SUCCESS(f"Valid taxonomy {summary}"))
+            return
+
+        # The shipped taxonomy is seed data in the source tree, which the
+        # next deploy would revert
+        if not settings.TAXONOMY_PATH:
+            raise CommandError(
+                "TAXONOMY_PATH is not set; point it at a writable file outside the source tree to publish"
+            )
+
+        # Versions key cached matches and stored job preparations, so each
+        # published file needs a new one
+        path = taxonomy_path()
+        try:
+            published = Taxonomy.load(path).version
+        except TaxonomyError:
+            published = None
+        if published is not None and taxonomy.version <= published:
+            raise CommandError(
+                f"{path} already has version {published}; publish with a higher version"
+            )
+
+        # Write next to the destination and rename over it, so workers never
+        # read a partial file
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        descriptor, temporary = tempfile.mkstemp(dir=directory, prefix='.taxonomy-', suffix='.json')
+        try:
+            with os.fdopen(descriptor, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=2)
+                f.write('\n')
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temporary, path)
+        except BaseException:
+            os.unlink(temporary)
+            raise
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Published taxonomy {summary} to {path}; workers pick it up within "
+            f"{settings.TAXONOMY_CHECK_SECONDS:g}s"
+        ))
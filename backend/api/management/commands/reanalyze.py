@@ -0,0 +1,172 @@
+"""
+Re-analyze stored resumes whose analysis is stale.
+"""
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, transaction
+
+from api.adapters import reanalysis
+from api.adapters.repositories import FeedbackRepository, ResumeRepository
+from api.adapters.services import ResumeAnalyzerService
+from api.ai import engines
+from api.domain.entities import Resume as ResumeEntity
+from api.domain.use_cases import category_feedback, keep_job_match
+from api.models import Feedback, Resume
+
+
+class Command(BaseCommand):
+    help = (
+        "Re-analyze resumes whose stored analysis came from another analyzer version "
+        "(or is degraded or failed), in primary key order, on a pool of worker processes. "
+        "Results are written per chunk, skipping resumes changed since they were read, and "
+        "progress is checkpointed, so the command can be interrupted and resumed."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--engine', default=None,
+                            help="Engine to analyze with (default: ANALYSIS_ENGINE).")
+        parser.add_argument('--chunk-size', type=int, default=100,
+                            help="Resumes read, analyzed and written per chunk (default: 100).")
+        parser.add_argument('--workers', type=int, default=max(1, (os.cpu_count() or 2) // 2),
+                            help="Worker processes (default: half the CPUs); 0 analyzes in this process.")
+        parser.add_argument('--rate', type=float, default=0,
+                            help="Most resumes analyzed per second (default: 0, unthrottled).")
+        parser.add_argument('--pause', type=float, default=0,
+                            help="Seconds to sleep between chunks (default: 0).")
+        parser.add_argument('--nice', type=int, default=10,
+                            help="Niceness added to the analyzing processes (default: 10).")
+        parser.add_argument('--limit', type=int, default=None, help="Stop after this many resumes.")
+        parser.add_argument('--checkpoint', default=None,
+                            help="Checkpoint file (default: <MEDIA_ROOT>/.reanalyze_checkpoint).")
+        parser.add_argument('--restart', action='store_true',
+                            help="Ignore any existing checkpoint and start from the first resume.")
+        parser.add_argument('--dry-run', action='store_true', help="Only count the stale resumes.")
+
+    def handle(self, *args, **options):
+        engine_name = options['engine'] or settings.ANALYSIS_ENGINE
+        try:
+            engine = engines.get_engine(engine_name)
+        except engines.UnknownEngineError as e:
+            raise CommandError(str(e))
+        version = ResumeAnalyzerService(None, engine=engine).analyzer_version
+        chunk_size = max(1, options['chunk_size'])
+        limit = options['limit']
+
+        # Never-analyzed resumes are left to the analyze endpoint
+        stale = Resume.objects.filter(score__isnull=False).exclude(analyzer_version=version)
+        if options['dry_run']:
+            self.stdout.write(f"{stale.count()} resumes are not analyzed with {version}")
+            return
+
+        checkpoint_path = options['checkpoint'] or os.path.join(settings.MEDIA_ROOT, '.reanalyze_checkpoint')
+        last_id = 0
+        if not options['restart']:
+            checkpoint = self._read_checkpoint(checkpoint_path)
+            # A checkpoint of another version's run does not apply
+            if checkpoint and checkpoint.get('version') == version:
+                last_id = checkpoint['last_id']
+                self.stdout.write(f"Resuming after resume {last_id}")
+
+        resume_repository = ResumeRepository(Resume)
+        feedback_repository = FeedbackRepository(Feedback)
+
+        workers = max(0, options['workers'])
+        if workers:
+            # Forked workers must not share this process's connections
+            connections.close_all()
+            pool = ProcessPoolExecutor(
+                workers, initializer=reanalysis.init_worker, initargs=(engine_name, options['nice'])
+            )
+        else:
+            pool = None
+            reanalysis.init_worker(engine_name, options['nice'])
+
+        def analyze(rows):
+            if pool is None:
+                return map(reanalysis.analyze, rows)
+            return pool.map(reanalysis.analyze, rows, chunksize=max(1, len(rows) // (workers * 4)))
+
+        started = time.monotonic()
+        done = failed = skipped = 0
+        finished = False
+        try:
+            while limit is None or done + failed + skipped < limit:
+                size = chunk_size if limit is None else min(chunk_size, limit - done - failed - skipped)
+                rows = list(
+                    stale.filter(id__gt=last_id).order_by('id')
+                    .values_list('id', 'content', 'sections', 'feedback', 'updated_at')[:size].iterator()
+                )
+                if not rows:
+                    finished = True
+                    break
+                stored_feedback = {row[0]: row[3] for row in rows}
+                read_at = {row[0]: row[4] for row in rows}
+
+                analyzed = []
+                for resume_id, score, feedback, sections in analyze([row[:3] for row in rows]):
+                    analyzer_version = feedback.pop('analyzer_version', None)
+                    if analyzer_version is None:
+                        # Failed analyses stay stale for the next run
+                        failed += 1
+                        continue
+                    # Analyses run without the job description the resume was matched to
+                    keep_job_match(feedback, stored_feedback[resume_id])
+                    analyzed.append(ResumeEntity(
+                        id=resume_id, score=score, feedback=feedback, sections=sections,
+                        analyzer_version=analyzer_version, updated_at=read_at[resume_id]
+                    ))
+
+                with transaction.atomic():
+                    # Resumes analyzed or changed meanwhile keep their newer result
+                    saved = resume_repository.save_analyses(analyzed)
+                    feedback_repository.save_many(
+                        (resume.id, *entry) for resume in saved for entry in category_feedback(resume)
+                    )
+                done += len(saved)
+                skipped += len(analyzed) - len(saved)
+                last_id = rows[-1][0]
+                self._write_checkpoint(checkpoint_path, version, last_id)
+                self.stdout.write(
+                    f"Up to resume {last_id}: {done} re-analyzed, {failed} failed, {skipped} changed meanwhile"
+                )
+
+                if options['rate']:
+                    ahead = (done + failed + skipped) / options['rate'] - (time.monotonic() - started)
+                    if ahead > 0:
+                        time.sleep(ahead)
+                if options['pause']:
+                    time.sleep(options['pause'])
+        finally:
+            if pool is not None:
+                pool.shutdown(cancel_futures=True)
+
+        if finished and os.path.exists(checkpoint_path):
+            os.remove(checkpoint_path)
+
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Re-analyzed {done} resumes with {version} in {elapsed:.1f}s; {failed} failed, "
+            f"{skipped} skipped as changed meanwhile."
+        ))
+        current = ResumeAnalyzerService(None, engine=engine).analyzer_version
+        if current != version:
+            self.stdout.write(self.style.WARNING(f"The analyzer version changed to {current}; run again."))
+
+    def _read_checkpoint(self, path):
+        try:
+            with open(path, 'r', encoding='utf-8') as checkpoint:
+                return json.load(checkpoint)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def _write_checkpoint(self, path, version, last_id):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as checkpoint:
+            json.dump({'version': version, 'last_id': last_id}, checkpoint)
+        os.replace(tmp_path, path)
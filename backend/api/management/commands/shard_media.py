@@ -0,0 +1,93 @@
+"""
+Move resume files from the flat upload directory into the sharded layout.
+"""
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from api.adapters.services import FileService
+from api.models import Resume
+
+
+class Command(BaseCommand):
+    help = "Move files stored directly in media/resumes into hash-sharded subdirectories."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help="Report what would be moved without touching files or rows.",
+        )
+        parser.add_argument(
+            '--progress-every',
+            type=int,
+            default=1000,
+            help="Print progress after this many files (default: 1000).",
+        )
+
+    def handle(self, *args, **options):
+        file_service = FileService(settings.MEDIA_ROOT)
+        dry_run = options['dry_run']
+        progress_every = max(1, options['progress_every'])
+
+        moved = 0
+        # Files are streamed from the directory listing, so the flat directory
+        # never has to be held in memory, however many files it contains.
+        for entry in file_service.iter_files(file_service.upload_dir):
+            if not dry_run:
+                self._move(file_service, entry.path)
+            moved += 1
+            if moved % progress_every == 0:
+                self.stdout.write(f"{moved} files processed")
+
+        repaired = self._repair_references(file_service, dry_run)
+
+        verb = "Would move" if dry_run else "Moved"
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {moved} files; repaired {repaired} stale references."
+        ))
+
+    def _move(self, file_service, old_path):
+        """Move one file and repoint the rows that reference it."""
+        filename = os.path.basename(old_path)
+        shard_dir = file_service.shard_dir(filename)
+        new_path = os.path.join(shard_dir, filename)
+        os.makedirs(shard_dir, exist_ok=True)
+
+        # The row update is rolled back if the rename fails, so a row never
+        # points at a file that was not moved.
+        with transaction.atomic():
+            Resume.objects.filter(file_path=old_path).update(file_path=new_path)
+            os.replace(old_path, new_path)
+
+    def _repair_references(self, file_service, dry_run):
+        """
+        Fix rows still pointing at the flat directory after an interrupted run.
+
+        A crash between the rename and the commit leaves the file in its shard
+        while the row keeps the old path; re-running the command heals it.
+        """
+        repaired = 0
+        prefix = os.path.join(file_service.upload_dir, '')
+        stale = (
+            Resume.objects.filter(file_path__startswith=prefix)
+            .only('id', 'file_path')
+            .order_by('pk')
+            .iterator(chunk_size=2000)
+        )
+        for resume in stale:
+            if os.path.dirname(resume.file_path) != file_service.upload_dir:
+                continue
+            if os.path.exists(resume.file_path):
+                continue
+
+            filename = os.path.basename(resume.file_path)
+            new_path = os.path.join(file_service.shard_dir(filename), filename)
+            if os.path.exists(new_path):
+                if not dry_run:
+                    Resume.objects.filter(pk=resume.pk).update(file_path=new_path)
+                repaired += 1
+
+        return repaired
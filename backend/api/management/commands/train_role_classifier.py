@@ -0,0 +1,101 @@
+"""
+Train the nearest-centroid job role classifier used by the centroid engine.
+"""
+import json
+import os
+import random
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.ai.resume_analyzer import AdvancedResumeAnalyzer
+from api.ai.role_classifier import RoleClassifier, seed_documents
+
+
+class Command(BaseCommand):
+    help = (
+        "Train a role classifier from the built-in role keywords and, optionally, a labeled "
+        "resume corpus, calibrate its confidences on held-out resumes, and write it as an "
+        ".npz artifact for ROLE_CLASSIFIER_PATH."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', required=True, help="Path of the .npz artifact to write.")
+        parser.add_argument('--corpus', default=None,
+                            help="Labeled resumes: a .jsonl file of {\"role\": ..., \"text\": ...} lines, "
+                                 "or a directory with one subdirectory of .txt resumes per role.")
+        parser.add_argument('--holdout', type=float, default=0.2,
+                            help="Fraction of each role's corpus resumes kept for calibration (default: 0.2).")
+        parser.add_argument('--no-seeds', action='store_true',
+                            help="Train on the corpus only, without the built-in role keywords.")
+        parser.add_argument('--seed', type=int, default=42, help="Seed for the holdout split (default: 42).")
+
+    def handle(self, *args, **options):
+        if not 0 <= options['holdout'] < 1:
+            raise CommandError("--holdout must be at least 0 and below 1")
+        output = options['output']
+        if not output.endswith('.npz'):
+            raise CommandError("--output must end in .npz")
+
+        analyzer = AdvancedResumeAnalyzer()
+        labeled = self._load_corpus(options['corpus']) if options['corpus'] else []
+
+        # Hold out the same fraction of every role
+        rng = random.Random(options['seed'])
+        by_role = {}
+        for role, text in labeled:
+            by_role.setdefault(role, []).append(text)
+        training, holdout = [], []
+        for role, texts in sorted(by_role.items()):
+            rng.shuffle(texts)
+            held = int(len(texts) * options['holdout'])
+            holdout += [(role, analyzer.preprocess_text(text)) for text in texts[:held]]
+            training += [(role, analyzer.preprocess_text(text)) for text in texts[held:]]
+
+        if not options['no_seeds']:
+            training += seed_documents(analyzer)
+        if not training:
+            raise CommandError("Nothing to train on: give a --corpus or keep the seeds")
+
+        classifier = RoleClassifier.train(training, holdout=holdout)
+        classifier.save(output)
+
+        self.stdout.write(
+            f"{len(classifier.roles)} roles, {len(classifier.vocabulary)} terms, "
+            f"{len(training)} training documents; temperature {classifier.temperature:.3f}"
+            + ("" if holdout else " (uncalibrated: no held-out resumes)")
+        )
+        if holdout:
+            predictions = [classifier.predict(text)[0] for _, text in holdout]
+            accuracy = sum(role == predicted for (role, _), (predicted, _) in zip(holdout, predictions)) / len(holdout)
+            confidence = sum(confidence for _, confidence in predictions) / len(predictions)
+            self.stdout.write(
+                f"Held-out resumes: {len(holdout)}, top-1 accuracy {accuracy:.3f}, mean confidence {confidence:.3f}"
+            )
+        self.stdout.write(self.style.SUCCESS(f"Wrote {output}"))
+
+    def _load_corpus(self, path):
+        if os.path.isdir(path):
+            documents = []
+            for role in sorted(os.listdir(path)):
+                role_dir = os.path.join(path, role)
+                if not os.path.isdir(role_dir):
+                    continue
+                for name in sorted(os.listdir(role_dir)):
+                    if name.endswith('.txt'):
+                        with open(os.path.join(role_dir, name), encoding='utf-8', errors='replace') as f:
+                            documents.append((role, f.read()))
+            return documents
+
+        if not os.path.isfile(path):
+            raise CommandError(f"Corpus {path} does not exist")
+        documents = []
+        with open(path, encoding='utf-8') as f:
+            for number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                    documents.append((record['role'], record['text']))
+                except (ValueError, KeyError):
+                    raise CommandError(f"{path}:{number}: expected a JSON object with 'role' and 'text'")
+        return documents
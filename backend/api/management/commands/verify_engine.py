@@ -0,0 +1,83 @@
+"""
+Verify that a candidate analysis engine reproduces the reference scores.
+"""
+import json
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.benchmarks.corpus import DOCUMENT_SIZES, build_corpus
+from api.benchmarks.equivalence import DEFAULT_TOLERANCES, load_engine, verify_equivalence
+
+
+class Command(BaseCommand):
+    help = (
+        "Run a reference corpus through the reference and a candidate engine, "
+        "diff score, category_scores, job_role, keywords and overall_match_score, "
+        "and report drift and speedup. Exits non-zero when drift exceeds tolerance."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--candidate', required=True,
+                            help="Registered engine name, or dotted path to an engine class or factory.")
+        parser.add_argument('--reference', default='legacy',
+                            help="Engine whose outputs are treated as correct (default: legacy).")
+        parser.add_argument('--sizes', nargs='+', choices=list(DOCUMENT_SIZES), default=list(DOCUMENT_SIZES),
+                            help="Synthetic document size classes (default: all).")
+        parser.add_argument('--count', type=int, default=10,
+                            help="Synthetic documents per size class (default: 10).")
+        parser.add_argument('--seed', type=int, default=42, help="Corpus seed (default: 42).")
+        parser.add_argument('--corpus-dir', default=None,
+                            help="Directory of .txt resumes to check in addition to the synthetic corpus.")
+        parser.add_argument('--tolerance', action='append', default=[], metavar='FIELD=VALUE',
+                            help=f"Override a tolerance; fields: {', '.join(DEFAULT_TOLERANCES)}.")
+        parser.add_argument('--json', action='store_true', help="Print the full report as JSON.")
+
+    def handle(self, *args, **options):
+        tolerances = self._parse_tolerances(options['tolerance'])
+        try:
+            reference = load_engine(options['reference'])
+            candidate = load_engine(options['candidate'])
+        except (ImportError, AttributeError, ValueError) as e:
+            raise CommandError(f"Could not load engine: {e}")
+
+        report = verify_equivalence(reference, candidate, self._documents(options), tolerances)
+
+        if options['json']:
+            self.stdout.write(json.dumps(report, indent=2))
+        else:
+            self.stdout.write(
+                f"{report['documents_checked']} documents; reference {report['reference_seconds']}s, "
+                f"candidate {report['candidate_seconds']}s (speedup x{report['speedup']})"
+            )
+            self.stdout.write("Max drift: " + ', '.join(f"{k}={v}" for k, v in sorted(report['max_drift'].items())))
+            for failure in report['failures']:
+                self.stdout.write(f"  {failure['document']}: {'; '.join(failure['violations'])}")
+
+        if not report['passed']:
+            raise CommandError(f"{len(report['failures'])} document(s) drifted past tolerance")
+
+    def _parse_tolerances(self, items):
+        tolerances = {}
+        for item in items:
+            field, _, value = item.partition('=')
+            if field not in DEFAULT_TOLERANCES:
+                raise CommandError(f"Unknown tolerance field '{field}'")
+            try:
+                tolerances[field] = float(value)
+            except ValueError:
+                raise CommandError(f"Tolerance for '{field}' must be a number")
+        return tolerances
+
+    def _documents(self, options):
+        corpus = build_corpus(seed=options['seed'], sizes=options['sizes'], count=options['count'])
+        for size, pairs in corpus.items():
+            for index, (resume, job) in enumerate(pairs):
+                yield f"{size}-{index}", resume, job
+
+        corpus_dir = options['corpus_dir']
+        if corpus_dir:
+            for name in sorted(os.listdir(corpus_dir)):
+                if name.endswith('.txt'):
+                    with open(os.path.join(corpus_dir, name), 'r', encoding='utf-8') as f:
+                        yield name, f.read(), None
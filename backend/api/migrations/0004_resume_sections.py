@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 10:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0003_analysis_section'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='resume',
+            name='sections',
+            field=models.JSONField(blank=True, null=True),
+        ),
+    ]
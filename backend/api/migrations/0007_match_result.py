@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-19 10:41
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0006_job_description'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MatchResult',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('resume_hash', models.CharField(max_length=64)),
+                ('job_hash', models.CharField(max_length=64)),
+                ('matcher_version', models.IntegerField()),
+                ('result', models.JSONField()),
+                ('created_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+            ],
+            options={
+                'unique_together': {('resume_hash', 'job_hash', 'matcher_version')},
+            },
+        ),
+    ]
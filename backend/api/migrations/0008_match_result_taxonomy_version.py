@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-19 10:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0007_match_result'),
+    ]
+
+    operations = [
+        migrations.AlterUniqueTogether(
+            name='matchresult',
+            unique_together=set(),
+        ),
+        migrations.AddField(
+            model_name='matchresult',
+            name='taxonomy_version',
+            field=models.IntegerField(default=1),
+        ),
+        migrations.AlterUniqueTogether(
+            name='matchresult',
+            unique_together={('resume_hash', 'job_hash', 'matcher_version', 'taxonomy_version')},
+        ),
+    ]
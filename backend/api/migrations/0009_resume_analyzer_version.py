@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 10:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0008_match_result_taxonomy_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='resume',
+            name='analyzer_version',
+            field=models.CharField(blank=True, db_index=True, max_length=100, null=True),
+        ),
+    ]
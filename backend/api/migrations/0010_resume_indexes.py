@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-19 11:03
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0009_resume_analyzer_version'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='resume',
+            index=models.Index(fields=['user', 'created_at'], name='api_resume_user_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='resume',
+            index=models.Index(fields=['user', 'score'], name='api_resume_user_score_idx'),
+        ),
+    ]
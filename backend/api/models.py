@@ -11,9 +11,21 @@ class Resume(models.Model):
     content = models.TextField()
     score = models.IntegerField(null=True, blank=True)
     feedback = models.JSONField(null=True, blank=True)
+    # [name, start, end] offsets into content, see api.ai.sections.segment
+    sections = models.JSONField(null=True, blank=True)
+    # Engine version of the stored analysis; None when it is missing,
+    # degraded or failed (see api.ai.engines)
+    analyzer_version = models.CharField(max_length=100, null=True, blank=True, db_index=True)
     created_at = models.DateTimeField(default=timezone.now)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        # Per-user date and score range scans of exports and stats
+        indexes = [
+            models.Index(fields=['user', 'created_at'], name='api_resume_user_created_idx'),
+            models.Index(fields=['user', 'score'], name='api_resume_user_score_idx'),
+        ]
+
     def __str__(self):
         return f"Resume for {self.user.username} (ID: {self.id})"
 
@@ -40,3 +52,94 @@ class Feedback(models.Model):
 
     def __str__(self):
         return f"Feedback for {self.resume.user.username}'s resume - {self.category}"
+
+
+class JobDescription(models.Model):
+    """Model for a job description that resumes can be matched against."""
+
+    created_by = models.ForeignKey(
+        User, on_delete=models.SET_NULL, null=True, blank=True, related_name='job_descriptions'
+    )
+    title = models.CharField(max_length=255)
+    description = models.TextField()
+    company = models.CharField(max_length=255, blank=True)
+    location = models.CharField(max_length=255, blank=True)
+    # Job side of the match (normalized tokens, skills), computed on save
+    prepared = models.JSONField(null=True, blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.title} at {self.company}" if self.company else self.title
+
+
+class RequestProfile(models.Model):
+    """Model for storing a cProfile capture of a single API request."""
+
+    user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='request_profiles')
+    method = models.CharField(max_length=10)
+    path = models.CharField(max_length=255)
+    view_name = models.CharField(max_length=100)
+    status_code = models.IntegerField()
+    duration_ms = models.FloatField()
+    sampled = models.BooleanField(default=False)
+    profile_path = models.CharField(max_length=255)
+    summary = models.TextField()
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"Profile of {self.method} {self.path} ({self.duration_ms:.0f} ms)"
+
+
+class AnalysisSection(models.Model):
+    """Model caching the preprocessed text of one resume section, by content."""
+
+    fingerprint = models.CharField(max_length=64, unique=True)
+    preprocessed = models.TextField()
+    created_at = models.DateTimeField(default=timezone.now, db_index=True)
+
+    def __str__(self):
+        return f"Section {self.fingerprint[:12]}"
+
+
+class IdempotencyKey(models.Model):
+    """Model recording a request made with an Idempotency-Key and its response."""
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='idempotency_keys')
+    key = models.CharField(max_length=255)
+    path = models.CharField(max_length=255)
+    # SHA-256 of the request's method, query parameters and body
+    fingerprint = models.CharField(max_length=64)
+    # Both null while the original request is still in flight
+    status_code = models.IntegerField(null=True, blank=True)
+    response = models.JSONField(null=True, blank=True)
+    created_at = models.DateTimeField(default=timezone.now, db_index=True)
+
+    class Meta:
+        unique_together = ('user', 'key')
+
+    def __str__(self):
+        return f"Idempotency key {self.key} for {self.path}"
+
+
+class MatchResult(models.Model):
+    """Model caching the match result of one resume and job description pair, by content."""
+
+    resume_hash = models.CharField(max_length=64)
+    job_hash = models.CharField(max_length=64)
+    matcher_version = models.IntegerField()
+    taxonomy_version = models.IntegerField(default=1)
+    result = models.JSONField()
+    created_at = models.DateTimeField(default=timezone.now, db_index=True)
+
+    class Meta:
+        unique_together = ('resume_hash', 'job_hash', 'matcher_version', 'taxonomy_version')
+
+    def __str__(self):
+        return f"Match {self.resume_hash[:12]} / {self.job_hash[:12]}"
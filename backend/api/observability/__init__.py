@@ -0,0 +1,7 @@
+"""
+Observability for the resume analyzer: in-process metrics, timing spans
+and their HTTP exposition.
+
+The metrics, timing and memory modules must not import Django, because
+the AI layer uses them and is meant to stay framework independent.
+"""
@@ -0,0 +1,190 @@
+"""
+Opt-in memory profiling of analysis stages.
+
+When enabled, tracemalloc is started and every timing span also records
+how much traced memory its stage left allocated. The outermost span in a
+context (e.g. 'analyzer.category_scoring', not the 'analyzer.preprocess'
+calls nested inside it) additionally takes a tracemalloc snapshot before
+and after, and the allocation sites that grew most are aggregated per
+stage. Snapshots are expensive, so this mode is meant for diagnosis and
+container sizing, not for steady-state production traffic.
+"""
+import contextvars
+import os
+import resource
+import sys
+import threading
+import tracemalloc
+
+from .metrics import REGISTRY
+
+# Allocation sites kept per stage between reports
+MAX_SITES_PER_STAGE = 50
+
+_enabled = False
+_top_n = 10
+_lock = threading.Lock()
+_stages = {}
+_depth = contextvars.ContextVar('memory_span_depth', default=0)
+
+_SNAPSHOT_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    # The profiler's own bookkeeping
+    tracemalloc.Filter(False, os.path.join(os.path.dirname(os.path.abspath(__file__)), '*')),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+    tracemalloc.Filter(False, '<unknown>'),
+)
+
+
+def current_rss_bytes():
+    """Get the resident set size of this process, or None if unknown."""
+    try:
+        with open('/proc/self/statm', 'r') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def peak_rss_bytes():
+    """Get the peak resident set size of this process."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+REGISTRY.gauge(
+    'process_resident_memory_bytes',
+    'Resident memory size of this worker.',
+    callback=current_rss_bytes,
+)
+REGISTRY.gauge(
+    'process_peak_resident_memory_bytes',
+    'Peak resident memory size of this worker.',
+    callback=peak_rss_bytes,
+)
+
+
+def configure(enabled, top_n=10, frames=1):
+    """
+    Turn memory profiling on or off for this process.
+
+    Args:
+        enabled: Whether to trace allocations.
+        top_n: Allocation sites reported per stage.
+        frames: Traceback depth stored by tracemalloc per allocation.
+    """
+    global _enabled, _top_n
+    _top_n = top_n
+    if enabled and not tracemalloc.is_tracing():
+        tracemalloc.start(frames)
+    elif not enabled and _enabled and tracemalloc.is_tracing():
+        tracemalloc.stop()
+    _enabled = bool(enabled)
+
+
+def is_enabled():
+    """Check whether memory profiling is on."""
+    return _enabled
+
+
+class _StageMemory:
+    __slots__ = ('depth_token', 'traced_before', 'snapshot')
+
+    def __init__(self, depth_token, traced_before, snapshot):
+        self.depth_token = depth_token
+        self.traced_before = traced_before
+        self.snapshot = snapshot
+
+
+def enter_stage():
+    """Start measuring a stage; returns the token to pass to exit_stage."""
+    depth = _depth.get()
+    token = _depth.set(depth + 1)
+    snapshot = _take_snapshot() if depth == 0 else None
+    return _StageMemory(token, tracemalloc.get_traced_memory()[0], snapshot)
+
+
+def exit_stage(component, stage, state):
+    """Finish measuring a stage started with enter_stage."""
+    net_bytes = tracemalloc.get_traced_memory()[0] - state.traced_before
+    _depth.reset(state.depth_token)
+
+    sites = None
+    if state.snapshot is not None:
+        sites = _take_snapshot().compare_to(state.snapshot, 'lineno')[:_top_n]
+
+    name = f"{component}.{stage}"
+    with _lock:
+        record = _stages.setdefault(name, {
+            'calls': 0, 'net_bytes': 0, 'max_net_bytes': 0, 'profiled_calls': 0, 'sites': {},
+        })
+        record['calls'] += 1
+        record['net_bytes'] += net_bytes
+        record['max_net_bytes'] = max(record['max_net_bytes'], net_bytes)
+        if sites is not None:
+            record['profiled_calls'] += 1
+            _merge_sites(record['sites'], sites)
+
+
+def _take_snapshot():
+    return tracemalloc.take_snapshot().filter_traces(_SNAPSHOT_FILTERS)
+
+
+def _merge_sites(aggregate, stats):
+    for stat in stats:
+        frame = stat.traceback[0]
+        site = f"{frame.filename}:{frame.lineno}"
+        size_diff, count_diff = aggregate.get(site, (0, 0))
+        aggregate[site] = (size_diff + stat.size_diff, count_diff + stat.count_diff)
+
+    if len(aggregate) > MAX_SITES_PER_STAGE:
+        keep = sorted(aggregate.items(), key=lambda item: item[1][0], reverse=True)[:MAX_SITES_PER_STAGE]
+        aggregate.clear()
+        aggregate.update(keep)
+
+
+def report():
+    """
+    Build a memory report for this worker.
+
+    Returns:
+        Dictionary with process RSS figures, tracemalloc totals and, per
+        stage, the net bytes left allocated and the top allocation sites.
+    """
+    traced_current, traced_peak = (
+        tracemalloc.get_traced_memory() if tracemalloc.is_tracing() else (None, None)
+    )
+
+    with _lock:
+        stages = {}
+        for name, record in sorted(_stages.items()):
+            top_sites = sorted(record['sites'].items(), key=lambda item: item[1][0], reverse=True)
+            stages[name] = {
+                'calls': record['calls'],
+                'net_bytes': record['net_bytes'],
+                'max_net_bytes': record['max_net_bytes'],
+                'profiled_calls': record['profiled_calls'],
+                'top_sites': [
+                    {'site': site, 'size_diff_bytes': size_diff, 'count_diff': count_diff}
+                    for site, (size_diff, count_diff) in top_sites[:_top_n]
+                ],
+            }
+
+    return {
+        'pid': os.getpid(),
+        'enabled': _enabled,
+        'rss_bytes': current_rss_bytes(),
+        'peak_rss_bytes': peak_rss_bytes(),
+        'traced_current_bytes': traced_current,
+        'traced_peak_bytes': traced_peak,
+        'stages': stages,
+    }
+
+
+def reset():
+    """Forget the per-stage records collected so far."""
+    with _lock:
+        _stages.clear()
+    if tracemalloc.is_tracing():
+        tracemalloc.reset_peak()
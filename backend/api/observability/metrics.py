@@ -0,0 +1,223 @@
+"""
+Minimal in-process metrics with Prometheus text exposition.
+
+Only what the application needs is implemented: labelled counters,
+gauges and fixed-bucket histograms, kept per process and guarded by a
+lock so they can be updated from request threads.
+"""
+import bisect
+import math
+import threading
+
+# Seconds; tuned for NLP stages that range from tens of microseconds to seconds
+DEFAULT_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+
+def _format_value(value):
+    if value == math.inf:
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(labelnames, labelvalues, extra=()):
+    pairs = list(zip(labelnames, labelvalues)) + list(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+class Counter:
+    """A monotonically increasing value per label set."""
+
+    type_name = 'counter'
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labelvalues=(), amount=1):
+        """Increment the counter for a tuple of label values."""
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0) + amount
+
+    def value(self, labelvalues=()):
+        """Get the current value for a tuple of label values."""
+        return self._values.get(labelvalues, 0)
+
+    def samples(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        for labelvalues, value in items:
+            yield f"{self.name}_total{_format_labels(self.labelnames, labelvalues)} {_format_value(value)}"
+
+    def reset(self):
+        with self._lock:
+            self._values.clear()
+
+
+class Gauge:
+    """
+    A value per label set that can go up and down.
+
+    A gauge created with a callback reads its single value from it at
+    render time instead of storing one.
+    """
+
+    type_name = 'gauge'
+
+    def __init__(self, name, documentation, labelnames=(), callback=None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.callback = callback
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def set(self, value, labelvalues=()):
+        """Set the gauge for a tuple of label values."""
+        with self._lock:
+            self._values[labelvalues] = value
+
+    def value(self, labelvalues=()):
+        """Get the current value for a tuple of label values."""
+        if self.callback is not None:
+            return self.callback()
+        return self._values.get(labelvalues)
+
+    def samples(self):
+        if self.callback is not None:
+            items = [((), self.callback())]
+        else:
+            with self._lock:
+                items = sorted(self._values.items())
+        for labelvalues, value in items:
+            if value is not None:
+                yield f"{self.name}{_format_labels(self.labelnames, labelvalues)} {_format_value(value)}"
+
+    def reset(self):
+        with self._lock:
+            self._values.clear()
+
+
+class Histogram:
+    """Observations counted into fixed cumulative buckets per label set."""
+
+    type_name = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, labelvalues=()):
+        """Record one observation for a tuple of label values."""
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labelvalues)
+            if series is None:
+                # [per-bucket counts (+Inf last), sum, count]
+                series = self._series[labelvalues] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def snapshot(self, labelvalues=()):
+        """
+        Get the state of one series.
+
+        Returns:
+            Dictionary with 'count', 'sum' and cumulative 'buckets' as
+            (upper bound, count) pairs, or None if nothing was observed.
+        """
+        with self._lock:
+            series = self._series.get(labelvalues)
+            if series is None:
+                return None
+            counts, total, count = list(series[0]), series[1], series[2]
+
+        cumulative, running = [], 0
+        for bound, bucket_count in zip(self.buckets + (math.inf,), counts):
+            running += bucket_count
+            cumulative.append((bound, running))
+        return {'count': count, 'sum': total, 'buckets': cumulative}
+
+    def samples(self):
+        with self._lock:
+            labelsets = sorted(self._series)
+        for labelvalues in labelsets:
+            snapshot = self.snapshot(labelvalues)
+            for bound, count in snapshot['buckets']:
+                labels = _format_labels(self.labelnames, labelvalues, [('le', _format_value(bound))])
+                yield f"{self.name}_bucket{labels} {count}"
+            labels = _format_labels(self.labelnames, labelvalues)
+            yield f"{self.name}_sum{labels} {_format_value(snapshot['sum'])}"
+            yield f"{self.name}_count{labels} {snapshot['count']}"
+
+    def reset(self):
+        with self._lock:
+            self._series.clear()
+
+
+class Registry:
+    """A named collection of metrics rendered together."""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name, *args, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, *args, **kwargs)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"Metric {name} is already registered as a {metric.type_name}")
+            return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        """Get or create a counter."""
+        return self._get_or_create(Counter, name, documentation, labelnames)
+
+    def gauge(self, name, documentation, labelnames=(), callback=None):
+        """Get or create a gauge."""
+        return self._get_or_create(Gauge, name, documentation, labelnames, callback)
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        """Get or create a histogram."""
+        return self._get_or_create(Histogram, name, documentation, labelnames, buckets)
+
+    def render(self):
+        """Render every metric in the Prometheus text exposition format."""
+        with self._lock:
+            metrics = [self._metrics[name] for name in sorted(self._metrics)]
+
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.type_name}")
+            lines.extend(metric.samples())
+        return '\n'.join(lines) + '\n'
+
+    def reset(self):
+        """Clear all recorded values (used by tests)."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        for metric in metrics:
+            metric.reset()
+
+
+REGISTRY = Registry()
@@ -0,0 +1,189 @@
+"""
+Middleware recording request metrics and exposing observability data.
+"""
+import logging
+from contextlib import ExitStack
+from time import perf_counter
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+from . import timing
+from .metrics import REGISTRY
+
+logger = logging.getLogger('api.requests')
+
+REQUEST_LABELS = ('route', 'method')
+
+REQUESTS = REGISTRY.counter(
+    'http_requests',
+    'Requests handled, by route, method and response status.',
+    labelnames=('route', 'method', 'status'),
+)
+REQUEST_SECONDS = REGISTRY.histogram(
+    'http_request_duration_seconds',
+    'End-to-end request latency.',
+    labelnames=REQUEST_LABELS,
+)
+REQUEST_DB_QUERIES = REGISTRY.histogram(
+    'http_request_db_queries',
+    'Database queries executed per request.',
+    labelnames=REQUEST_LABELS,
+    buckets=(0, 1, 2, 5, 10, 20, 50, 100, 200, 500),
+)
+REQUEST_DB_SECONDS = REGISTRY.histogram(
+    'http_request_db_duration_seconds',
+    'Time spent executing database queries per request.',
+    labelnames=REQUEST_LABELS,
+)
+RESPONSE_BYTES = REGISTRY.histogram(
+    'http_response_size_bytes',
+    'Response body size.',
+    labelnames=REQUEST_LABELS,
+    buckets=(256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216),
+)
+
+
+class QueryRecorder:
+    """
+    Database execute wrapper that tallies queries by SQL text.
+
+    Statements are grouped by their parameterised SQL, so an N+1 pattern
+    shows up as one statement with a high count.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.statements = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        start = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = perf_counter() - start
+            self.count += 1
+            self.seconds += elapsed
+            calls, total = self.statements.get(sql, (0, 0.0))
+            self.statements[sql] = (calls + 1, total + elapsed)
+
+    def top_statements(self, limit=5):
+        """Get the (sql, calls, seconds) tuples that took the most time."""
+        ranked = sorted(self.statements.items(), key=lambda item: item[1][1], reverse=True)
+        return [(sql, calls, seconds) for sql, (calls, seconds) in ranked[:limit]]
+
+
+class MeteredStream:
+    """
+    Streaming response content that counts its bytes and calls
+    finish(size) once, when the response closes it.
+
+    Django closes the response after sending it, and also when the client
+    disconnects or the content is never read.
+    """
+
+    def __init__(self, content, finish):
+        self.content = content
+        self.finish = finish
+        self.size = 0
+        self.finished = False
+
+    def __iter__(self):
+        for chunk in self.content:
+            self.size += len(chunk)
+            yield chunk
+
+    def close(self):
+        if not self.finished:
+            self.finished = True
+            self.finish(self.size)
+
+
+class RequestMetricsMiddleware:
+    """
+    Record latency, database usage, response size and status per route.
+
+    Routes are labelled by URL name (e.g. 'resume-analyze') rather than raw
+    path, so resume IDs do not create new series. Requests slower than
+    SLOW_REQUEST_SECONDS are logged with their most expensive queries.
+    Streaming responses are measured until the stream is closed, since
+    their content is produced while it is sent.
+    """
+
+    def __init__(self, get_response):
+        if not settings.REQUEST_METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.slow_seconds = settings.SLOW_REQUEST_SECONDS
+
+    def __call__(self, request):
+        recorder = QueryRecorder()
+        start = perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(recorder))
+            response = self.get_response(request)
+            if response.streaming:
+                recording = stack.pop_all()
+
+                def finish(size):
+                    recording.close()
+                    self._record(request, response, recorder, perf_counter() - start, size)
+
+                response.streaming_content = MeteredStream(response.streaming_content, finish)
+                return response
+
+        self._record(request, response, recorder, perf_counter() - start, len(response.content))
+        return response
+
+    def _record(self, request, response, recorder, elapsed, size):
+        match = getattr(request, 'resolver_match', None)
+        route = match.view_name if match else 'unmatched'
+        labels = (route, request.method)
+
+        REQUESTS.inc((route, request.method, str(response.status_code)))
+        REQUEST_SECONDS.observe(elapsed, labels)
+        REQUEST_DB_QUERIES.observe(recorder.count, labels)
+        REQUEST_DB_SECONDS.observe(recorder.seconds, labels)
+        RESPONSE_BYTES.observe(size, labels)
+
+        if elapsed >= self.slow_seconds:
+            self._log_slow_request(request, response, route, elapsed, recorder)
+
+    def _log_slow_request(self, request, response, route, elapsed, recorder):
+        breakdown = '\n'.join(
+            f"  {calls}x {seconds * 1000:.1f}ms {sql}"
+            for sql, calls, seconds in recorder.top_statements()
+        )
+        logger.warning(
+            "Slow request %s %s (%s) -> %s in %.3fs; %d queries in %.3fs%s",
+            request.method, request.path, route, response.status_code, elapsed,
+            recorder.count, recorder.seconds, f"\n{breakdown}" if breakdown else '',
+        )
+
+
+class StageTimingMiddleware:
+    """
+    Attach a per-request stage breakdown as a Server-Timing header.
+
+    Only active when both DEBUG and stage timing are on; otherwise Django
+    drops the middleware from the chain at startup.
+    """
+
+    def __init__(self, get_response):
+        if not (settings.DEBUG and timing.is_enabled()):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with timing.collect_spans() as collected:
+            response = self.get_response(request)
+
+        if collected:
+            response['Server-Timing'] = ', '.join(
+                f'{name};dur={seconds * 1000:.2f};desc="{calls} calls"'
+                for name, (seconds, calls) in timing.summarize_spans(collected).items()
+            )
+        return response
@@ -0,0 +1,125 @@
+"""
+On-demand cProfile capture of individual API requests.
+
+A request is profiled when a staff user asks for it, with the
+``X-Profile: 1`` header or the ``?profile=1`` query parameter, or when it
+falls into the PROFILING_SAMPLE_RATE fraction of traffic. The profile is
+dumped in the standard pstats binary format under PROFILE_DIR, and a
+RequestProfile row stores its metadata and a text summary of the top
+functions by cumulative time.
+"""
+import cProfile
+import io
+import logging
+import os
+import pstats
+import random
+import uuid
+from datetime import timedelta
+from time import perf_counter
+
+from django.conf import settings
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = 'HTTP_X_PROFILE'
+PROFILE_QUERY_PARAM = 'profile'
+SUMMARY_LINES = 40
+
+
+def profile_requested(request):
+    """Check whether a staff user explicitly asked to profile this request."""
+    if not (request.user and request.user.is_staff):
+        return False
+    flag = request.META.get(PROFILE_HEADER) or request.query_params.get(PROFILE_QUERY_PARAM)
+    return flag in ('1', 'true', 'True')
+
+
+def summarize(profiler, limit=SUMMARY_LINES):
+    """Render the top functions of a profile by cumulative time."""
+    stream = io.StringIO()
+    stats = pstats.Stats(profiler, stream=stream)
+    stats.strip_dirs().sort_stats(pstats.SortKey.CUMULATIVE).print_stats(limit)
+    return stream.getvalue()
+
+
+class ProfiledViewMixin:
+    """
+    Mixin for DRF views that runs flagged or sampled requests under cProfile.
+
+    Profiling starts after authentication and permission checks, so only
+    the handler and response rendering are measured. The ID of the stored
+    profile is returned in the X-Profile-Id response header.
+    """
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+
+        sampled = False
+        if not profile_requested(request):
+            sampled = random.random() < settings.PROFILING_SAMPLE_RATE
+            if not sampled:
+                return
+
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Another profiler is already active in this thread
+            return
+        self._profiling = (profiler, sampled, perf_counter())
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        profiling = getattr(self, '_profiling', None)
+        if profiling is None:
+            return super().finalize_response(request, response, *args, **kwargs)
+
+        self._profiling = None
+        profiler, sampled, start = profiling
+        try:
+            response = super().finalize_response(request, response, *args, **kwargs)
+            # Render inside the profile so serialization cost is included
+            if hasattr(response, 'render') and not response.is_rendered:
+                response.render()
+        finally:
+            profiler.disable()
+
+        try:
+            profile = self._store_profile(request, response, profiler, sampled, perf_counter() - start)
+            response['X-Profile-Id'] = str(profile.id)
+        except OSError:
+            logger.exception("Could not store request profile")
+        return response
+
+    def _store_profile(self, request, response, profiler, sampled, elapsed):
+        from ..models import RequestProfile
+
+        os.makedirs(settings.PROFILE_DIR, exist_ok=True)
+        profile_path = os.path.join(settings.PROFILE_DIR, f"{uuid.uuid4()}.prof")
+        profiler.dump_stats(profile_path)
+
+        match = request.resolver_match
+        profile = RequestProfile.objects.create(
+            user=request.user if request.user.is_authenticated else None,
+            method=request.method,
+            path=request.path[:255],
+            view_name=match.view_name if match else '',
+            status_code=response.status_code,
+            duration_ms=elapsed * 1000,
+            sampled=sampled,
+            profile_path=profile_path,
+            summary=summarize(profiler),
+        )
+        self._prune_profiles(RequestProfile)
+        return profile
+
+    def _prune_profiles(self, model):
+        cutoff = timezone.now() - timedelta(days=settings.PROFILING_RETENTION_DAYS)
+        expired = model.objects.filter(created_at__lt=cutoff)
+        for profile_path in expired.values_list('profile_path', flat=True).iterator():
+            try:
+                os.remove(profile_path)
+            except FileNotFoundError:
+                pass
+        expired.delete()
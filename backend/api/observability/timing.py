@@ -0,0 +1,126 @@
+"""
+Low-overhead timing spans for analysis stages.
+
+Usage::
+
+    with span('analyzer', 'preprocess'):
+        ...
+
+Every span feeds the ``resume_analyzer_stage_duration_seconds`` histogram.
+Spans nest, and each one records its own wall time, so a parent stage
+includes the time of the stages inside it. Spans also drive the memory
+profiler when that is enabled. With both off, ``span`` returns a shared
+no-op context manager and nothing is measured.
+"""
+import contextvars
+from contextlib import contextmanager
+from time import perf_counter
+
+from . import memory
+from .metrics import REGISTRY
+
+STAGE_SECONDS = REGISTRY.histogram(
+    'resume_analyzer_stage_duration_seconds',
+    'Wall time spent in each analysis stage.',
+    labelnames=('component', 'stage'),
+)
+
+_enabled = False
+
+# Per-request list of (name, seconds) while collect_spans() is active
+_collected = contextvars.ContextVar('collected_spans', default=None)
+
+
+def configure(enabled):
+    """Turn stage timing on or off for this process."""
+    global _enabled
+    _enabled = bool(enabled)
+
+
+def is_enabled():
+    """Check whether stage timing is on."""
+    return _enabled
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ('component', 'stage', 'start', 'memory')
+
+    def __init__(self, component, stage):
+        self.component = component
+        self.stage = stage
+
+    def __enter__(self):
+        self.memory = memory.enter_stage() if memory.is_enabled() else None
+        self.start = perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed = perf_counter() - self.start
+        if _enabled:
+            STAGE_SECONDS.observe(elapsed, (self.component, self.stage))
+            collected = _collected.get()
+            if collected is not None:
+                collected.append((f"{self.component}.{self.stage}", elapsed))
+        if self.memory is not None:
+            memory.exit_stage(self.component, self.stage, self.memory)
+        return False
+
+
+def span(component, stage):
+    """
+    Time a block of code as one stage of a component.
+
+    Args:
+        component: The instrumented unit, e.g. 'analyzer' or 'job_matcher'.
+        stage: The stage within it, e.g. 'preprocess'.
+
+    Returns:
+        A context manager.
+    """
+    if not (_enabled or memory.is_enabled()):
+        return _NULL_SPAN
+    return _Span(component, stage)
+
+
+@contextmanager
+def collect_spans():
+    """
+    Collect the spans finished in the current context.
+
+    Yields:
+        A list that fills with (name, seconds) tuples as spans complete.
+    """
+    collected = []
+    token = _collected.set(collected)
+    try:
+        yield collected
+    finally:
+        _collected.reset(token)
+
+
+def summarize_spans(collected):
+    """
+    Aggregate collected spans by name.
+
+    Returns:
+        Dictionary mapping span name to (total seconds, call count),
+        in first-seen order.
+    """
+    summary = {}
+    for name, seconds in collected:
+        total, calls = summary.get(name, (0.0, 0))
+        summary[name] = (total + seconds, calls + 1)
+    return summary
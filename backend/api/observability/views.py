@@ -0,0 +1,42 @@
+"""
+HTTP exposition of in-process metrics.
+"""
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+from rest_framework import permissions
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.response import Response
+
+from . import memory
+from .metrics import REGISTRY
+
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def metrics_access_allowed(request):
+    """Allow scrapes from configured addresses and from staff sessions."""
+    if request.META.get('REMOTE_ADDR') in settings.METRICS_ALLOWED_IPS:
+        return True
+    user = getattr(request, 'user', None)
+    return bool(user and user.is_staff)
+
+
+def metrics(request):
+    """Render this process's metrics in the Prometheus text format."""
+    if not metrics_access_allowed(request):
+        return HttpResponseForbidden()
+    return HttpResponse(REGISTRY.render(), content_type=PROMETHEUS_CONTENT_TYPE)
+
+
+@api_view(['GET', 'DELETE'])
+@permission_classes([permissions.IsAdminUser])
+def memory_report(request):
+    """
+    Report this worker's memory profile (admin only).
+
+    GET returns the report; DELETE clears the per-stage records so a new
+    measurement window can start.
+    """
+    if request.method == 'DELETE':
+        memory.reset()
+    return Response(memory.report())
@@ -0,0 +1,204 @@
+"""
+Renderers for the resume analyzer API.
+"""
+import csv
+import io
+import json
+import re
+import secrets
+
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:
+    # Optional: FastJSONRenderer falls back to the standard library encoder
+    orjson = None
+
+
+def format_event(event, data):
+    """
+    Format one server-sent event.
+
+    Args:
+        event: The event name.
+        data: JSON-serializable event payload.
+
+    Returns:
+        The encoded event, ready to write to the stream.
+    """
+    payload = json.dumps(data, cls=JSONEncoder, separators=(',', ':'))
+    return f"event: {event}\ndata: {payload}\n\n".encode('utf-8')
+
+
+class EventStreamRenderer(BaseRenderer):
+    """
+    Accepts text/event-stream for streaming actions.
+
+    Streaming actions write their events directly to a StreamingHttpResponse;
+    this renderer only formats the ordinary responses those actions return
+    before streaming starts, such as validation errors, as a single 'error'
+    event.
+    """
+
+    media_type = 'text/event-stream'
+    format = 'sse'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return format_event('error', data)
+
+
+class ExportRenderer(BaseRenderer):
+    """
+    Base for the formats of streamed exports.
+
+    Export actions stream rows through stream(); render() only formats the
+    ordinary responses those actions return before streaming starts, such
+    as validation errors, as a single row.
+    """
+
+    charset = 'utf-8'
+    # Rows encoded per chunk written to the response
+    batch_size = 500
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return b''.join(self.stream([data], list(data)))
+
+    def stream(self, rows, fields):
+        """
+        Encode rows for a StreamingHttpResponse.
+
+        Args:
+            rows: Iterable of dicts keyed by fields.
+            fields: The column names, in order.
+
+        Yields:
+            Encoded chunks of up to batch_size rows.
+        """
+        buffer = io.StringIO()
+        write = self.start(buffer, fields)
+        count = 0
+        for row in rows:
+            write(row)
+            count += 1
+            if count % self.batch_size == 0:
+                yield buffer.getvalue().encode(self.charset)
+                buffer.seek(0)
+                buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue().encode(self.charset)
+
+    def start(self, buffer, fields):
+        """Write any header to buffer and return a function that writes one row."""
+        raise NotImplementedError
+
+
+class NDJSONRenderer(ExportRenderer):
+    """Newline-delimited JSON: one object per row."""
+
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+
+    def start(self, buffer, fields):
+        encoder = JSONEncoder(separators=(',', ':'))
+
+        def write(row):
+            buffer.write(encoder.encode(row))
+            buffer.write('\n')
+        return write
+
+
+class CSVRenderer(ExportRenderer):
+    """CSV with a header row; lists and objects are written as JSON."""
+
+    media_type = 'text/csv'
+    format = 'csv'
+
+    def start(self, buffer, fields):
+        writer = csv.writer(buffer)
+        writer.writerow(fields)
+        encoder = JSONEncoder(separators=(',', ':'))
+
+        def write(row):
+            writer.writerow([
+                encoder.encode(value) if isinstance(value, (list, dict)) else
+                encoder.default(value) if hasattr(value, 'isoformat') else value
+                for value in (row[field] for field in fields)
+            ])
+        return write
+
+
+class RawJSON:
+    """Already-encoded JSON, written into a FastJSONRenderer response as is."""
+
+    __slots__ = ('text',)
+
+    def __init__(self, text):
+        self.text = text
+
+    def __eq__(self, other):
+        return isinstance(other, RawJSON) and other.text == self.text
+
+    def __repr__(self):
+        return f"RawJSON({self.text!r})"
+
+
+class PassthroughJSONEncoder(JSONEncoder):
+    """DRF's JSON encoder, decoding RawJSON values so they can be re-encoded."""
+
+    def default(self, obj):
+        if isinstance(obj, RawJSON):
+            return json.loads(obj.text)
+        return super().default(obj)
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer that encodes with orjson when it is installed, and writes
+    RawJSON values into the output without parsing them.
+
+    The output matches JSONRenderer's compact form. Requests for indented
+    output, such as the browsable API's, are rendered by JSONRenderer.
+    """
+
+    encoder_class = PassthroughJSONEncoder
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if self.get_indent(accepted_media_type or '', renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # RawJSON values are encoded as placeholders, then swapped for their
+        # text in one pass; the token keeps data from forging a placeholder
+        token = secrets.token_hex(8)
+        raw = []
+        encoder = self.encoder_class()
+
+        def default(obj):
+            if isinstance(obj, RawJSON):
+                raw.append(obj.text)
+                return f'\x00{token}{len(raw) - 1}'
+            return encoder.default(obj)
+
+        if orjson is not None:
+            # DRF's encoder formats datetimes ('Z' for UTC) and Decimals
+            body = orjson.dumps(data, default=default,
+                                option=orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS)
+        else:
+            body = json.dumps(
+                data, default=default, ensure_ascii=self.ensure_ascii, allow_nan=not self.strict,
+                separators=(',', ':')
+            ).encode('utf-8')
+
+        if raw:
+            placeholder = re.compile(rb'"\\u0000' + token.encode('ascii') + rb'(\d+)"')
+            body = placeholder.sub(lambda match: raw[int(match.group(1))].encode('utf-8'), body)
+        # Like JSONRenderer, escape the line separators JavaScript rejects
+        return body.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
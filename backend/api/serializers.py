@@ -1,6 +1,20 @@
-from rest_framework import serializers
+from django.conf import settings
 from django.contrib.auth.models import User
-from .models import Resume, Feedback
+from django.db.models import TextField
+from django.db.models.functions import Cast
+from django.db.models.manager import BaseManager
+from django.utils import timezone
+from rest_framework import ISO_8601, serializers
+from rest_framework.settings import api_settings
+
+from .models import Resume, Feedback, RequestProfile, JobDescription
+from .renderers import RawJSON
+
+# Fields whose representation is the model attribute itself
+_PLAIN_FIELDS = (
+    serializers.BooleanField, serializers.CharField, serializers.ChoiceField,
+    serializers.FloatField, serializers.IntegerField, serializers.JSONField,
+)
 
 
 class UserSerializer(serializers.ModelSerializer):
@@ -29,9 +43,9 @@ class ResumeSerializer(serializers.ModelSerializer):
     class Meta:
         model = Resume
         fields = ['id', 'user', 'file_path', 'content', 'score', 'feedback', 
-                  'detailed_feedback', 'created_at', 'updated_at']
+                  'sections', 'analyzer_version', 'detailed_feedback', 'created_at', 'updated_at']
         read_only_fields = ['id', 'user', 'file_path', 'content', 'score', 
-                           'feedback', 'created_at', 'updated_at']
+                           'feedback', 'sections', 'analyzer_version', 'created_at', 'updated_at']
 
 
 class ResumeUploadSerializer(serializers.Serializer):
@@ -55,3 +69,154 @@ class ResumeUploadSerializer(serializers.Serializer):
             )
         
         return value
+
+
+class JobDescriptionSerializer(serializers.ModelSerializer):
+    """Serializer for JobDescription model."""
+    
+    skills = serializers.SerializerMethodField()
+    
+    class Meta:
+        model = JobDescription
+        fields = ['id', 'title', 'description', 'company', 'location', 'skills',
+                  'created_by', 'created_at', 'updated_at']
+        read_only_fields = ['id', 'skills', 'created_by', 'created_at', 'updated_at']
+    
+    def get_skills(self, obj):
+        """The skills extracted from the description, by category."""
+        return (obj.prepared or {}).get('skills')
+
+
+class RequestProfileSerializer(serializers.ModelSerializer):
+    """Serializer for RequestProfile model."""
+
+    class Meta:
+        model = RequestProfile
+        fields = ['id', 'user', 'method', 'path', 'view_name', 'status_code',
+                  'duration_ms', 'sampled', 'summary', 'created_at']
+        read_only_fields = fields
+
+
+def with_raw_json(queryset, *fields):
+    """
+    Read JSON fields of a queryset as their stored text instead of decoding
+    them, for a PlainSerializer to pass through.
+
+    Args:
+        queryset: The queryset to read.
+        *fields: Names of the JSON fields.
+
+    Returns:
+        The queryset, with each field deferred and its text annotated as
+        '<field>_json'.
+    """
+    return queryset.defer(*fields).annotate(
+        **{f'{field}_json': Cast(field, output_field=TextField()) for field in fields}
+    )
+
+
+class PlainSerializer:
+    """
+    Read-only, plain-dict form of a ModelSerializer.
+
+    Produces the same representation as serializer_class(instance).data,
+    but the fields are introspected once, when the PlainSerializer is
+    created, rather than on every call. JSON fields read by with_raw_json
+    are returned as RawJSON, which FastJSONRenderer writes out unparsed.
+    """
+
+    def __init__(self, serializer_class):
+        serializer = serializer_class()
+        self.readers = [
+            (name, self._compile(serializer, field))
+            for name, field in serializer.fields.items()
+            if not field.write_only
+        ]
+
+    def to_representation(self, instance, tz=None):
+        """
+        Args:
+            instance: The model instance.
+            tz: The time zone to render datetimes in (default: the current one).
+        """
+        tz = tz or _current_timezone()
+        return {name: read(instance, tz) for name, read in self.readers}
+
+    def many(self, instances):
+        tz = _current_timezone()
+        return [self.to_representation(instance, tz) for instance in instances]
+
+    def _compile(self, serializer, field):
+        """Return a function reading one field's representation from an instance."""
+        source = field.source
+        if isinstance(field, serializers.SerializerMethodField):
+            method = getattr(serializer, field.method_name)
+            return lambda instance, tz: method(instance)
+        if '.' in source or source == '*':
+            return self._generic(field)
+
+        if isinstance(field, serializers.ListSerializer):
+            child = PlainSerializer(type(field.child))
+
+            def read_many(instance, tz):
+                items = getattr(instance, source)
+                if isinstance(items, BaseManager):
+                    items = items.all()
+                return [child.to_representation(item, tz) for item in items]
+            return read_many
+
+        if isinstance(field, serializers.Serializer):
+            nested = PlainSerializer(type(field))
+
+            def read_nested(instance, tz):
+                value = getattr(instance, source)
+                return None if value is None else nested.to_representation(value, tz)
+            return read_nested
+
+        if isinstance(field, serializers.PrimaryKeyRelatedField):
+            attname = serializer.Meta.model._meta.get_field(source).attname
+            return lambda instance, tz: getattr(instance, attname)
+
+        if isinstance(field, serializers.JSONField):
+            raw = f'{source}_json'
+
+            def read_json(instance, tz):
+                values = instance.__dict__
+                if raw in values:
+                    text = values[raw]
+                    return None if text is None else RawJSON(text)
+                return getattr(instance, source)
+            return read_json
+
+        if isinstance(field, _PLAIN_FIELDS):
+            return lambda instance, tz: getattr(instance, source)
+
+        if (isinstance(field, serializers.DateTimeField) and not hasattr(field, 'timezone')
+                and getattr(field, 'format', api_settings.DATETIME_FORMAT) == ISO_8601):
+            def read_datetime(instance, tz):
+                value = getattr(instance, source)
+                if tz is None or value is None or value.tzinfo is None:
+                    return None if value is None else field.to_representation(value)
+                # DateTimeField.to_representation, without looking up the time zone
+                value = value.astimezone(tz).isoformat()
+                return value[:-6] + 'Z' if value.endswith('+00:00') else value
+            return read_datetime
+
+        def read_value(instance, tz):
+            value = getattr(instance, source)
+            return None if value is None else field.to_representation(value)
+        return read_value
+
+    def _generic(self, field):
+        def read(instance, tz):
+            value = field.get_attribute(instance)
+            return None if value is None else field.to_representation(value)
+        return read
+
+
+def _current_timezone():
+    return timezone.get_current_timezone() if settings.USE_TZ else None
+
+
+resume_plain_serializer = PlainSerializer(ResumeSerializer)
+feedback_plain_serializer = PlainSerializer(FeedbackSerializer)
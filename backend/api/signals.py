@@ -0,0 +1,44 @@
+"""
+Signal handlers for the api app.
+"""
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+
+from .models import AnalysisSection, Resume
+
+
+@receiver(post_delete, sender=Resume)
+def delete_resume_file(sender, instance, **kwargs):
+    """Remove a resume's stored file once its deletion has been committed."""
+    file_path = instance.file_path
+    if not file_path:
+        return
+
+    def _delete():
+        # Imported lazily so loading the app does not pull in the NLP stack
+        from .adapters.services import FileService
+
+        if not Resume.objects.filter(file_path=file_path).exists():
+            FileService(settings.MEDIA_ROOT).delete(file_path)
+
+    transaction.on_commit(_delete)
+
+
+@receiver(post_delete, sender=Resume)
+def purge_resume_sections(sender, instance, **kwargs):
+    """
+    Drop the cached preprocessing of a deleted resume's sections.
+
+    Entries are shared by content, so another resume with an identical
+    section just preprocesses it again on its next analysis.
+    """
+    if not instance.content:
+        return
+    from .adapters.repositories import SectionCacheRepository
+    from .ai.sections import fingerprint, split_sections
+
+    SectionCacheRepository(AnalysisSection).delete_many(
+        [fingerprint(text) for _, text in split_sections(instance.content, instance.sections)]
+    )
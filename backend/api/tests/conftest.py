@@ -0,0 +1,24 @@
+"""
+Shared test helpers.
+"""
+import pytest
+
+
+def _nltk_data_available():
+    try:
+        from nltk.corpus import stopwords, wordnet
+        from nltk.tokenize import word_tokenize
+
+        stopwords.words('english')
+        wordnet.ensure_loaded()
+        word_tokenize("probe")
+        return True
+    except LookupError:
+        return False
+
+
+# The analyzers need the NLTK corpora fetched by download_nltk_data.py
+requires_nltk_data = pytest.mark.skipif(
+    not _nltk_data_available(),
+    reason="NLTK corpora are not installed (run download_nltk_data.py)",
+)
@@ -0,0 +1,114 @@
+"""
+Tests for computing a subset of the analysis outputs.
+"""
+import random
+
+import pytest
+from django.contrib.auth.models import User
+from rest_framework.test import APIClient
+
+from api.ai import engines
+from api.benchmarks.corpus import generate_resume
+from api.domain.entities import Resume as ResumeEntity
+from api.domain.use_cases import apply_analysis
+from api.models import Resume
+from api.tests.conftest import requires_nltk_data
+
+
+class RecordingEngine:
+    """Returns only the requested fields and remembers what was asked for."""
+
+    requested = []
+
+    def analyze_resume(self, resume_text, sections=None, fields=None, deadline=None):
+        RecordingEngine.requested.append(fields)
+        results = {'score': 70, 'category_scores': {'education': 70}, 'feedback': {}, 'job_role': "Engineer"}
+        return {field: value for field, value in results.items() if fields is None or field in fields}
+
+
+@pytest.fixture
+def client(settings):
+    settings.ANALYSIS_ENGINE_CANARY = {}
+    engines.register('recording', RecordingEngine)
+    RecordingEngine.requested = []
+    user = User.objects.create_user('judy', password='pw')
+    api_client = APIClient()
+    api_client.force_authenticate(user)
+    api_client.resume = Resume.objects.create(user=user, file_path='r.txt', content='Python developer')
+    yield api_client
+    engines._factories.pop('recording', None)
+    engines.reset()
+
+
+@pytest.mark.django_db
+def test_analyze_computes_only_requested_fields(client):
+    response = client.post(
+        f'/api/resumes/{client.resume.id}/analyze/?engine=recording', {'fields': 'category_scores'}
+    )
+
+    assert response.status_code == 200
+    assert RecordingEngine.requested == [{'score', 'category_scores'}]
+    assert response.data['score'] == 70
+    assert response.data['feedback']['category_scores'] == {'education': 70}
+    assert response.data['feedback']['fields'] == ['category_scores', 'score']
+    assert response.data['feedback']['job_role'] is None
+    client.resume.refresh_from_db()
+    assert 'job_role' not in client.resume.feedback and client.resume.analyzer_version is None
+
+
+@pytest.mark.django_db
+def test_partial_analysis_is_merged_into_the_stored_one(client):
+    url = f'/api/resumes/{client.resume.id}/analyze/?engine=recording'
+    client.post(url)
+    client.resume.refresh_from_db()
+    analyzer_version = client.resume.analyzer_version
+
+    response = client.post(url, {'fields': 'score'})
+
+    assert response.data['feedback']['job_role'] is None
+    client.resume.refresh_from_db()
+    assert client.resume.feedback['job_role'] == "Engineer"
+    assert client.resume.feedback['category_scores'] == {'education': 70}
+    assert client.resume.feedback['fields'] == ['score']
+    assert client.resume.analyzer_version == analyzer_version is not None
+
+
+def test_degraded_analysis_keeps_the_stored_outputs():
+    resume = ResumeEntity(score=80, feedback={'job_role': "Engineer", 'keywords': ['python']},
+                          analyzer_version='legacy:1:1')
+
+    feedback = apply_analysis(resume, 60, {'keywords': [], 'completed_stages': ['category_scores'], 'degraded': True})
+
+    assert feedback['keywords'] == [] and feedback['job_role'] is None
+    assert resume.score == 60 and resume.analyzer_version == 'legacy:1:1'
+    assert resume.feedback == {'job_role': "Engineer", 'keywords': [], 'completed_stages': ['category_scores'],
+                               'degraded': True}
+
+
+@pytest.mark.django_db
+def test_unknown_fields_are_rejected(client):
+    response = client.post(f'/api/resumes/{client.resume.id}/analyze/?engine=recording&fields=score,salary')
+
+    assert response.status_code == 400
+    assert 'salary' in response.data['error']
+    assert RecordingEngine.requested == []
+
+
+@requires_nltk_data
+def test_score_only_analysis_matches_full_analysis(monkeypatch):
+    from api.ai.resume_analyzer import AdvancedResumeAnalyzer
+
+    analyzer = AdvancedResumeAnalyzer()
+    resume = generate_resume(random.Random(5), 'typical')
+    role_rankings = []
+    rank_job_roles = analyzer._rank_job_roles
+    monkeypatch.setattr(analyzer, '_rank_job_roles', lambda text: role_rankings.append(text) or rank_job_roles(text))
+
+    full = analyzer.analyze_resume(resume)
+    assert len(role_rankings) == 1
+
+    partial = analyzer.analyze_resume(resume, fields=['score', 'category_scores'])
+    assert set(partial) == {'score', 'category_scores'}
+    assert partial['score'] == full['score']
+    assert partial['category_scores'] == full['category_scores']
+    assert len(role_rankings) == 1
@@ -0,0 +1,105 @@
+"""
+Tests for the offline analyze_batch command.
+"""
+import json
+from io import StringIO
+
+import pytest
+from django.core.management import CommandError, call_command
+
+from api.ai import engines
+
+
+class LengthEngine:
+    """Scores a resume by its length, and fails on resumes mentioning 'broken'."""
+
+    def analyze_resume(self, resume_text, sections=None, fields=None, deadline=None):
+        if 'broken' in resume_text:
+            raise RuntimeError("cannot analyze")
+        results = {'score': len(resume_text), 'job_role': "Engineer"}
+        return {field: results[field] for field in fields or results}
+
+
+@pytest.fixture(autouse=True)
+def length_engine(settings, tmp_path):
+    settings.ANALYSIS_ENGINE = 'length'
+    settings.MEDIA_ROOT = str(tmp_path / 'media')
+    engines.register('length', LengthEngine)
+    yield
+    engines._factories.pop('length', None)
+    engines.reset()
+
+
+def analyze_batch(*args):
+    out = StringIO()
+    call_command('analyze_batch', '--progress-seconds', '0', *args, stdout=out, stderr=StringIO())
+    return [json.loads(line) for line in out.getvalue().splitlines()]
+
+
+@pytest.fixture
+def directory(tmp_path):
+    root = tmp_path / 'resumes'
+    (root / 'nested').mkdir(parents=True)
+    (root / 'b.txt').write_text("bb")
+    (root / 'a.txt').write_text("a")
+    (root / 'nested' / 'c.txt').write_text("ccc")
+    (root / 'broken.txt').write_text("broken")
+    (root / 'notes.csv').write_text("ignored")
+    return root
+
+
+@pytest.fixture
+def dump(tmp_path):
+    (tmp_path / 'file.txt').write_text("from a file")
+    path = tmp_path / 'dump.ndjson'
+    path.write_text("\n".join([
+        json.dumps({'id': 'first', 'text': "inline"}),
+        json.dumps({'path': 'file.txt'}),
+        "",
+        "{not json",
+        json.dumps({'id': 'empty'}),
+    ]) + "\n")
+    return path
+
+
+def test_directory_is_analyzed_recursively_in_order(directory):
+    results = analyze_batch(str(directory), '--workers', '0', '--chunk-size', '2')
+
+    assert results == [
+        {'id': 'a.txt', 'score': 1, 'job_role': "Engineer"},
+        {'id': 'b.txt', 'score': 2, 'job_role': "Engineer"},
+        {'id': 'broken.txt', 'error': "RuntimeError: cannot analyze"},
+        {'id': 'nested/c.txt', 'score': 3, 'job_role': "Engineer"},
+    ]
+
+
+def test_ndjson_records_hold_text_or_relative_paths(dump):
+    results = analyze_batch(str(dump), '--workers', '0', '--fields', 'score')
+
+    assert results[:2] == [{'id': 'first', 'score': 6}, {'id': 2, 'score': 11}]
+    # Bad lines are reported by line number, without stopping the run
+    assert [(result['id'], result['error'].split(':')[0]) for result in results[2:]] == [
+        (4, 'JSONDecodeError'), ('empty', 'ValueError')
+    ]
+
+
+@pytest.mark.parametrize('order', [[], ['--unordered']])
+def test_worker_pool_analyzes_every_resume(tmp_path, order):
+    dump = tmp_path / 'dump.ndjson'
+    dump.write_text("".join(json.dumps({'id': i, 'text': "x" * i}) + "\n" for i in range(1, 26)))
+    output = tmp_path / 'results.ndjson'
+
+    assert analyze_batch(str(dump), '--workers', '2', '--chunk-size', '3', '--max-in-flight', '2',
+                         '--output', str(output), *order) == []
+    results = [json.loads(line) for line in output.read_text().splitlines()]
+
+    assert all(result['score'] == result['id'] for result in results)
+    ids = [result['id'] for result in results]
+    assert sorted(ids) == list(range(1, 26))
+    if not order:
+        assert ids == list(range(1, 26))
+
+
+def test_unknown_fields_are_rejected(dump):
+    with pytest.raises(CommandError, match="Unknown analysis fields: colour"):
+        analyze_batch(str(dump), '--fields', 'score,colour')
@@ -0,0 +1,71 @@
+"""
+Tests for the benchmark suite.
+"""
+import json
+import random
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from api.benchmarks.corpus import build_corpus, generate_resume
+from api.benchmarks.runner import compare_to_baseline
+from api.tests.conftest import requires_nltk_data
+
+
+def test_corpus_is_deterministic_and_sized():
+    assert build_corpus(seed=7) == build_corpus(seed=7)
+    assert build_corpus(seed=7) != build_corpus(seed=8)
+
+    small = generate_resume(random.Random(1), 'small')
+    large = generate_resume(random.Random(1), 'large')
+    assert len(small.split()) < 300
+    assert len(large.split()) > 7000
+
+
+def test_compare_to_baseline_flags_only_real_regressions():
+    baseline = {'results': {
+        'a': {'median_ms': 10.0},
+        'b': {'median_ms': 10.0},
+        'c': {'median_ms': 0.1},
+    }}
+    results = {
+        'a': {'median_ms': 12.0},   # within 25%
+        'b': {'median_ms': 20.0},   # regressed
+        'c': {'median_ms': 0.5},    # 5x slower, but below the noise floor
+        'd': {'median_ms': 99.0},   # not in the baseline
+    }
+
+    regressions = compare_to_baseline(results, baseline, tolerance=0.25)
+
+    assert [r['case'] for r in regressions] == ['b']
+    assert regressions[0]['slowdown'] == 2.0
+
+
+def test_benchmark_command_fails_without_a_baseline(tmp_path):
+    with pytest.raises(CommandError, match="No baseline"):
+        call_command('benchmark', baseline=str(tmp_path / 'missing.json'), stderr=StringIO())
+
+
+@requires_nltk_data
+@pytest.mark.django_db
+def test_benchmark_command_fails_on_regression(tmp_path):
+    baseline = tmp_path / 'baseline.json'
+    output = tmp_path / 'report.json'
+    options = dict(sizes=['small'], repeat=1, warmup=0, cases=['preprocess_text', 'http.analyze'],
+                   baseline=str(baseline), output=str(output), stderr=StringIO())
+
+    call_command('benchmark', save_baseline=True, **options)
+    report = json.loads(baseline.read_text())
+    assert set(report['results']) == {'preprocess_text/small', 'http.analyze/small'}
+
+    for stats in report['results'].values():
+        stats['median_ms'] = 0.0001
+    baseline.write_text(json.dumps(report))
+    with pytest.raises(CommandError):
+        call_command('benchmark', **options)
+
+    baseline.unlink()
+    call_command('benchmark', allow_missing_baseline=True, **options)
+    assert set(json.loads(output.read_text())['results']) == set(report['results'])
@@ -0,0 +1,135 @@
+"""
+Tests for single-flight coalescing of identical analysis requests.
+"""
+import threading
+import time
+
+import pytest
+from django.contrib.auth.models import User
+from rest_framework.test import APIClient
+
+from api.adapters.coalescing import SingleFlight
+from api.ai import engines
+from api.models import Feedback, Resume
+
+
+def run_in_threads(count, target):
+    results = [None] * count
+    threads = [
+        threading.Thread(target=lambda i=i: results.__setitem__(i, target()))
+        for i in range(count)
+    ]
+    for thread in threads:
+        thread.start()
+    return threads, results
+
+
+def test_concurrent_callers_share_one_run():
+    flight = SingleFlight('test')
+    release = threading.Event()
+    calls = []
+
+    def work():
+        calls.append(1)
+        release.wait(5)
+        return {'score': 70}
+
+    threads, results = run_in_threads(5, lambda: flight.do('key', work))
+    time.sleep(0.05)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert calls == [1]
+    assert results == [{'score': 70}] * 5
+    assert flight.do('key', lambda: 'rerun') == 'rerun'
+
+
+def test_waiting_callers_get_the_leaders_error():
+    flight = SingleFlight('test')
+    release = threading.Event()
+
+    def work():
+        release.wait(5)
+        raise ValueError("boom")
+
+    def call():
+        try:
+            flight.do('key', work)
+        except ValueError as e:
+            return str(e)
+
+    threads, results = run_in_threads(3, call)
+    time.sleep(0.05)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert results == ["boom"] * 3
+
+
+def test_callers_in_other_processes_take_the_result_through_the_lock_file(tmp_path):
+    # Separate instances share nothing in memory, like separate worker processes
+    leader, other = SingleFlight('test', str(tmp_path)), SingleFlight('test', str(tmp_path))
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def work():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return [1, 2]
+
+    threads, results = run_in_threads(1, lambda: leader.do('key', work))
+    started.wait(5)
+    waiters, waiter_results = run_in_threads(1, lambda: other.do('key', work))
+    time.sleep(0.05)
+    release.set()
+    for thread in threads + waiters:
+        thread.join()
+
+    assert calls == [1]
+    assert results == waiter_results == [[1, 2]]
+    # Once the run is over, later callers compute afresh
+    assert other.do('key', lambda: 'fresh') == 'fresh'
+
+
+class CountingEngine:
+    """Slow enough for concurrent requests to overlap."""
+
+    calls = 0
+
+    def analyze_resume(self, resume_text, sections=None, fields=None, deadline=None):
+        CountingEngine.calls += 1
+        time.sleep(0.1)
+        return {'score': 75, 'category_scores': {'education': 75}, 'feedback': {'education': "Solid"}}
+
+
+@pytest.mark.django_db(transaction=True)
+def test_concurrent_analyze_requests_run_once(settings, tmp_path):
+    settings.ANALYSIS_ENGINE_CANARY = {}
+    settings.ANALYSIS_LOCK_DIR = str(tmp_path)
+    engines.register('counting', CountingEngine)
+    CountingEngine.calls = 0
+    user = User.objects.create_user('max', password='pw')
+    resume = Resume.objects.create(user=user, file_path='r.txt', content='Python developer', sections=[])
+
+    def analyze():
+        client = APIClient()
+        client.force_authenticate(user)
+        return client.post(f'/api/resumes/{resume.id}/analyze/?engine=counting').status_code
+
+    try:
+        threads, statuses = run_in_threads(3, analyze)
+        for thread in threads:
+            thread.join()
+        assert statuses == [200] * 3
+        assert CountingEngine.calls == 1
+
+        # Analyzing again replaces the stored category feedback
+        assert analyze() == 200
+        assert CountingEngine.calls == 2
+        assert Feedback.objects.filter(resume=resume).count() == 1
+    finally:
+        engines._factories.pop('counting', None)
+        engines.reset()
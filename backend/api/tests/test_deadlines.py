@@ -0,0 +1,107 @@
+"""
+Tests for time-budgeted analysis with partial results.
+"""
+import random
+import time
+from time import perf_counter
+
+import pytest
+from django.contrib.auth.models import User
+from rest_framework.test import APIClient
+
+from api.adapters.services import ResumeAnalyzerService
+from api.ai import engines
+from api.benchmarks.corpus import generate_resume
+from api.models import Resume
+from api.tests.conftest import requires_nltk_data
+
+
+class SlowEngine:
+    """Takes longer than the budgets used below for every call."""
+
+    name = 'slow'
+
+    def analyze_resume(self, resume_text, sections=None, fields=None, deadline=None):
+        time.sleep(0.02)
+        return {'score': 60, 'feedback': {}, 'completed_stages': ['category_scores'], 'degraded': False}
+
+    def calculate_match_score(self, resume_text, job_description):
+        time.sleep(0.02)
+        return {'overall_match_score': 40}
+
+    def generate_improvement_suggestions(self, match_result):
+        return ["Add Python"]
+
+
+def test_analysis_past_its_budget_skips_the_job_match():
+    service = ResumeAnalyzerService(None, engine=SlowEngine())
+
+    score, feedback = service.analyze("resume", job_description="job", budget=0.01)
+
+    assert score == 60
+    assert 'job_match' not in feedback
+    assert feedback['degraded'] is True
+    assert feedback['completed_stages'] == ['category_scores']
+
+
+def test_comparison_keeps_scores_and_drops_suggestions_when_out_of_time():
+    service = ResumeAnalyzerService(None, engine=SlowEngine())
+
+    degraded = service.compare_with_job("resume", "job", budget=0.01)
+    assert degraded['overall_match_score'] == 40
+    assert degraded['job_specific_suggestions'] == []
+    assert degraded['completed_stages'] == ['match_score']
+
+    complete = service.compare_with_job("resume", "job", budget=5)
+    assert complete['job_specific_suggestions'] == ["Add Python"]
+    assert complete['degraded'] is False
+
+
+class UnbuildableEngine:
+    """Fails if a request gets as far as building its engine."""
+
+    def __init__(self):
+        raise AssertionError("the engine was built before the request was validated")
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('action, data', [
+    ('analyze', {'budget': '-1'}),
+    ('analyze', {'budget': 'nan'}),
+    ('analyze', {'budget': 'inf'}),
+    ('analyze', {'fields': 'score,colour'}),
+    ('analyze', {'engine': 'missing'}),
+    ('analyze/stream', {'budget': 'soon'}),
+    ('compare_job', {'budget': '0', 'job_title': "Engineer", 'job_description': "Python"}),
+])
+def test_invalid_requests_are_rejected_before_building_the_engine(settings, action, data):
+    settings.ANALYSIS_ENGINE = 'unbuildable'
+    settings.ANALYSIS_ENGINE_CANARY = {}
+    engines.register('unbuildable', UnbuildableEngine)
+    user = User.objects.create_user('kim', password='pw')
+    resume = Resume.objects.create(user=user, file_path='r.txt', content='Python developer')
+    client = APIClient()
+    client.force_authenticate(user)
+
+    try:
+        response = client.post(f'/api/resumes/{resume.id}/{action}/', data, HTTP_ACCEPT='application/json')
+    finally:
+        engines._factories.pop('unbuildable', None)
+        engines.reset()
+
+    assert response.status_code == 400
+
+
+@requires_nltk_data
+def test_expired_deadline_still_returns_core_scores():
+    from api.ai.resume_analyzer import AdvancedResumeAnalyzer
+
+    analyzer = AdvancedResumeAnalyzer()
+    resume = generate_resume(random.Random(9), 'typical')
+
+    results = analyzer.analyze_resume(resume, deadline=perf_counter())
+
+    assert results['completed_stages'] == ['category_scores']
+    assert results['degraded'] is True
+    assert results['score'] == analyzer.analyze_resume(resume)['score']
+    assert 'keywords' not in results
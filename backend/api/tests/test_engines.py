@@ -0,0 +1,103 @@
+"""
+Tests for the analysis engine registry and per-request engine selection.
+"""
+import pytest
+from django.contrib.auth.models import User
+from rest_framework.test import APIClient
+
+from api.adapters.services import ENGINE_SCORES, ResumeAnalyzerService
+from api.ai import engines
+from api.models import Resume
+
+CATEGORIES = ('technical_skills', 'education', 'experience', 'achievements', 'formatting')
+
+
+class StubEngine:
+    """An engine with fixed results, so no NLTK data is needed."""
+
+    instances = 0
+
+    def __init__(self):
+        StubEngine.instances += 1
+
+    def analyze_resume(self, resume_text, sections=None, fields=None, deadline=None):
+        return {
+            'score': 64,
+            'category_scores': {category: 64 for category in CATEGORIES},
+            'feedback': {category: f"{category} feedback" for category in CATEGORIES},
+            'improvement_suggestions': ['Add metrics'],
+            'key_strengths': ['Python'],
+            'job_role': 'Software Engineer',
+            'job_role_confidence': 40,
+            'keywords': ['python'],
+        }
+
+    def calculate_match_score(self, resume_text, job_description):
+        return {'overall_match_score': 55}
+
+    def generate_improvement_suggestions(self, match_result):
+        return []
+
+
+@pytest.fixture
+def stub_engine(settings):
+    settings.ANALYSIS_ENGINE_CANARY = {}
+    engines.register('stub', StubEngine)
+    yield
+    engines._factories.pop('stub', None)
+    engines.reset()
+
+
+def test_engines_are_created_once_per_process(stub_engine):
+    StubEngine.instances = 0
+
+    first = engines.get_engine('stub')
+
+    assert engines.get_engine('stub') is first
+    assert first.name == 'stub'
+    assert StubEngine.instances == 1
+    assert 'legacy' in engines.available()
+
+
+def test_unknown_engine_is_rejected(stub_engine):
+    with pytest.raises(engines.UnknownEngineError):
+        engines.select_engine('missing')
+
+
+def test_canary_fraction_routes_traffic(stub_engine, settings, monkeypatch):
+    settings.ANALYSIS_ENGINE = 'legacy'
+    settings.ANALYSIS_ENGINE_CANARY = {'stub': 0.1}
+    monkeypatch.setattr(engines, 'get_engine', lambda name: name)
+
+    monkeypatch.setattr(engines.random, 'random', lambda: 0.05)
+    assert engines.select_engine() == 'stub'
+    monkeypatch.setattr(engines.random, 'random', lambda: 0.5)
+    assert engines.select_engine() == 'legacy'
+    assert engines.select_engine('stub') == 'stub'
+
+
+def test_service_tags_results_and_metrics_with_engine(stub_engine):
+    service = ResumeAnalyzerService(None, engine=engines.get_engine('stub'))
+    before = (ENGINE_SCORES.snapshot(('stub', 'analyze')) or {'count': 0})['count']
+
+    score, feedback = service.analyze("resume text")
+
+    assert score == 64
+    assert feedback['engine'] == 'stub'
+    assert ENGINE_SCORES.snapshot(('stub', 'analyze'))['count'] == before + 1
+
+
+@pytest.mark.django_db
+def test_analyze_accepts_engine_parameter(stub_engine):
+    user = User.objects.create_user('ivan', password='pw')
+    resume = Resume.objects.create(user=user, file_path='resume.txt', content='Python developer')
+    client = APIClient()
+    client.force_authenticate(user)
+
+    response = client.post(f'/api/resumes/{resume.id}/analyze/?engine=stub')
+    assert response.status_code == 200
+    assert response.data['feedback']['engine'] == 'stub'
+    assert response.data['sections'] == [['header', 0, len('Python developer')]]
+
+    response = client.post(f'/api/resumes/{resume.id}/analyze/?engine=missing')
+    assert response.status_code == 400
@@ -0,0 +1,71 @@
+"""
+Score-equivalence checks for analysis engines.
+"""
+import pytest
+
+from api.benchmarks.corpus import build_corpus
+from api.benchmarks.equivalence import ReferenceEngine, verify_equivalence
+from api.tests.conftest import requires_nltk_data
+
+
+class FixedEngine:
+    """An engine returning canned results, for exercising the harness."""
+
+    def __init__(self, score=70, keywords=('python', 'django'), match=60):
+        self.score = score
+        self.keywords = list(keywords)
+        self.match = match
+
+    def analyze_resume(self, resume_text):
+        return {
+            'score': self.score,
+            'category_scores': {'technical_skills': self.score, 'education': 50},
+            'job_role': 'Software Engineer',
+            'job_role_confidence': 40,
+            'keywords': self.keywords,
+        }
+
+    def calculate_match_score(self, resume_text, job_description):
+        return {'overall_match_score': self.match}
+
+
+DOCUMENTS = [('doc', 'resume text', 'job text')]
+
+
+def test_identical_engines_pass():
+    report = verify_equivalence(FixedEngine(), FixedEngine(), DOCUMENTS)
+
+    assert report['passed']
+    assert report['max_drift']['score'] == 0
+    assert report['max_drift']['keywords'] == 0
+
+
+def test_drift_is_reported_against_tolerances():
+    candidate = FixedEngine(score=72, keywords=('python', 'flask'), match=61)
+
+    strict = verify_equivalence(FixedEngine(), candidate, DOCUMENTS)
+    assert not strict['passed']
+    violations = strict['failures'][0]['violations']
+    assert any(v.startswith('score') for v in violations)
+    assert any(v.startswith('keywords') for v in violations)
+    assert any(v.startswith('overall_match_score') for v in violations)
+
+    lenient = verify_equivalence(FixedEngine(), candidate, DOCUMENTS, tolerances={
+        'score': 2, 'category_scores': 2, 'keywords': 0.7, 'overall_match_score': 1,
+    })
+    assert lenient['passed']
+
+
+@requires_nltk_data
+@pytest.mark.parametrize('candidate_factory', [ReferenceEngine])
+def test_engine_matches_reference_scores(candidate_factory):
+    corpus = build_corpus(seed=3, sizes=['small', 'typical'], count=2)
+    documents = [
+        (f"{size}-{i}", resume, job)
+        for size, pairs in corpus.items()
+        for i, (resume, job) in enumerate(pairs)
+    ]
+
+    report = verify_equivalence(ReferenceEngine(), candidate_factory(), documents)
+
+    assert report['passed'], report['failures']
@@ -0,0 +1,96 @@
+"""
+Tests for the streaming export of analysis results.
+"""
+import csv
+import io
+import json
+from datetime import datetime, timezone
+
+import pytest
+from django.contrib.auth.models import User
+from rest_framework.test import APIClient
+
+from api.adapters.repositories import EXPORT_FIELDS
+from api.models import Resume
+from api.renderers import ExportRenderer
+
+FEEDBACK = {
+    'category_scores': {'education': 80, 'experience': 60},
+    'education': "Strong degree, \"first class\"",
+    'experience': "Add dates,\nand titles",
+    'improvement_suggestions': ["Quantify results"],
+    'job_role': "Data Scientist",
+    'keywords': ["python"],
+}
+
+
+@pytest.fixture
+def client():
+    user = User.objects.create_user('ash', password='pw')
+    other = User.objects.create_user('brook', password='pw')
+    for day, score in ((1, 40), (2, 75), (3, 90)):
+        Resume.objects.create(user=user, file_path=f'{day}.txt', content="Not exported", score=score,
+                              feedback=FEEDBACK, analyzer_version='legacy:1:1',
+                              created_at=datetime(2026, 3, day, 12, tzinfo=timezone.utc))
+    Resume.objects.create(user=user, file_path='new.txt', content="Not analyzed",
+                          created_at=datetime(2026, 3, 4, tzinfo=timezone.utc))
+    Resume.objects.create(user=other, file_path='other.txt', content="Someone else's", score=99)
+    client = APIClient()
+    client.force_authenticate(user)
+    return client
+
+
+def export(client, query=''):
+    response = client.get(f'/api/resumes/export/{query}')
+    assert response.status_code == 200
+    return response
+
+
+@pytest.mark.django_db
+def test_ndjson_export_streams_the_users_analyses(client):
+    response = export(client)
+
+    assert response.streaming
+    assert response['Content-Type'] == 'application/x-ndjson; charset=utf-8'
+    rows = [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+    assert [row['file_path'] for row in rows] == ['1.txt', '2.txt', '3.txt', 'new.txt']
+    assert list(rows[0]) == list(EXPORT_FIELDS)
+    assert rows[0]['score'] == 40 and rows[0]['job_role'] == "Data Scientist"
+    assert (rows[0]['education_score'], rows[0]['education_feedback']) == (80, FEEDBACK['education'])
+    assert rows[0]['formatting_score'] is None
+    assert rows[0]['improvement_suggestions'] == ["Quantify results"]
+    assert rows[0]['created_at'] == '2026-03-01T12:00:00Z'
+    assert rows[3]['score'] is None and rows[3]['education_feedback'] is None
+
+
+@pytest.mark.django_db
+def test_csv_export_is_filtered_by_date_and_score(client):
+    response = export(client, '?format=csv&created_after=2026-03-02&created_before=2026-03-04T00:00:00Z'
+                              '&min_score=50&max_score=80')
+
+    assert response['Content-Type'] == 'text/csv; charset=utf-8'
+    assert response['Content-Disposition'] == 'attachment; filename="resumes.csv"'
+    rows = list(csv.DictReader(io.StringIO(b''.join(response.streaming_content).decode())))
+    assert [row['file_path'] for row in rows] == ['2.txt']
+    assert rows[0]['experience_feedback'] == "Add dates,\nand titles"
+    assert rows[0]['improvement_suggestions'] == '["Quantify results"]'
+    assert rows[0]['formatting_score'] == ''
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('query', ['?min_score=high', '?created_after=yesterday', '?created_before=2026-13-01'])
+def test_malformed_filters_are_rejected(client, query):
+    response = client.get(f'/api/resumes/export/{query}')
+
+    assert response.status_code == 400
+    assert 'error' in json.loads(response.content)
+
+
+def test_rows_are_written_in_batches():
+    renderer = ExportRenderer()
+    renderer.batch_size = 2
+    renderer.start = lambda buffer, fields: lambda row: buffer.write(f"{row['n']};")
+
+    chunks = list(renderer.stream(({'n': n} for n in range(5)), ['n']))
+
+    assert chunks == [b'0;1;', b'2;3;', b'4;']
@@ -0,0 +1,132 @@
+"""
+Tests for Idempotency-Key support on upload and analyze.
+"""
+from datetime import timedelta
+
+import pytest
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from api.ai import engines
+from api.models import IdempotencyKey, Resume
+
+
+class CountingEngine:
+    calls = 0
+
+    def analyze_resume(self, resume_text, sections=None, fields=None, deadline=None):
+        CountingEngine.calls += 1
+        return {'score': 64, 'feedback': {}}
+
+
+@pytest.fixture
+def client(settings, tmp_path):
+    settings.MEDIA_ROOT = str(tmp_path)
+    settings.ANALYSIS_ENGINE_CANARY = {}
+    engines.register('counting', CountingEngine)
+    CountingEngine.calls = 0
+    api_client = APIClient()
+    api_client.user = User.objects.create_user('nina', password='pw')
+    api_client.force_authenticate(api_client.user)
+    yield api_client
+    engines._factories.pop('counting', None)
+    engines.reset()
+
+
+def upload(client, key):
+    return client.post(
+        '/api/resumes/upload/', {'file': SimpleUploadedFile('cv.txt', b'Python')}, HTTP_IDEMPOTENCY_KEY=key
+    )
+
+
+def upload_fingerprint(client):
+    """The request fingerprint of upload(), from a completed upload."""
+    upload(client, 'probe')
+    return IdempotencyKey.objects.get(key='probe').fingerprint
+
+
+@pytest.mark.django_db
+def test_retried_upload_replays_the_first_response(client):
+    first = upload(client, 'upload-1')
+    retry = upload(client, 'upload-1')
+
+    assert first.status_code == retry.status_code == 201
+    assert retry.data == first.data
+    assert retry['Idempotent-Replayed'] == 'true'
+    assert Resume.objects.count() == 1
+
+    assert upload(client, 'upload-2').status_code == 201
+    assert Resume.objects.count() == 2
+
+
+@pytest.mark.django_db
+def test_retried_analyze_runs_the_analysis_once(client):
+    resume = Resume.objects.create(user=client.user, file_path='r.txt', content='Python developer', sections=[])
+    url = f'/api/resumes/{resume.id}/analyze/?engine=counting'
+
+    assert client.post(url, HTTP_IDEMPOTENCY_KEY='analyze-1').status_code == 200
+    assert client.post(url, HTTP_IDEMPOTENCY_KEY='analyze-1').data['score'] == 64
+    assert CountingEngine.calls == 1
+
+    assert client.post(url).status_code == 200
+    assert CountingEngine.calls == 2
+
+
+@pytest.mark.django_db
+def test_key_reused_for_another_path_is_rejected(client):
+    resume = Resume.objects.create(user=client.user, file_path='r.txt', content='Python developer', sections=[])
+    upload(client, 'shared')
+
+    response = client.post(f'/api/resumes/{resume.id}/analyze/?engine=counting', HTTP_IDEMPOTENCY_KEY='shared')
+
+    assert response.status_code == 422
+    assert CountingEngine.calls == 0
+
+
+@pytest.mark.django_db
+def test_key_reused_with_other_parameters_is_rejected(client):
+    resume = Resume.objects.create(user=client.user, file_path='r.txt', content='Python developer', sections=[])
+    url = f'/api/resumes/{resume.id}/analyze/?engine=counting'
+    client.post(url, {'fields': 'score'}, HTTP_IDEMPOTENCY_KEY='analyze-1')
+
+    assert client.post(url, {'fields': 'score'}, HTTP_IDEMPOTENCY_KEY='analyze-1')['Idempotent-Replayed'] == 'true'
+    assert client.post(url, HTTP_IDEMPOTENCY_KEY='analyze-1').status_code == 422
+    assert client.post(f'{url}&budget=5', {'fields': 'score'}, HTTP_IDEMPOTENCY_KEY='analyze-1').status_code == 422
+    assert CountingEngine.calls == 1
+
+    upload(client, 'upload-1')
+    response = client.post('/api/resumes/upload/', {'file': SimpleUploadedFile('cv.txt', b'Java')},
+                           HTTP_IDEMPOTENCY_KEY='upload-1')
+    assert response.status_code == 422
+    assert Resume.objects.count() == 2
+
+
+@pytest.mark.django_db
+def test_retry_of_a_request_in_flight_elsewhere_conflicts_after_waiting(client, settings):
+    settings.IDEMPOTENCY_WAIT_SECONDS = 0
+    IdempotencyKey.objects.create(user=client.user, key='busy', path='/api/resumes/upload/',
+                                  fingerprint=upload_fingerprint(client))
+
+    assert upload(client, 'busy').status_code == 409
+    assert Resume.objects.count() == 1
+
+
+@pytest.mark.django_db
+def test_expired_and_abandoned_keys_run_again(client):
+    fingerprint = upload_fingerprint(client)
+    long_ago = timezone.now() - timedelta(days=2)
+    IdempotencyKey.objects.create(
+        user=client.user, key='old', path='/api/resumes/upload/', fingerprint=fingerprint, status_code=201,
+        response={}, created_at=long_ago
+    )
+    IdempotencyKey.objects.create(
+        user=client.user, key='lost', path='/api/resumes/upload/', fingerprint=fingerprint,
+        created_at=timezone.now() - timedelta(hours=1)
+    )
+
+    assert 'Idempotent-Replayed' not in upload(client, 'old')
+    assert 'Idempotent-Replayed' not in upload(client, 'lost')
+    assert Resume.objects.count() == 3
+    assert not IdempotencyKey.objects.filter(created_at__lt=timezone.now() - timedelta(days=1)).exists()
@@ -0,0 +1,132 @@
+"""
+Tests for stored job descriptions and their precomputed match data.
+"""
+import random
+
+import pytest
+from django.contrib.auth.models import User
+from rest_framework.test import APIClient
+
+from api.ai import engines
+from api.benchmarks.corpus import generate_job_description, generate_resume
+from api.models import JobDescription, Resume
+from api.tests.conftest import requires_nltk_data
+
+
+class PreparingEngine:
+    """Prepares jobs by uppercasing them and records what matches receive."""
+
+    version = 1
+    preparations = 0
+    prepared_jobs = []
+
+    def prepare_job(self, job_description):
+        PreparingEngine.preparations += 1
+        return {'version': self.version, 'preprocessed': job_description.upper(),
+                'skills': {'technical': ['python']}}
+
+    def is_prepared_current(self, prepared_job):
+        return prepared_job['version'] == self.version
+
+    def calculate_match_score(self, resume_text, job_description, prepared_job=None):
+        PreparingEngine.prepared_jobs.append(prepared_job)
+        return {'overall_match_score': 90}
+
+    def generate_improvement_suggestions(self, match_result):
+        return []
+
+
+@pytest.fixture
+def client(settings):
+    settings.ANALYSIS_ENGINE = 'preparing'
+    settings.ANALYSIS_ENGINE_CANARY = {}
+    engines.register('preparing', PreparingEngine)
+    PreparingEngine.version = 1
+    PreparingEngine.preparations = 0
+    PreparingEngine.prepared_jobs = []
+    api_client = APIClient()
+    api_client.user = User.objects.create_user('omar', password='pw')
+    api_client.force_authenticate(api_client.user)
+    yield api_client
+    engines._factories.pop('preparing', None)
+    engines.reset()
+
+
+@pytest.mark.django_db
+def test_created_job_description_is_prepared_once_and_reused(client):
+    response = client.post(
+        '/api/job-descriptions/', {'title': 'Backend Engineer', 'description': 'Python and Django'}, format='json'
+    )
+    assert response.status_code == 201
+    assert response.data['skills'] == {'technical': ['python']}
+    job = JobDescription.objects.get(id=response.data['id'])
+    assert job.prepared['preprocessed'] == 'PYTHON AND DJANGO'
+
+    resume = Resume.objects.create(user=client.user, file_path='r.txt', content='Python developer')
+    response = client.post(f'/api/resumes/{resume.id}/compare_job/', {'job_description_id': job.id})
+
+    assert response.status_code == 200
+    assert response.data['overall_match_score'] == 90
+    assert PreparingEngine.prepared_jobs == [job.prepared]
+
+
+@pytest.mark.django_db
+def test_outdated_preparation_is_recomputed_once_and_stored(client):
+    job_id = client.post(
+        '/api/job-descriptions/', {'title': 'Analyst', 'description': 'SQL'}, format='json'
+    ).data['id']
+    resume = Resume.objects.create(user=client.user, file_path='r.txt', content='SQL analyst')
+    # As after publishing a new taxonomy
+    PreparingEngine.version = 2
+
+    for _ in range(2):
+        response = client.post(f'/api/resumes/{resume.id}/compare_job/', {'job_description_id': job_id})
+        assert response.status_code == 200
+
+    assert PreparingEngine.preparations == 2
+    assert [prepared['version'] for prepared in PreparingEngine.prepared_jobs] == [2, 2]
+    assert JobDescription.objects.get(id=job_id).prepared['version'] == 2
+
+
+@pytest.mark.django_db
+def test_unknown_job_description_id_is_not_found(client):
+    resume = Resume.objects.create(user=client.user, file_path='r.txt', content='Python developer')
+
+    response = client.post(f'/api/resumes/{resume.id}/compare_job/', {'job_description_id': 999})
+
+    assert response.status_code == 404
+    assert PreparingEngine.prepared_jobs == []
+
+
+@pytest.mark.django_db
+def test_only_the_creator_changes_a_job_description(client):
+    job_id = client.post(
+        '/api/job-descriptions/', {'title': 'Analyst', 'description': 'SQL'}, format='json'
+    ).data['id']
+    other = APIClient()
+    other.force_authenticate(User.objects.create_user('pat', password='pw'))
+
+    assert other.get(f'/api/job-descriptions/{job_id}/').status_code == 200
+    assert other.patch(f'/api/job-descriptions/{job_id}/', {'title': 'Lead'}, format='json').status_code == 404
+
+    response = client.patch(f'/api/job-descriptions/{job_id}/', {'description': 'SQL and Python'}, format='json')
+    assert response.status_code == 200
+    assert JobDescription.objects.get(id=job_id).prepared['preprocessed'] == 'SQL AND PYTHON'
+
+
+@requires_nltk_data
+def test_prepared_job_gives_the_same_match():
+    from api.ai.job_matcher import JobMatcher
+
+    matcher = JobMatcher()
+    rng = random.Random(3)
+    resume, job = generate_resume(rng, 'typical'), generate_job_description(rng)
+    prepared = matcher.prepare_job(job)
+
+    assert prepared['skills'] == matcher.extract_skills(job)
+    assert matcher.calculate_match_score(resume, job, prepared_job=prepared) == \
+        matcher.calculate_match_score(resume, job)
+    # Data prepared by another matcher version is recomputed
+    stale = dict(prepared, version=0, skills={'technical': [], 'soft': [], 'domain': []})
+    assert matcher.calculate_match_score(resume, job, prepared_job=stale) == \
+        matcher.calculate_match_score(resume, job)
@@ -0,0 +1,23 @@
+"""
+Tests for the load generator helpers.
+"""
+import pytest
+from django.core.management.base import CommandError
+
+from api.management.commands.loadtest import Command, percentile
+
+
+def test_percentile_uses_nearest_rank():
+    values = list(range(1, 101))
+    assert percentile(values, 0.50) == 50
+    assert percentile(values, 0.95) == 95
+    assert percentile(values, 0.99) == 99
+    assert percentile([7], 0.99) == 7
+    assert percentile([], 0.5) is None
+
+
+def test_mix_rejects_unknown_endpoints():
+    command = Command()
+    assert command._parse_mix('analyze=3,list') == {'analyze': 3.0, 'list': 1.0}
+    with pytest.raises(CommandError):
+        command._parse_mix('delete=1')
@@ -0,0 +1,109 @@
+"""
+Tests for the two-tier match result cache.
+"""
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from api.adapters.repositories import MatchCacheRepository
+from api.ai.match_cache import MATCH_CACHE_LOOKUPS, MatchCache, MemoryMatchCache
+from api.models import MatchResult
+
+
+def counting(result):
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return dict(result)
+    return calls, compute
+
+
+def test_memory_tier_evicts_least_recently_used_and_expired_entries():
+    cache = MemoryMatchCache(max_entries=2)
+    cache.set('a', {'score': 1})
+    cache.set('b', {'score': 2})
+    cache.get('a')
+    cache.set('c', {'score': 3})
+
+    assert cache.get('b') is None
+    assert cache.get('a') == {'score': 1}
+
+    expiring = MemoryMatchCache(max_age_seconds=0)
+    expiring.set('a', {'score': 1})
+    assert expiring.get('a') is None
+
+
+def test_matches_are_computed_once_per_pair_and_returned_as_copies():
+    cache = MatchCache(memory=MemoryMatchCache())
+    calls, compute = counting({'overall_match_score': 80})
+    hits = MATCH_CACHE_LOOKUPS.value(('memory', 'hit'))
+
+    first = cache.get_or_compute("resume", "job", compute, 1)
+    first['job_specific_suggestions'] = ["Add Go"]
+    second = cache.get_or_compute("resume", "job", compute, 1)
+
+    assert calls == [1]
+    assert second == {'overall_match_score': 80}
+    assert MATCH_CACHE_LOOKUPS.value(('memory', 'hit')) == hits + 1
+
+    # Changing either side is a different pair
+    cache.get_or_compute("resume v2", "job", compute, 1)
+    cache.get_or_compute("resume", "job v2", compute, 1)
+    assert len(calls) == 3
+
+    # So is a new taxonomy version
+    cache.get_or_compute("resume", "job", compute, 2)
+    assert len(calls) == 4
+
+
+@pytest.mark.django_db
+def test_persistent_tier_is_shared_and_promoted_to_memory():
+    repository = MatchCacheRepository(MatchResult)
+    calls, compute = counting({'overall_match_score': 55})
+    MatchCache(memory=MemoryMatchCache(), persistent=repository).get_or_compute("resume", "job", compute, 1)
+
+    # Another worker, with an empty memory tier
+    memory = MemoryMatchCache()
+    other = MatchCache(memory=memory, persistent=repository)
+
+    assert other.get_or_compute("resume", "job", compute, 1) == {'overall_match_score': 55}
+    assert calls == [1]
+    assert len(memory._entries) == 1
+
+
+@pytest.mark.django_db
+def test_repository_bounds_entries_by_count_and_age(django_assert_num_queries):
+    repository = MatchCacheRepository(MatchResult, max_entries=2, retention_days=1)
+    for i in range(3):
+        with django_assert_num_queries(1):
+            repository.set(f'{i}' * 64, 'j' * 64, 1, 1, {'overall_match_score': i})
+    assert MatchResult.objects.count() == 3
+
+    assert repository.prune() == 1
+    assert MatchResult.objects.count() == 2
+    assert repository.get('0' * 64, 'j' * 64, 1, 1) is None
+    assert repository.get('2' * 64, 'j' * 64, 1, 1) == {'overall_match_score': 2}
+    assert repository.get('2' * 64, 'j' * 64, 2, 1) is None
+    assert repository.get('2' * 64, 'j' * 64, 1, 2) is None
+
+    MatchResult.objects.update(created_at=timezone.now() - timedelta(days=2))
+    assert repository.get('2' * 64, 'j' * 64, 1, 1) is None
+
+
+@pytest.mark.django_db
+def test_prune_caches_command_applies_the_settings(settings):
+    settings.ANALYSIS_MATCH_CACHE_DB_ENTRIES = 1
+    repository = MatchCacheRepository(MatchResult)
+    for i in range(3):
+        repository.set(f'{i}' * 64, 'j' * 64, 1, 1, {'overall_match_score': i})
+    out = StringIO()
+
+    call_command('prune_caches', stdout=out)
+
+    assert "Dropped 2 match cache entries" in out.getvalue()
+    assert "Dropped 0 section cache entries" in out.getvalue()
+    assert list(MatchResult.objects.values_list('result', flat=True)) == [{'overall_match_score': 2}]
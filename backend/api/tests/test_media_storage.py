@@ -0,0 +1,84 @@
+"""
+Tests for the sharded media layout and its maintenance commands.
+"""
+import os
+
+import pytest
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+
+from api.adapters.services import FileService
+from api.models import Resume
+
+
+@pytest.fixture
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = str(tmp_path)
+    return str(tmp_path)
+
+
+def _write(path, content=b'resume'):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(content)
+    os.utime(path, (0, 0))
+    return path
+
+
+def test_save_places_file_in_hash_shard(media_root):
+    file_service = FileService(media_root)
+    path = file_service.save(SimpleUploadedFile('cv.txt', b'Python developer'))
+
+    relative = os.path.relpath(path, file_service.upload_dir).split(os.sep)
+    assert len(relative) == 3
+    assert all(len(part) == 2 for part in relative[:2])
+    assert os.path.dirname(path) == file_service.shard_dir(os.path.basename(path))
+
+
+@pytest.mark.django_db
+def test_shard_media_moves_files_and_updates_rows(media_root):
+    file_service = FileService(media_root)
+    user = User.objects.create_user('alice', password='pw')
+    old_path = _write(os.path.join(file_service.upload_dir, 'abc_cv.txt'))
+    resume = Resume.objects.create(user=user, file_path=old_path, content='x')
+
+    call_command('shard_media', stdout=open(os.devnull, 'w'))
+
+    resume.refresh_from_db()
+    assert not os.path.exists(old_path)
+    assert os.path.exists(resume.file_path)
+    assert os.path.dirname(resume.file_path) == file_service.shard_dir('abc_cv.txt')
+
+
+@pytest.mark.django_db
+def test_gc_media_removes_only_unreferenced_files(media_root):
+    file_service = FileService(media_root)
+    user = User.objects.create_user('bob', password='pw')
+    kept = _write(os.path.join(file_service.shard_dir('kept.txt'), 'kept.txt'))
+    orphan = _write(os.path.join(file_service.shard_dir('orphan.txt'), 'orphan.txt'))
+    legacy_orphan = _write(os.path.join(file_service.upload_dir, 'legacy.txt'))
+    fresh = os.path.join(file_service.shard_dir('fresh.txt'), 'fresh.txt')
+    _write(fresh)
+    os.utime(fresh, None)
+    Resume.objects.create(user=user, file_path=kept, content='x')
+
+    call_command('gc_media', batch_size=1, stdout=open(os.devnull, 'w'))
+
+    assert os.path.exists(kept)
+    assert os.path.exists(fresh)
+    assert not os.path.exists(orphan)
+    assert not os.path.exists(legacy_orphan)
+    assert not os.path.exists(os.path.join(media_root, '.gc_media_checkpoint'))
+
+
+@pytest.mark.django_db(transaction=True)
+def test_deleting_resume_removes_its_file(media_root):
+    file_service = FileService(media_root)
+    user = User.objects.create_user('carol', password='pw')
+    path = _write(os.path.join(file_service.shard_dir('cv.txt'), 'cv.txt'))
+    resume = Resume.objects.create(user=user, file_path=path, content='x')
+
+    resume.delete()
+
+    assert not os.path.exists(path)
@@ -0,0 +1,155 @@
+"""
+Tests for stage timing and metrics exposition.
+"""
+import pytest
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from rest_framework.test import APIClient
+
+from api.observability import timing
+from api.observability.metrics import Registry
+
+
+@pytest.fixture
+def stage_timing():
+    previous = timing.is_enabled()
+    timing.configure(True)
+    yield
+    timing.configure(previous)
+
+
+def test_histogram_renders_prometheus_text():
+    registry = Registry()
+    histogram = registry.histogram('demo_seconds', 'Demo.', labelnames=('stage',), buckets=(0.1, 1.0))
+    histogram.observe(0.05, ('a',))
+    histogram.observe(0.5, ('a',))
+
+    text = registry.render()
+
+    assert '# TYPE demo_seconds histogram' in text
+    assert 'demo_seconds_bucket{stage="a",le="0.1"} 1' in text
+    assert 'demo_seconds_bucket{stage="a",le="+Inf"} 2' in text
+    assert 'demo_seconds_count{stage="a"} 2' in text
+
+
+def test_span_is_a_noop_when_disabled():
+    previous = timing.is_enabled()
+    timing.configure(False)
+    try:
+        with timing.collect_spans() as collected:
+            with timing.span('test', 'noop'):
+                pass
+    finally:
+        timing.configure(previous)
+    assert collected == []
+    assert timing.STAGE_SECONDS.snapshot(('test', 'noop')) is None
+
+
+def test_spans_are_collected_and_aggregated(stage_timing):
+    with timing.collect_spans() as collected:
+        for _ in range(2):
+            with timing.span('test', 'stage'):
+                pass
+
+    assert [name for name, _ in collected] == ['test.stage', 'test.stage']
+    assert timing.summarize_spans(collected)['test.stage'][1] == 2
+    assert timing.STAGE_SECONDS.snapshot(('test', 'stage'))['count'] >= 2
+
+
+@pytest.mark.django_db
+def test_metrics_endpoint_is_restricted_to_allowed_addresses(settings):
+    client = APIClient()
+    assert client.get('/api/metrics/').status_code == 200
+
+    settings.METRICS_ALLOWED_IPS = []
+    assert client.get('/api/metrics/').status_code == 403
+
+
+@pytest.mark.django_db
+def test_debug_mode_adds_server_timing_header(settings, tmp_path, stage_timing):
+    settings.DEBUG = True
+    settings.MEDIA_ROOT = str(tmp_path)
+    client = APIClient()
+    client.force_authenticate(User.objects.create_user('dana', password='pw'))
+
+    response = client.post('/api/resumes/upload/', {'file': SimpleUploadedFile('cv.txt', b'Python')})
+
+    assert response.status_code == 201
+    assert 'file_service.extract_text;dur=' in response['Server-Timing']
+
+
+@pytest.mark.django_db
+def test_request_metrics_record_queries_per_route(settings, caplog):
+    from api.observability.middleware import REQUEST_DB_QUERIES, REQUESTS
+
+    settings.SLOW_REQUEST_SECONDS = 0
+    user = User.objects.create_user('erin', password='pw')
+    client = APIClient()
+    client.force_authenticate(user)
+    before = REQUESTS.value(('resume-list', 'GET', '200'))
+
+    with caplog.at_level('WARNING', logger='api.requests'):
+        assert client.get('/api/resumes/').status_code == 200
+
+    assert REQUESTS.value(('resume-list', 'GET', '200')) == before + 1
+    assert REQUEST_DB_QUERIES.snapshot(('resume-list', 'GET'))['sum'] >= 1
+    assert 'Slow request GET /api/resumes/ (resume-list)' in caplog.text
+    assert 'FROM "api_resume"' in caplog.text
+
+
+@pytest.mark.django_db
+def test_streaming_responses_are_measured_until_closed(settings):
+    from api.observability.middleware import REQUEST_DB_QUERIES, REQUESTS, RESPONSE_BYTES
+
+    user = User.objects.create_user('erin', password='pw')
+    client = APIClient()
+    client.force_authenticate(user)
+    labels = ('resume-export', 'GET')
+
+    def total(histogram):
+        return (histogram.snapshot(labels) or {}).get('sum', 0)
+
+    before = REQUESTS.value((*labels, '200'))
+    queries, size = total(REQUEST_DB_QUERIES), total(RESPONSE_BYTES)
+
+    response = client.get('/api/resumes/export/')
+    assert REQUESTS.value((*labels, '200')) == before
+
+    content = b''.join(response.streaming_content)
+    assert REQUESTS.value((*labels, '200')) == before + 1
+    # The export query runs while the stream is read
+    assert total(REQUEST_DB_QUERIES) >= queries + 1
+    assert total(RESPONSE_BYTES) == size + len(content)
+
+
+def test_memory_profiling_records_outermost_stage_sites():
+    from api.observability import memory
+
+    memory.configure(True, top_n=5)
+    memory.reset()
+    try:
+        with timing.span('test', 'outer'):
+            with timing.span('test', 'inner'):
+                retained = [bytearray(1024) for _ in range(100)]
+        report = memory.report()
+    finally:
+        memory.configure(False)
+
+    assert report['stages']['test.outer']['profiled_calls'] == 1
+    assert report['stages']['test.outer']['net_bytes'] >= 100 * 1024
+    assert report['stages']['test.outer']['top_sites']
+    assert report['stages']['test.inner']['profiled_calls'] == 0
+    assert report['rss_bytes'] and report['peak_rss_bytes']
+    assert len(retained) == 100
+
+
+@pytest.mark.django_db
+def test_memory_report_is_admin_only():
+    client = APIClient()
+    client.force_authenticate(User.objects.create_user('frank', password='pw'))
+    assert client.get('/api/metrics/memory/').status_code == 403
+
+    client.force_authenticate(User.objects.create_superuser('root', password='pw'))
+    response = client.get('/api/metrics/memory/')
+    assert response.status_code == 200
+    assert 'peak_rss_bytes' in response.data
@@ -0,0 +1,59 @@
+"""
+Tests for on-demand request profiling.
+"""
+import pstats
+
+import pytest
+from django.contrib.auth.models import User
+from rest_framework.test import APIClient
+
+from api.models import RequestProfile
+
+
+@pytest.fixture
+def profile_dir(settings, tmp_path):
+    settings.PROFILE_DIR = str(tmp_path)
+    settings.PROFILING_SAMPLE_RATE = 0
+    return tmp_path
+
+
+@pytest.mark.django_db
+def test_staff_can_profile_a_request_and_download_it(profile_dir):
+    client = APIClient()
+    client.force_authenticate(User.objects.create_superuser('admin', password='pw'))
+
+    response = client.get('/api/resumes/', HTTP_X_PROFILE='1')
+
+    assert response.status_code == 200
+    profile_id = response['X-Profile-Id']
+    detail = client.get(f'/api/profiles/{profile_id}/')
+    assert detail.data['view_name'] == 'resume-list'
+    assert 'cumulative' in detail.data['summary']
+
+    download = client.get(f'/api/profiles/{profile_id}/download/')
+    dumped = profile_dir / 'downloaded.prof'
+    dumped.write_bytes(b''.join(download.streaming_content))
+    assert pstats.Stats(str(dumped)).total_calls > 0
+
+
+@pytest.mark.django_db
+def test_profiling_flag_is_ignored_for_regular_users(profile_dir):
+    client = APIClient()
+    client.force_authenticate(User.objects.create_user('grace', password='pw'))
+
+    response = client.get('/api/resumes/?profile=1')
+
+    assert response.status_code == 200
+    assert 'X-Profile-Id' not in response
+    assert client.get('/api/profiles/').status_code == 403
+
+
+@pytest.mark.django_db
+def test_sample_rate_profiles_requests_automatically(profile_dir, settings):
+    settings.PROFILING_SAMPLE_RATE = 1.0
+    client = APIClient()
+    client.force_authenticate(User.objects.create_user('heidi', password='pw'))
+
+    client.get('/api/feedback/')
+
+    assert RequestProfile.objects.get().sampled
@@ -0,0 +1,149 @@
+"""
+Tests for analyzer versions and the reanalyze backfill command.
+"""
+import json
+from io import StringIO
+
+import pytest
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from rest_framework.test import APIClient
+
+from api.ai import engines
+from api.models import Feedback, Resume
+
+
+class VersionedEngine:
+    """
+    Scores every resume 70, and fails on resumes mentioning 'broken'.
+    Resumes mentioning 'racing' are saved again while being analyzed, as by
+    a concurrent request.
+    """
+
+    version = 'versioned:2'
+
+    def analyze_resume(self, resume_text, sections=None, fields=None, deadline=None):
+        if 'broken' in resume_text:
+            raise RuntimeError("cannot analyze")
+        if 'racing' in resume_text:
+            resume = Resume.objects.get(content=resume_text)
+            resume.score = 99
+            resume.save()
+        return {'score': 70, 'category_scores': {'education': 70}, 'feedback': {'education': "Clear"},
+                'improvement_suggestions': ["Add dates"]}
+
+
+@pytest.fixture
+def user(settings):
+    settings.ANALYSIS_ENGINE = 'versioned'
+    settings.ANALYSIS_ENGINE_CANARY = {}
+    engines.register('versioned', VersionedEngine)
+    yield User.objects.create_user('ash', password='pw')
+    engines._factories.pop('versioned', None)
+    engines.reset()
+
+
+def reanalyze(tmp_path, *args):
+    out = StringIO()
+    call_command('reanalyze', '--workers', '0', '--nice', '0', '--checkpoint', str(tmp_path / 'checkpoint'),
+                 *args, stdout=out)
+    return out.getvalue()
+
+
+@pytest.mark.django_db
+def test_analyze_records_the_analyzer_version(user):
+    client = APIClient()
+    client.force_authenticate(user)
+    resume = Resume.objects.create(user=user, file_path='a.txt', content="Python developer")
+    broken = Resume.objects.create(user=user, file_path='b.txt', content="broken resume")
+
+    response = client.post(f'/api/resumes/{resume.id}/analyze/')
+    client.post(f'/api/resumes/{broken.id}/analyze/')
+
+    assert response.data['analyzer_version'] == 'versioned:2'
+    assert 'analyzer_version' not in response.data['feedback']
+    # Failed analyses stay unversioned
+    broken.refresh_from_db()
+    assert broken.score == 50 and broken.analyzer_version is None
+
+
+@pytest.mark.django_db
+def test_reanalyze_rewrites_stale_analyses_in_bulk(user, tmp_path):
+    old = Resume.objects.create(user=user, file_path='1.txt', content="Old", score=40, analyzer_version='versioned:1')
+    unversioned = Resume.objects.create(user=user, file_path='2.txt', content="Unversioned", score=30)
+    current = Resume.objects.create(user=user, file_path='3.txt', content="Current", score=90,
+                                    analyzer_version='versioned:2')
+    never = Resume.objects.create(user=user, file_path='4.txt', content="Never analyzed")
+    broken = Resume.objects.create(user=user, file_path='5.txt', content="broken", score=20)
+    Feedback.objects.create(resume=old, category='education', content="Stale", score=40)
+
+    assert reanalyze(tmp_path, '--dry-run').startswith("3 resumes")
+    output = reanalyze(tmp_path, '--chunk-size', '2')
+
+    assert "Re-analyzed 2 resumes with versioned:2" in output and "1 failed" in output
+    for resume in (old, unversioned):
+        resume.refresh_from_db()
+        assert (resume.score, resume.analyzer_version) == (70, 'versioned:2')
+        assert resume.sections is not None
+        assert resume.feedback['education'] == "Clear"
+        assert Feedback.objects.get(resume=resume, category='education').content == "Clear"
+    for resume, score in ((current, 90), (never, None), (broken, 20)):
+        resume.refresh_from_db()
+        assert resume.score == score
+    assert not (tmp_path / 'checkpoint').exists()
+
+
+@pytest.mark.django_db
+def test_reanalyze_keeps_the_stored_job_match(user, tmp_path):
+    job_match = {'overall_match_score': 64, 'job_specific_suggestions': ["Add Kubernetes", "Add dates"]}
+    resume = Resume.objects.create(user=user, file_path='1.txt', content="Old", score=40,
+                                   feedback={'job_match': job_match, 'improvement_suggestions': ["Stale"]})
+
+    reanalyze(tmp_path)
+
+    resume.refresh_from_db()
+    assert resume.analyzer_version == 'versioned:2'
+    assert resume.feedback['job_match'] == job_match
+    assert resume.feedback['improvement_suggestions'] == ["Add dates", "Add Kubernetes"]
+
+
+@pytest.mark.django_db
+def test_reanalyze_skips_resumes_changed_while_analyzing(user, tmp_path):
+    racing = Resume.objects.create(user=user, file_path='1.txt', content="racing", score=40)
+    other = Resume.objects.create(user=user, file_path='2.txt', content="Other", score=40)
+
+    output = reanalyze(tmp_path)
+
+    assert "Re-analyzed 1 resumes" in output and "1 skipped as changed meanwhile" in output
+    racing.refresh_from_db()
+    assert (racing.score, racing.analyzer_version) == (99, None)
+    assert not Feedback.objects.filter(resume=racing).exists()
+    assert Resume.objects.get(id=other.id).score == 70
+
+
+@pytest.mark.django_db
+def test_reanalyze_resumes_from_its_checkpoint(user, tmp_path):
+    first, second = (
+        Resume.objects.create(user=user, file_path=f'{i}.txt', content=f"Resume {i}", score=10) for i in range(2)
+    )
+
+    reanalyze(tmp_path, '--limit', '1')
+
+    assert json.loads((tmp_path / 'checkpoint').read_text()) == {'version': 'versioned:2', 'last_id': first.id}
+    # Make the first resume stale again: a resumed run must not revisit it
+    Resume.objects.filter(id=first.id).update(analyzer_version=None)
+    output = reanalyze(tmp_path)
+
+    assert f"Resuming after resume {first.id}" in output
+    assert Resume.objects.get(id=first.id).analyzer_version is None
+    assert Resume.objects.get(id=second.id).analyzer_version == 'versioned:2'
+
+
+@pytest.mark.django_db
+def test_reanalyze_fans_out_over_worker_processes(user, tmp_path):
+    resumes = [Resume.objects.create(user=user, file_path=f'{i}.txt', content=f"Resume {i}", score=10)
+               for i in range(5)]
+
+    reanalyze(tmp_path, '--workers', '2', '--chunk-size', '3')
+
+    assert [Resume.objects.get(id=r.id).score for r in resumes] == [70] * 5
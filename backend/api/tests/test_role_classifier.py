@@ -0,0 +1,86 @@
+"""
+Tests for the nearest-centroid job role classifier.
+"""
+import json
+import random
+
+import pytest
+from django.core.management import call_command
+
+from api.ai.role_classifier import RoleClassifier
+from api.benchmarks.corpus import generate_resume
+from api.tests.conftest import requires_nltk_data
+
+DOCUMENTS = [
+    ('data_scientist', "python pandas statistics machine learning model"),
+    ('data_scientist', "statistics regression model notebook"),
+    ('designer', "figma prototype typography layout"),
+    ('designer', "user research prototype wireframe"),
+    ('devops', "kubernetes docker terraform pipeline"),
+]
+
+
+def test_predict_ranks_roles_by_nearest_centroid():
+    classifier = RoleClassifier.train(DOCUMENTS)
+
+    ranked = classifier.predict("regression model in python", k=3)
+
+    assert ranked[0][0] == 'data_scientist'
+    assert ranked[0][1] > ranked[1][1] >= ranked[2][1]
+    assert sum(confidence for _, confidence in classifier.predict("anything", k=3)) == pytest.approx(1)
+    assert len(classifier.predict("prototype", k=10)) == 3
+
+
+def test_calibration_picks_the_temperature_that_fits_held_out_documents():
+    classifier = RoleClassifier.train(DOCUMENTS)
+
+    confident = classifier.calibrate([('designer', "prototype layout"), ('devops', "docker pipeline")])
+
+    # Held-out documents that mostly contradict the model call for hedging
+    hedging = classifier.calibrate([('devops', "prototype layout"), ('designer', "docker pipeline"),
+                                    ('designer', "prototype layout")])
+    assert hedging > confident
+
+
+def test_artifact_round_trip(tmp_path):
+    classifier = RoleClassifier.train(DOCUMENTS, holdout=[('designer', "prototype wireframe")])
+    path = str(tmp_path / 'roles.npz')
+
+    classifier.save(path)
+    loaded = RoleClassifier.load(path)
+
+    assert loaded.roles == classifier.roles
+    assert loaded.temperature == classifier.temperature
+    assert loaded.predict("docker terraform", k=3) == classifier.predict("docker terraform", k=3)
+
+
+@requires_nltk_data
+def test_train_command_writes_a_calibrated_artifact(tmp_path):
+    corpus = tmp_path / 'corpus.jsonl'
+    rng = random.Random(2)
+    with open(corpus, 'w') as f:
+        for _ in range(5):
+            f.write(json.dumps({'role': 'data_scientist', 'text': "Python pandas machine learning statistics"}) + '\n')
+            f.write(json.dumps({'role': 'web_developer', 'text': generate_resume(rng, 'small')}) + '\n')
+    output = str(tmp_path / 'roles.npz')
+
+    call_command('train_role_classifier', '--corpus', str(corpus), '--output', output, '--holdout', '0.4')
+
+    classifier = RoleClassifier.load(output)
+    assert 'web_developer' in classifier.roles and 'software_engineer' in classifier.roles
+    assert classifier.temperature != 0.1
+
+
+@requires_nltk_data
+def test_centroid_engine_reports_the_classifier_role(settings):
+    from api.ai.engines import CentroidEngine
+
+    settings.ANALYSIS_SECTION_CACHE_ENABLED = False
+    engine = CentroidEngine()
+    resume = generate_resume(random.Random(4), 'typical')
+
+    results = engine.analyze_resume(resume, fields=['job_role', 'job_role_confidence'])
+    role, confidence = engine.analyzer.role_classifier.predict(engine.analyzer.preprocess_text(resume))[0]
+
+    assert results['job_role'] == role.replace('_', ' ').title()
+    assert results['job_role_confidence'] == round(confidence * 100)
@@ -0,0 +1,131 @@
+"""
+Tests for resume sectioning and incremental preprocessing.
+"""
+import random
+from datetime import timedelta
+
+import pytest
+from django.contrib.auth.models import User
+from django.utils import timezone
+
+from api.adapters.repositories import SectionCacheRepository
+from api.ai.sections import (
+    MemorySectionCache,
+    category_sections,
+    preprocess_sections,
+    segment,
+    split_sections,
+)
+from api.benchmarks.corpus import generate_resume
+from api.models import AnalysisSection, Resume
+from api.tests.conftest import requires_nltk_data
+
+RESUME = (
+    "Jane Doe\n"
+    "Skills:\n"
+    "Python, Django\n"
+    "EXPERIENCE\n"
+    "Built APIs at Acme\n"
+    "Education\n"
+    "BSc Computer Science\n"
+)
+
+
+def test_sections_split_at_headings_and_rejoin():
+    sections = split_sections(RESUME)
+
+    assert [name for name, _ in sections] == ['header', 'skills', 'experience', 'education']
+    assert ''.join(text for _, text in sections) == RESUME
+
+
+def test_segment_returns_offsets_for_heading_variants():
+    text = "Jane\n  Technical Skills :  \r\nGo\nSkills in the text\nWORK EXPERIENCE\nAcme\n"
+
+    sections = segment(text)
+
+    assert [name for name, _, _ in sections] == ['header', 'skills', 'experience']
+    assert text[sections[1][1]:sections[1][2]] == "  Technical Skills :  \r\nGo\nSkills in the text\n"
+    assert sections[-1][2] == len(text)
+
+
+def test_categories_read_their_sections():
+    sections = segment(RESUME)
+    texts = [text for _, text in split_sections(RESUME, sections)]
+
+    assert category_sections(sections, texts, 'technical_skills') == ["Skills:\nPython, Django\n"]
+    assert category_sections(sections, texts, 'achievements') == []
+    assert category_sections(sections, texts, 'formatting') == []
+
+
+def test_only_changed_sections_are_preprocessed():
+    calls = []
+
+    def preprocess(text):
+        calls.append(text)
+        return ' '.join(text.lower().split())
+
+    cache = MemorySectionCache()
+    first = preprocess_sections(RESUME, preprocess, cache)
+    assert ' '.join(preprocessed for _, preprocessed in first) == preprocess(RESUME)
+    calls.clear()
+
+    edited = RESUME.replace("Built APIs at Acme", "Built and scaled APIs at Acme")
+    preprocess_sections(edited, preprocess, cache)
+
+    assert calls == ["EXPERIENCE\nBuilt and scaled APIs at Acme\n"]
+
+
+@pytest.mark.django_db
+def test_section_cache_repository_round_trip(django_assert_num_queries):
+    repository = SectionCacheRepository(AnalysisSection, retention_days=1)
+
+    repository.set_many({'a' * 64: 'python django'})
+    with django_assert_num_queries(1):
+        repository.set_many({'a' * 64: 'python django'})
+
+    assert repository.get_many(['a' * 64, 'b' * 64]) == {'a' * 64: 'python django'}
+    assert AnalysisSection.objects.count() == 1
+
+    assert repository.prune() == 0
+    AnalysisSection.objects.update(created_at=timezone.now() - timedelta(days=2))
+    assert repository.prune() == 1
+
+
+@pytest.mark.django_db
+def test_deleting_a_resume_purges_its_cached_sections():
+    user = User.objects.create_user('lee', password='pw')
+    resume = Resume.objects.create(user=user, file_path='r.txt', content=RESUME)
+    repository = SectionCacheRepository(AnalysisSection)
+    preprocess_sections(RESUME, str.lower, repository)
+    repository.set_many({'a' * 64: 'other resume'})
+
+    resume.delete()
+
+    assert list(AnalysisSection.objects.values_list('fingerprint', flat=True)) == ['a' * 64]
+
+
+@requires_nltk_data
+def test_sectioned_preprocessing_matches_whole_document():
+    from api.ai.resume_analyzer import AdvancedResumeAnalyzer
+
+    analyzer = AdvancedResumeAnalyzer()
+    rng = random.Random(7)
+    for size in ('small', 'typical'):
+        resume = generate_resume(rng, size)
+        parts = preprocess_sections(resume, analyzer.preprocess_text)
+        assert ' '.join(preprocessed for _, preprocessed in parts) == analyzer.preprocess_text(resume)
+
+
+@requires_nltk_data
+def test_section_scoring_uses_the_skills_section():
+    from api.ai.resume_analyzer import AdvancedResumeAnalyzer
+
+    analyzer = AdvancedResumeAnalyzer()
+    resume = generate_resume(random.Random(11), 'typical')
+    skills = ''.join(category_sections(segment(resume), [t for _, t in split_sections(resume)], 'technical_skills'))
+
+    results = analyzer.analyze_resume(resume, section_scoring=True)
+
+    assert skills
+    assert results['category_scores']['technical_skills'] == analyzer.analyze_category(skills, 'technical_skills')[0]
+    assert results['category_scores']['formatting'] == analyzer.analyze_category(resume, 'formatting')[0]
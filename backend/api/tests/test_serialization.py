@@ -0,0 +1,108 @@
+"""
+Tests for the compiled serializers and FastJSONRenderer of the read paths.
+"""
+import json
+
+import pytest
+from django.contrib.auth.models import User
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from api import renderers
+from api.models import Feedback, Resume
+from api.renderers import FastJSONRenderer, RawJSON
+
+FEEDBACK = {
+    'category_scores': {'education': 80},
+    'education': "Clear \u2014 na\u00efve dates\u2028fixed",
+    'improvement_suggestions': ["Quantify results"],
+    'job_match': {'matched_skills': {'technical': ['python']}, 'overall_match_score': 71.5},
+}
+
+
+@pytest.fixture
+def client():
+    user = User.objects.create_user('ash', password='pw', email='ash@example.com')
+    for i in range(3):
+        resume = Resume.objects.create(user=user, file_path=f'{i}.txt', content=f"Resume {i}", score=70 + i,
+                                       feedback=FEEDBACK if i else None, sections=[['education', 0, 6]],
+                                       analyzer_version='legacy:1:1')
+        Feedback.objects.create(resume=resume, category='education', content="Clear", score=80)
+    client = APIClient()
+    client.force_authenticate(user)
+    return client
+
+
+def get_both(client, settings, url):
+    """The JSON of a response with and without the fast path."""
+    fast = json.loads(client.get(url).content)
+    settings.FAST_SERIALIZATION_ENABLED = False
+    slow = json.loads(client.get(url).content)
+    settings.FAST_SERIALIZATION_ENABLED = True
+    return fast, slow
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('url', ['/api/resumes/', '/api/feedback/'])
+def test_fast_reads_match_the_model_serializers(client, settings, url):
+    fast, slow = get_both(client, settings, url)
+    assert fast == slow and len(fast) == 3
+
+    detail = f"{url}{fast[1]['id']}/"
+    fast, slow = get_both(client, settings, detail)
+    assert fast == slow
+
+
+@pytest.mark.django_db
+def test_stored_feedback_is_passed_through_unparsed(client):
+    resume = Resume.objects.get(file_path='1.txt')
+
+    response = client.get(f'/api/resumes/{resume.id}/')
+
+    assert isinstance(response.data['feedback'], RawJSON)
+    assert json.loads(response.data['feedback'].text) == FEEDBACK
+    assert json.loads(response.content)['feedback'] == FEEDBACK
+
+
+@pytest.mark.django_db
+def test_list_queries_do_not_grow_with_resumes(client, django_assert_num_queries):
+    with django_assert_num_queries(2):
+        client.get('/api/resumes/')
+
+
+@pytest.mark.parametrize('use_orjson', [True, False])
+def test_fast_renderer_matches_json_renderer(monkeypatch, use_orjson):
+    if not use_orjson:
+        monkeypatch.setattr(renderers, 'orjson', None)
+    data = [{'name': "Zo\u00eb\u2028\u2029", 'score': 7.5, 'tags': ['a', None], 'nested': {'ok': True}}]
+
+    assert FastJSONRenderer().render(data) == JSONRenderer().render(data)
+
+
+@pytest.mark.parametrize('use_orjson', [True, False])
+def test_raw_json_is_spliced_in_and_cannot_be_forged(monkeypatch, use_orjson):
+    if not use_orjson:
+        monkeypatch.setattr(renderers, 'orjson', None)
+    data = {'feedback': RawJSON('{"a": [1, 2], "s": "\u2029"}'), 'forged': "\x00abcdef01234567890", 'empty': None}
+
+    rendered = FastJSONRenderer().render(data)
+
+    assert rendered.startswith(b'{"feedback":{"a": [1, 2], "s": "\\u2029"},')
+    assert json.loads(rendered) == {'feedback': {'a': [1, 2], 's': "\u2029"}, 'forged': "\x00abcdef01234567890",
+                                    'empty': None}
+
+
+def test_indented_output_decodes_raw_json():
+    rendered = FastJSONRenderer().render({'feedback': RawJSON('{"a":1}')}, 'application/json; indent=2')
+
+    assert rendered == b'{\n  "feedback": {\n    "a": 1\n  }\n}'
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('enabled, renderer', [(True, FastJSONRenderer), (False, JSONRenderer)])
+def test_renderer_follows_the_setting(client, settings, enabled, renderer):
+    settings.FAST_SERIALIZATION_ENABLED = enabled
+
+    responses = [client.get('/api/resumes/'), client.post('/api/resumes/upload/', {})]
+
+    assert [type(response.accepted_renderer) for response in responses] == [renderer, renderer]
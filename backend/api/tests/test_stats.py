@@ -0,0 +1,68 @@
+"""
+Tests for the resume stats endpoint.
+"""
+from datetime import datetime, timezone
+
+import pytest
+from django.contrib.auth.models import User
+from rest_framework.test import APIClient
+
+from api.models import Feedback, Resume
+
+
+@pytest.fixture
+def client():
+    user = User.objects.create_user('ash', password='pw')
+    other = User.objects.create_user('brook', password='pw')
+    for day, score in ((1, 35), (2, 60), (3, 100)):
+        resume = Resume.objects.create(user=user, file_path=f'{day}.txt', content="Resume", score=score,
+                                       created_at=datetime(2026, 3, day, tzinfo=timezone.utc))
+        Feedback.objects.create(resume=resume, category='education', content="Fine", score=score)
+        if score >= 60:
+            Feedback.objects.create(resume=resume, category='formatting', content="Tidy", score=score - 10)
+    Resume.objects.create(user=user, file_path='new.txt', content="Not analyzed")
+    stranger = Resume.objects.create(user=other, file_path='other.txt', content="Resume", score=5)
+    Feedback.objects.create(resume=stranger, category='education', content="Weak", score=5)
+    client = APIClient()
+    client.force_authenticate(user)
+    return client
+
+
+@pytest.mark.django_db
+def test_stats_aggregate_the_users_resumes(client, django_assert_num_queries):
+    with django_assert_num_queries(2):
+        response = client.get('/api/resumes/stats/')
+
+    assert response.status_code == 200
+    stats = response.data
+    assert (stats['count'], stats['analyzed']) == (4, 3)
+    assert (stats['average_score'], stats['min_score'], stats['max_score']) == (65, 35, 100)
+    counts = {bucket['min']: bucket['count'] for bucket in stats['score_distribution']}
+    assert counts == {0: 0, 10: 0, 20: 0, 30: 1, 40: 0, 50: 0, 60: 1, 70: 0, 80: 0, 90: 1}
+    assert stats['score_distribution'][-1] == {'min': 90, 'max': 100, 'count': 1}
+    assert stats['category_averages'] == {
+        'education': {'average_score': 65, 'count': 3},
+        'formatting': {'average_score': 70, 'count': 2},
+    }
+
+
+@pytest.mark.django_db
+def test_stats_accept_the_export_filters(client):
+    stats = client.get('/api/resumes/stats/?created_after=2026-03-02&max_score=80').data
+
+    assert (stats['count'], stats['average_score']) == (1, 60)
+    assert stats['category_averages'] == {
+        'education': {'average_score': 60, 'count': 1},
+        'formatting': {'average_score': 50, 'count': 1},
+    }
+
+
+@pytest.mark.django_db
+def test_stats_of_a_user_without_analyses(client):
+    client.force_authenticate(User.objects.create_user('casey', password='pw'))
+
+    stats = client.get('/api/resumes/stats/').data
+
+    assert (stats['count'], stats['average_score'], stats['min_score']) == (0, None, None)
+    assert stats['category_averages'] == {}
+    assert client.get('/api/resumes/stats/?min_score=x').status_code == 400
@@ -0,0 +1,136 @@
+"""
+Tests for streaming analysis over server-sent events.
+"""
+import json
+import random
+
+import pytest
+from django.contrib.auth.models import User
+from rest_framework.test import APIClient
+
+from api.adapters.services import ResumeAnalyzerService
+from api.ai import engines
+from api.benchmarks.corpus import generate_resume
+from api.models import Feedback, Resume
+from api.tests.conftest import requires_nltk_data
+
+
+class SteppingEngine:
+    """Yields two stages and records how far each analysis got."""
+
+    progress = []
+
+    def iter_analysis(self, resume_text, sections=None, fields=None, deadline=None):
+        SteppingEngine.progress.append('started')
+        try:
+            yield 'category_score', {'category': 'education', 'score': 80}
+            yield 'stage', {
+                'stage': 'category_scores',
+                'results': {'score': 80, 'category_scores': {'education': 80}, 'feedback': {'education': "Good"}},
+            }
+            SteppingEngine.progress.append('scored')
+            yield 'stage', {'stage': 'keywords', 'results': {'keywords': ['python']}}
+            SteppingEngine.progress.append('finished')
+            yield 'done', {'completed_stages': ['category_scores', 'keywords'], 'degraded': False}
+        finally:
+            SteppingEngine.progress.append('closed')
+
+
+def parse_events(content):
+    events = []
+    for frame in content.decode('utf-8').strip().split('\n\n'):
+        lines = dict(line.split(': ', 1) for line in frame.split('\n'))
+        events.append((lines['event'], json.loads(lines['data'])))
+    return events
+
+
+@pytest.fixture
+def client(settings):
+    settings.ANALYSIS_ENGINE_CANARY = {}
+    engines.register('stepping', SteppingEngine)
+    SteppingEngine.progress = []
+    user = User.objects.create_user('lee', password='pw')
+    api_client = APIClient()
+    api_client.force_authenticate(user)
+    api_client.resume = Resume.objects.create(user=user, file_path='r.txt', content='Python developer')
+    yield api_client
+    engines._factories.pop('stepping', None)
+    engines.reset()
+
+
+@pytest.mark.django_db
+def test_stream_emits_results_in_order_and_saves_the_analysis(client):
+    response = client.post(f'/api/resumes/{client.resume.id}/analyze/stream/?engine=stepping')
+
+    assert response.status_code == 200
+    assert response['Content-Type'] == 'text/event-stream'
+    assert response['Cache-Control'] == 'no-cache'
+    events = parse_events(b''.join(response.streaming_content))
+
+    assert [event for event, _ in events] == ['start', 'category_score', 'stage', 'stage', 'complete']
+    assert events[0][1] == {'resume_id': client.resume.id, 'engine': 'stepping'}
+    assert events[1][1] == {'category': 'education', 'score': 80}
+    assert events[3][1]['results'] == {'keywords': ['python']}
+    assert events[-1][1]['score'] == 80
+    assert events[-1][1]['feedback']['keywords'] == ['python']
+
+    client.resume.refresh_from_db()
+    assert client.resume.score == 80
+    assert Feedback.objects.get(resume=client.resume).category == 'education'
+
+
+@pytest.mark.django_db
+def test_stream_errors_before_streaming_are_sent_as_events(client):
+    response = client.post('/api/resumes/999/analyze/stream/?engine=stepping', HTTP_ACCEPT='text/event-stream')
+
+    assert response.status_code == 404
+    assert parse_events(response.content) == [('error', {'error': "Resume with ID 999 not found"})]
+
+
+@pytest.mark.django_db
+def test_disconnect_stops_the_analysis_without_saving(client):
+    response = client.post(f'/api/resumes/{client.resume.id}/analyze/stream/?engine=stepping')
+    content = iter(response.streaming_content)
+    next(content)
+    next(content)
+
+    response.close()
+
+    assert SteppingEngine.progress == ['started', 'closed']
+    client.resume.refresh_from_db()
+    assert client.resume.score is None
+
+
+def test_service_streams_engines_without_iter_analysis():
+    class BatchEngine:
+        name = 'batch'
+
+        def analyze_resume(self, resume_text, sections=None, fields=None, deadline=None):
+            return {'score': 65, 'feedback': {}}
+
+    events = list(ResumeAnalyzerService(None, engine=BatchEngine()).stream_analysis("resume"))
+
+    assert [event for event, _ in events] == ['stage', 'complete']
+    assert events[-1][1] == {'score': 65, 'feedback': {'engine': 'batch', 'analyzer_version': 'batch'}}
+
+
+@requires_nltk_data
+def test_streamed_analysis_matches_analyze_resume():
+    from api.ai.resume_analyzer import AdvancedResumeAnalyzer
+
+    analyzer = AdvancedResumeAnalyzer()
+    resume = generate_resume(random.Random(13), 'typical')
+
+    # General improvement suggestions are sampled at random
+    random.seed(1)
+    streamed = {}
+    scores = {}
+    for event, data in analyzer.iter_analysis(resume):
+        if event == 'category_score':
+            scores[data['category']] = data['score']
+        elif event == 'stage':
+            streamed.update(data['results'])
+
+    random.seed(1)
+    assert streamed == analyzer.analyze_resume(resume)
+    assert scores == streamed['category_scores']
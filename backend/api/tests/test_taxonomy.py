@@ -0,0 +1,177 @@
+"""
+Tests for the versioned, hot-reloadable skill and role taxonomy.
+"""
+import copy
+import itertools
+import json
+import os
+from io import StringIO
+from pathlib import Path
+
+import pytest
+from django.core.management import CommandError, call_command
+
+from api.ai import taxonomy
+from api.ai.taxonomy import Taxonomy, TaxonomyError
+from api.tests.conftest import requires_nltk_data
+
+with open(taxonomy.DEFAULT_PATH, encoding='utf-8') as f:
+    SHIPPED = json.load(f)
+
+_mtimes = itertools.count(1)
+
+
+def write(path, data):
+    path.write_text(json.dumps(data))
+    # Distinct modification times, however coarse the filesystem clock
+    mtime = 1_700_000_000_000_000_000 + next(_mtimes) * 1_000_000_000
+    os.utime(path, ns=(mtime, mtime))
+
+
+def version(number, **changes):
+    data = copy.deepcopy(SHIPPED)
+    data['version'] = number
+    data.update(changes)
+    return data
+
+
+@pytest.fixture
+def taxonomy_file(tmp_path, settings):
+    path = tmp_path / 'taxonomy.json'
+    write(path, version(1))
+    settings.TAXONOMY_PATH = str(path)
+    settings.TAXONOMY_CHECK_SECONDS = 0
+    taxonomy.reset()
+    yield path
+    taxonomy.reset()
+
+
+def test_compiled_skill_index_categorizes_tokens_once_in_order():
+    compiled = Taxonomy.compile(version(1, skills={
+        'technical': ['Python', 'sql', 'python'],
+        'soft': ['leadership', 'sql'],
+        'domain': ['finance'],
+    }))
+
+    found = compiled.categorize("sql python finance sql chess python".split())
+
+    assert found == {'technical': ['sql', 'python'], 'soft': ['sql'], 'domain': ['finance']}
+
+
+@pytest.mark.parametrize('changes', [
+    {'version': 0},
+    {'version': '2'},
+    {'skills': {'technical': ['python'], 'soft': []}},
+    {'skills': {'technical': ['python', ''], 'soft': [], 'domain': []}},
+    {'categories': {'education': "Degree"}},
+    {'roles': {}},
+    {'roles': {'designer': 7}},
+])
+def test_invalid_taxonomies_are_rejected(changes):
+    with pytest.raises(TaxonomyError):
+        Taxonomy.compile(version(1, **changes))
+
+
+def test_new_versions_are_swapped_in_and_bad_files_ignored(taxonomy_file):
+    first = taxonomy.current()
+    assert first.version == 1
+    assert taxonomy.current() is first
+
+    write(taxonomy_file, version(2, roles={'designer': "Figma prototype typography"}))
+    second = taxonomy.current()
+    assert second.version == 2
+    assert list(second.job_role_keywords) == ['designer']
+    # Snapshots taken earlier are unchanged
+    assert first.job_role_keywords == SHIPPED['roles']
+
+    taxonomy_file.write_text("{not json")
+    assert taxonomy.current() is second
+    write(taxonomy_file, version(2, roles={'other': "Changed without a new version"}))
+    assert taxonomy.current() is second
+
+    taxonomy_file.unlink()
+    assert taxonomy.current() is second
+
+
+def test_checks_are_rate_limited(taxonomy_file, settings):
+    settings.TAXONOMY_CHECK_SECONDS = 3600
+    first = taxonomy.current()
+
+    write(taxonomy_file, version(2))
+
+    assert taxonomy.current() is first
+
+
+def test_missing_taxonomy_fails_on_first_use(taxonomy_file):
+    taxonomy_file.unlink()
+    taxonomy.reset()
+
+    with pytest.raises(TaxonomyError):
+        taxonomy.current()
+
+
+def test_publish_command_validates_and_replaces_atomically(taxonomy_file, tmp_path):
+    source = tmp_path / 'next.json'
+    write(source, version(1))
+    with pytest.raises(CommandError, match="higher version"):
+        call_command('publish_taxonomy', str(source))
+
+    write(source, version(3, skills={'technical': ['python'], 'soft': 'leadership', 'domain': []}))
+    with pytest.raises(CommandError, match="Invalid taxonomy"):
+        call_command('publish_taxonomy', str(source), '--check')
+
+    write(source, version(3))
+    call_command('publish_taxonomy', str(source))
+
+    assert taxonomy.current().version == 3
+    assert [p.name for p in tmp_path.iterdir() if p.name.startswith('.taxonomy-')] == []
+
+
+def test_publish_command_never_writes_the_shipped_taxonomy(tmp_path, settings):
+    settings.TAXONOMY_PATH = ''
+    source = tmp_path / 'next.json'
+    write(source, version(SHIPPED['version'] + 1))
+    shipped = Path(taxonomy.DEFAULT_PATH).read_bytes()
+
+    call_command('publish_taxonomy', str(source), '--check', stdout=StringIO())
+    with pytest.raises(CommandError, match="TAXONOMY_PATH is not set"):
+        call_command('publish_taxonomy', str(source))
+
+    assert Path(taxonomy.DEFAULT_PATH).read_bytes() == shipped
+
+
+@requires_nltk_data
+def test_analyses_in_flight_keep_their_snapshot(taxonomy_file):
+    from api.ai.resume_analyzer import AdvancedResumeAnalyzer
+
+    analyzer = AdvancedResumeAnalyzer()
+    resume = "Python developer building Django services with SQL and Docker on AWS."
+    assert analyzer.analyze_resume(resume, fields=['job_role'])['job_role'] == 'Software Engineer'
+
+    events = analyzer.iter_analysis(resume, fields=['category_scores', 'job_role'])
+    next(events)
+    write(taxonomy_file, version(2, roles={'chef': "Cooking kitchen menu pastry", 'pilot': "Flight aircraft"}))
+    results = {}
+    for event, data in events:
+        if event == 'stage':
+            results.update(data['results'])
+
+    assert results['job_role'] == 'Software Engineer'
+    assert analyzer.analyze_resume(resume, fields=['job_role'])['job_role'] in ('Chef', 'Pilot')
+
+
+@requires_nltk_data
+def test_matches_follow_the_published_skills(taxonomy_file):
+    from api.ai.job_matcher import JobMatcher
+
+    matcher = JobMatcher()
+    resume, job = "Experienced with Python and Terraform", "We need Python and Terraform"
+    prepared = matcher.prepare_job(job)
+    assert matcher.calculate_match_score(resume, job, prepared)['matched_skills']['technical'] == ['python']
+
+    skills = dict(SHIPPED['skills'], technical=SHIPPED['skills']['technical'] + ['terraform'])
+    write(taxonomy_file, version(2, skills=skills))
+
+    # The job prepared with version 1 is prepared again
+    result = matcher.calculate_match_score(resume, job, prepared)
+    assert sorted(result['matched_skills']['technical']) == ['python', 'terraform']
@@ -1,13 +1,18 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import ResumeViewSet, FeedbackViewSet
+from .views import ResumeViewSet, FeedbackViewSet, RequestProfileViewSet, JobDescriptionViewSet
+from .observability.views import memory_report, metrics
 
 # Create a router and register our viewsets with it
 router = DefaultRouter()
 router.register(r'resumes', ResumeViewSet)
 router.register(r'feedback', FeedbackViewSet)
+router.register(r'profiles', RequestProfileViewSet)
+router.register(r'job-descriptions', JobDescriptionViewSet)
 
 # The API URLs are now determined automatically by the router
 urlpatterns = [
+    path('metrics/', metrics, name='metrics'),
+    path('metrics/memory/', memory_report, name='metrics-memory'),
     path('', include(router.urls)),
 ]
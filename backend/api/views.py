@@ -1,35 +1,270 @@
+import math
+import os
+
 from django.conf import settings
+from django.http import FileResponse, Http404, StreamingHttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
 from rest_framework import viewsets, status, permissions
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.parsers import MultiPartParser, FormParser
-
-from .models import Resume, Feedback
-from .serializers import ResumeSerializer, FeedbackSerializer, ResumeUploadSerializer
+from rest_framework.renderers import JSONRenderer
+
+from .models import Resume, Feedback, RequestProfile, JobDescription as JobDescriptionModel
+from .serializers import (
+    ResumeSerializer,
+    FeedbackSerializer,
+    ResumeUploadSerializer,
+    RequestProfileSerializer,
+    JobDescriptionSerializer,
+    feedback_plain_serializer,
+    resume_plain_serializer,
+    with_raw_json
+)
+from .idempotency import idempotent
+from .renderers import CSVRenderer, EventStreamRenderer, FastJSONRenderer, NDJSONRenderer, format_event
+from .ai.engines import UnknownEngineError, available as available_engines, get_engine, select_engine
+from .ai.resume_analyzer import ANALYSIS_FIELDS
+from .observability.profiling import ProfiledViewMixin
 from .adapters.services import FileService, ResumeAnalyzerService
-from .adapters.repositories import ResumeRepository, FeedbackRepository
+from .adapters.repositories import EXPORT_FIELDS, ResumeRepository, FeedbackRepository, JobDescriptionRepository
+from .adapters.coalescing import flight_key, get_single_flight
 from .domain.use_cases import (
     ResumeUploadUseCase,
     ResumeAnalysisUseCase,
     GetUserResumesUseCase,
     JobComparisonUseCase,
-    JobDescription
+    JobDescription,
+    ResumeStatsUseCase,
+    apply_analysis,
+    category_feedback
 )
 
 
-class ResumeViewSet(viewsets.ModelViewSet):
+class FastReadMixin:
+    """
+    Mixin for model viewsets that serves list and retrieve with a compiled
+    PlainSerializer instead of serializer_class, unless
+    FAST_SERIALIZATION_ENABLED is off. The JSON fields in raw_json_fields
+    are read as stored text and written out by FastJSONRenderer unparsed;
+    with the fast path off, DRF's JSONRenderer is used throughout.
+    """
+
+    plain_serializer = None
+    raw_json_fields = ()
+
+    def get_renderers(self):
+        """Render with FastJSONRenderer in place of JSONRenderer while the fast path is on."""
+        renderers = super().get_renderers()
+        if not settings.FAST_SERIALIZATION_ENABLED:
+            return renderers
+        return [
+            FastJSONRenderer() if type(renderer) is JSONRenderer else renderer
+            for renderer in renderers
+        ]
+
+    def read_queryset(self, queryset):
+        """Prepare the queryset of a list or retrieve request."""
+        if settings.FAST_SERIALIZATION_ENABLED and self.raw_json_fields:
+            queryset = with_raw_json(queryset, *self.raw_json_fields)
+        return queryset
+
+    def list(self, request, *args, **kwargs):
+        if not settings.FAST_SERIALIZATION_ENABLED:
+            return super().list(request, *args, **kwargs)
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(self.plain_serializer.many(page))
+        return Response(self.plain_serializer.many(queryset))
+
+    def retrieve(self, request, *args, **kwargs):
+        if not settings.FAST_SERIALIZATION_ENABLED:
+            return super().retrieve(request, *args, **kwargs)
+        return Response(self.plain_serializer.to_representation(self.get_object()))
+
+
+class ResumeViewSet(FastReadMixin, ProfiledViewMixin, viewsets.ModelViewSet):
     """ViewSet for Resume model."""
 
     queryset = Resume.objects.all()
     serializer_class = ResumeSerializer
+    plain_serializer = resume_plain_serializer
+    raw_json_fields = ('feedback', 'sections')
     permission_classes = [permissions.IsAuthenticated]
     parser_classes = [MultiPartParser, FormParser]
 
     def get_queryset(self):
         """Filter resumes by the current user."""
-        return Resume.objects.filter(user=self.request.user)
+        queryset = Resume.objects.filter(user=self.request.user)
+        if self.action in ('list', 'retrieve'):
+            # The owner and feedback rows of any number of resumes in two more queries
+            queryset = self.read_queryset(queryset.select_related('user').prefetch_related('detailed_feedback'))
+        return queryset
+
+    def get_engine_name(self):
+        """
+        Get the engine requested with an 'engine' field or query parameter.
+
+        Only the name is checked; no engine is built.
+
+        Returns:
+            The engine name, or None to use the configured default or
+            canary split.
+
+        Raises:
+            UnknownEngineError: If the requested engine is not registered.
+        """
+        requested = self.request.data.get('engine') or self.request.query_params.get('engine')
+        if requested and requested not in available_engines():
+            raise UnknownEngineError(f"Unknown analysis engine '{requested}'")
+        return requested or None
+
+    def get_analyzer_service(self, feedback_repository, engine_name=None):
+        """
+        Build the analyzer service with the engine chosen for this request.
+
+        Validate the request first: building the engine can be expensive
+        (the legacy engine loads its NLTK data).
+
+        Args:
+            feedback_repository: Repository for detailed feedback.
+            engine_name: The engine from get_engine_name(), or None for the
+                configured default or canary split.
+        """
+        return ResumeAnalyzerService(feedback_repository, engine=select_engine(engine_name))
+
+    def get_analysis_fields(self):
+        """
+        Get the analysis outputs requested with a comma-separated 'fields'
+        field or query parameter, e.g. "score,category_scores".
+
+        Returns:
+            List of field names, or None to compute everything.
+
+        Raises:
+            ValueError: If an unknown field is requested.
+        """
+        raw = self.request.data.get('fields') or self.request.query_params.get('fields')
+        if not raw:
+            return None
+        fields = [field.strip() for field in raw.split(',') if field.strip()]
+        unknown = sorted(set(fields) - set(ANALYSIS_FIELDS))
+        if unknown:
+            raise ValueError(
+                f"Unknown fields: {', '.join(unknown)}. Choose from {', '.join(ANALYSIS_FIELDS)}"
+            )
+        return fields
+
+    def get_time_budget(self):
+        """
+        Get the time budget for the analysis in seconds.
+
+        ANALYSIS_BUDGET_SECONDS sets the default; a 'budget' field or query
+        parameter can lower it for one request.
+
+        Returns:
+            The budget, or None when the analysis is unbounded.
+
+        Raises:
+            ValueError: If the requested budget is not a positive, finite
+                number.
+        """
+        budget = settings.ANALYSIS_BUDGET_SECONDS or None
+        raw = self.request.data.get('budget') or self.request.query_params.get('budget')
+        if raw:
+            try:
+                requested = float(raw)
+            except ValueError:
+                requested = 0
+            # NaN compares false with every deadline, so it would mean no budget
+            if not (math.isfinite(requested) and requested > 0):
+                raise ValueError("budget must be a positive number of seconds")
+            budget = min(budget, requested) if budget else requested
+        return budget
+
+    def get_job_description(self):
+        """
+        Get the job description to match against: a stored one named by a
+        'job_description_id' field or query parameter, or one given inline
+        with 'job_title' and 'job_description' fields.
+
+        Returns:
+            A JobDescription, or None if the request names none.
+
+        Raises:
+            Http404: If the stored job description does not exist.
+        """
+        job_description_id = (
+            self.request.data.get('job_description_id') or self.request.query_params.get('job_description_id')
+        )
+        if job_description_id:
+            job_description = JobDescriptionRepository(JobDescriptionModel).get_by_id(job_description_id)
+            if job_description is None:
+                raise Http404(f"Job description with ID {job_description_id} not found")
+            return job_description
+
+        if 'job_title' in self.request.data and 'job_description' in self.request.data:
+            return JobDescription(
+                title=self.request.data.get('job_title', ''),
+                description=self.request.data.get('job_description', ''),
+                company=self.request.data.get('company', ''),
+                location=self.request.data.get('location', '')
+            )
+        return None
+
+    def refresh_prepared_job(self, job_description, analyzer_service):
+        """
+        Recompute the stored representation of a stored job description
+        when it is out of date, e.g. after a new taxonomy is published, and
+        store it so later requests reuse it.
+        """
+        if job_description is None or job_description.id is None:
+            return
+        prepared = analyzer_service.refresh_prepared_job(job_description.description, job_description.prepared)
+        if prepared is not None:
+            job_description.prepared = prepared
+            JobDescriptionRepository(JobDescriptionModel).save_prepared(job_description)
+
+    def get_resume_filters(self):
+        """
+        Get the resume filters of an export or stats request from the
+        'created_after' and 'created_before' (ISO dates or datetimes,
+        inclusive) and 'min_score' and 'max_score' query parameters.
+
+        Returns:
+            Keyword arguments for api.adapters.repositories.resume_filter.
+
+        Raises:
+            ValueError: If a parameter is malformed.
+        """
+        filters = {}
+        for name in ('created_after', 'created_before'):
+            raw = self.request.query_params.get(name)
+            if not raw:
+                continue
+            try:
+                value = parse_datetime(raw) or parse_date(raw)
+            except ValueError:
+                value = None
+            if value is None:
+                raise ValueError(f"{name} must be an ISO date or datetime")
+            if hasattr(value, 'hour') and timezone.is_naive(value):
+                value = timezone.make_aware(value)
+            filters[name] = value
+        for name in ('min_score', 'max_score'):
+            raw = self.request.query_params.get(name)
+            if not raw:
+                continue
+            try:
+                filters[name] = int(raw)
+            except ValueError:
+                raise ValueError(f"{name} must be an integer")
+        return filters
 
     @action(detail=False, methods=['post'], serializer_class=ResumeUploadSerializer)
+    @idempotent
     def upload(self, request):
         """Upload a new resume."""
         serializer = self.get_serializer(data=request.data)
@@ -52,49 +287,50 @@ class ResumeViewSet(viewsets.ModelViewSet):
         )
 
     @action(detail=True, methods=['post'])
+    @idempotent
     def analyze(self, request, pk=None):
         """Analyze a resume."""
         # Initialize services and repositories
         feedback_repository = FeedbackRepository(Feedback)
-        analyzer_service = ResumeAnalyzerService(feedback_repository)
+        try:
+            fields = self.get_analysis_fields()
+            budget = self.get_time_budget()
+            engine_name = self.get_engine_name()
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        analyzer_service = self.get_analyzer_service(feedback_repository, engine_name)
         resume_repository = ResumeRepository(Resume)
 
         # Check if job description is provided
-        job_description = None
-        if 'job_title' in request.data and 'job_description' in request.data:
-            job_description = JobDescription(
-                title=request.data.get('job_title', ''),
-                description=request.data.get('job_description', ''),
-                company=request.data.get('company', ''),
-                location=request.data.get('location', '')
-            )
+        job_description = self.get_job_description()
+        self.refresh_prepared_job(job_description, analyzer_service)
 
         # Initialize use case
         analysis_use_case = ResumeAnalysisUseCase(resume_repository, analyzer_service)
 
-        try:
-            # Execute use case
+        def run_analysis():
             if job_description:
                 # If job description is provided, analyze with job comparison
-                resume = self.analyze_with_job(pk, job_description, resume_repository, analyzer_service, feedback_repository)
+                resume, feedback = self.analyze_with_job(
+                    pk, job_description, resume_repository, analyzer_service, feedback_repository, fields, budget
+                )
             else:
                 # Regular analysis without job description
-                resume = analysis_use_case.execute(pk)
+                resume, feedback = analysis_use_case.execute(pk, fields=fields, budget=budget)
 
                 # Save detailed feedback for main categories
-                main_categories = ['technical_skills', 'education', 'experience', 'achievements', 'formatting']
-                for category in main_categories:
-                    if category in resume.feedback:
-                        feedback_repository.create(
-                            resume_id=resume.id,
-                            category=category,
-                            content=resume.feedback[category],
-                            score=resume.feedback.get('category_scores', {}).get(category, resume.score)
-                        )
+                self.save_category_feedback(resume, feedback_repository)
+            return {'resume_id': resume.id, 'feedback': feedback}
+
+        try:
+            # Execute use case, sharing the run of an identical request in flight
+            result = self.coalesce(
+                run_analysis, pk, job_description, analyzer_service.engine.name, sorted(fields or ()), budget
+            )
 
             # Return response
             return Response(
-                ResumeSerializer(Resume.objects.get(id=resume.id)).data,
+                self.analysis_data(result['resume_id'], result['feedback']),
                 status=status.HTTP_200_OK
             )
         except ValueError as e:
@@ -108,7 +344,8 @@ class ResumeViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
-    def analyze_with_job(self, resume_id, job_description, resume_repository, analyzer_service, feedback_repository):
+    def analyze_with_job(self, resume_id, job_description, resume_repository, analyzer_service, feedback_repository,
+                         fields=None, budget=None):
         """Analyze a resume with job description comparison."""
         # Get the resume
         resume = resume_repository.get_by_id(resume_id)
@@ -116,58 +353,139 @@ class ResumeViewSet(viewsets.ModelViewSet):
         if not resume:
             raise ValueError(f"Resume with ID {resume_id} not found")
 
+        # Segment the resume once and keep the sections for later analyses
+        if resume.sections is None:
+            resume.sections = analyzer_service.segment(resume.content)
+
         # Analyze the resume with job description
-        score, feedback = analyzer_service.analyze(resume.content, job_description.description)
+        score, feedback = analyzer_service.analyze(
+            resume.content, job_description.description, sections=resume.sections, fields=fields, budget=budget,
+            prepared_job=job_description.prepared
+        )
 
         # Update the resume with the analysis results
-        resume.score = score
-        resume.feedback = feedback
+        feedback = apply_analysis(resume, score, feedback)
 
         # Save the updated resume
         updated_resume = resume_repository.update(resume)
 
         # Save detailed feedback for main categories
-        main_categories = ['technical_skills', 'education', 'experience', 'achievements', 'formatting']
-        for category in main_categories:
-            if category in resume.feedback:
-                feedback_repository.create(
-                    resume_id=resume.id,
-                    category=category,
-                    content=resume.feedback[category],
-                    score=resume.feedback.get('category_scores', {}).get(category, resume.score)
-                )
+        self.save_category_feedback(resume, feedback_repository)
+
+        return updated_resume, feedback
+
+    def analysis_data(self, resume_id, feedback):
+        """The saved resume, with the feedback of the analysis that just ran."""
+        data = ResumeSerializer(Resume.objects.get(id=resume_id)).data
+        data['feedback'] = feedback
+        return data
+
+    def coalesce(self, work, *key_parts):
+        """
+        Run work() for this action once across concurrent identical requests.
+
+        Requests with the same action and key parts, e.g. resume ID, job
+        description, engine and options, wait for the one already running
+        and return its result (see api.adapters.coalescing).
+        """
+        if not settings.ANALYSIS_SINGLE_FLIGHT_ENABLED:
+            return work()
+        flight = get_single_flight(self.action, settings.ANALYSIS_LOCK_DIR or None)
+        return flight.do(flight_key(*key_parts), work)
+
+    def save_category_feedback(self, resume, feedback_repository):
+        """Save the detailed feedback of an analyzed resume's main categories."""
+        for category, content, score in category_feedback(resume):
+            feedback_repository.save(resume_id=resume.id, category=category, content=content, score=score)
+
+    @action(detail=True, methods=['post'], url_path='analyze/stream',
+            renderer_classes=[EventStreamRenderer, JSONRenderer])
+    def analyze_stream(self, request, pk=None):
+        """
+        Analyze a resume, streaming results as server-sent events.
+
+        Accepts the same parameters as analyze. Emits a 'start' event, then
+        'category_score' events as each category is scored and a 'stage'
+        event as each stage (job_role, keywords, improvement_suggestions,
+        ...) completes, and finally 'complete' with the saved resume, or
+        'error'. The result is saved only once the analysis completes; if
+        the client disconnects first, the analysis is stopped.
+        """
+        feedback_repository = FeedbackRepository(Feedback)
+        try:
+            fields = self.get_analysis_fields()
+            budget = self.get_time_budget()
+            engine_name = self.get_engine_name()
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        analyzer_service = self.get_analyzer_service(feedback_repository, engine_name)
+        resume_repository = ResumeRepository(Resume)
+
+        job_description = self.get_job_description()
+        self.refresh_prepared_job(job_description, analyzer_service)
+
+        analysis_use_case = ResumeAnalysisUseCase(resume_repository, analyzer_service)
+        try:
+            events = analysis_use_case.stream(pk, job_description, fields=fields, budget=budget)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_404_NOT_FOUND)
 
-        return updated_resume
+        response = StreamingHttpResponse(
+            self.stream_events(pk, analyzer_service.engine.name, events, feedback_repository),
+            content_type=EventStreamRenderer.media_type
+        )
+        # Keep proxies from caching or buffering the stream
+        response['Cache-Control'] = 'no-cache'
+        response['X-Accel-Buffering'] = 'no'
+        return response
+
+    def stream_events(self, resume_id, engine_name, events, feedback_repository):
+        """Encode analysis events as server-sent events, saving the final result."""
+        try:
+            yield format_event('start', {'resume_id': int(resume_id), 'engine': engine_name})
+            for event, data in events:
+                if event == 'complete':
+                    resume, feedback = data
+                    self.save_category_feedback(resume, feedback_repository)
+                    data = self.analysis_data(resume.id, feedback)
+                yield format_event(event, data)
+        except Exception as e:
+            yield format_event('error', {'error': str(e)})
+        finally:
+            # Runs when the client disconnects too, stopping the analysis
+            events.close()
 
     @action(detail=True, methods=['post'])
     def compare_job(self, request, pk=None):
         """Compare a resume with a job description."""
         # Validate input
-        if 'job_title' not in request.data or 'job_description' not in request.data:
+        job_description = self.get_job_description()
+        if job_description is None:
             return Response(
-                {'error': 'Job title and description are required'},
+                {'error': 'Job title and description, or a job_description_id, are required'},
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        # Create job description object
-        job_description = JobDescription(
-            title=request.data.get('job_title', ''),
-            description=request.data.get('job_description', ''),
-            company=request.data.get('company', ''),
-            location=request.data.get('location', '')
-        )
-
         # Initialize services and repositories
         feedback_repository = FeedbackRepository(Feedback)
-        analyzer_service = ResumeAnalyzerService(feedback_repository)
+        try:
+            budget = self.get_time_budget()
+            engine_name = self.get_engine_name()
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        analyzer_service = self.get_analyzer_service(feedback_repository, engine_name)
         resume_repository = ResumeRepository(Resume)
+        self.refresh_prepared_job(job_description, analyzer_service)
 
         # Initialize use case
         job_comparison_use_case = JobComparisonUseCase(resume_repository, analyzer_service)
 
         try:
             # Execute use case
-            match_results = job_comparison_use_case.execute(pk, job_description)
+            match_results = self.coalesce(
+                lambda: job_comparison_use_case.execute(pk, job_description, budget=budget),
+                pk, job_description, analyzer_service.engine.name, budget
+            )
 
             # Return response
             return Response(match_results, status=status.HTTP_200_OK)
@@ -182,14 +500,120 @@ class ResumeViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
+    @action(detail=False, methods=['get'], renderer_classes=[NDJSONRenderer, CSVRenderer])
+    def export(self, request):
+        """
+        Export the scores, category scores and feedback of the user's
+        resumes as NDJSON (the default) or CSV, picked with ?format= or the
+        Accept header.
+
+        The export is streamed straight from the database, so memory stays
+        constant however many resumes are exported. Filter with
+        created_after, created_before, min_score and max_score.
+        """
+        try:
+            filters = self.get_resume_filters()
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
-class FeedbackViewSet(viewsets.ReadOnlyModelViewSet):
+        renderer = request.accepted_renderer
+        rows = ResumeRepository(Resume).iter_exports(request.user.id, **filters)
+        response = StreamingHttpResponse(
+            renderer.stream(rows, EXPORT_FIELDS),
+            content_type=f'{renderer.media_type}; charset={renderer.charset}'
+        )
+        response['Content-Disposition'] = f'attachment; filename="resumes.{renderer.format}"'
+        response['X-Accel-Buffering'] = 'no'
+        return response
+
+    @action(detail=False, methods=['get'])
+    def stats(self, request):
+        """
+        Summarize the user's resumes: their count, the average, lowest and
+        highest score, the score distribution in buckets of ten and the
+        average score of each feedback category.
+
+        Everything is aggregated in the database. Accepts the same filters
+        as export.
+        """
+        try:
+            filters = self.get_resume_filters()
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        stats_use_case = ResumeStatsUseCase(ResumeRepository(Resume), FeedbackRepository(Feedback))
+        return Response(stats_use_case.execute(request.user.id, **filters))
+
+
+class FeedbackViewSet(FastReadMixin, ProfiledViewMixin, viewsets.ReadOnlyModelViewSet):
     """ViewSet for Feedback model."""
 
     queryset = Feedback.objects.all()
     serializer_class = FeedbackSerializer
+    plain_serializer = feedback_plain_serializer
     permission_classes = [permissions.IsAuthenticated]
 
     def get_queryset(self):
         """Filter feedback by the current user's resumes."""
         return Feedback.objects.filter(resume__user=self.request.user)
+
+
+class JobDescriptionViewSet(ProfiledViewMixin, viewsets.ModelViewSet):
+    """
+    ViewSet for stored job descriptions.
+
+    Any user can read and match against job descriptions; only their
+    creator can change or delete them. The job side of the match is
+    computed when a job description is saved, so analyze and compare_job
+    requests naming it by job_description_id only process the resume.
+    """
+
+    queryset = JobDescriptionModel.objects.all()
+    serializer_class = JobDescriptionSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        """Limit changes to the current user's job descriptions."""
+        if self.request.method in permissions.SAFE_METHODS:
+            return JobDescriptionModel.objects.all()
+        return JobDescriptionModel.objects.filter(created_by=self.request.user)
+
+    def perform_create(self, serializer):
+        serializer.save(
+            created_by=self.request.user,
+            prepared=self.prepare(serializer.validated_data['description'])
+        )
+
+    def perform_update(self, serializer):
+        description = serializer.validated_data.get('description', serializer.instance.description)
+        if description != serializer.instance.description or serializer.instance.prepared is None:
+            serializer.save(prepared=self.prepare(description))
+        else:
+            serializer.save()
+
+    def prepare(self, description):
+        """Precompute the job side of matches with the default engine."""
+        engine = get_engine(settings.ANALYSIS_ENGINE)
+        return ResumeAnalyzerService(None, engine=engine).prepare_job(description)
+
+
+class RequestProfileViewSet(viewsets.ReadOnlyModelViewSet):
+    """ViewSet for captured request profiles (admin only)."""
+
+    queryset = RequestProfile.objects.all()
+    serializer_class = RequestProfileSerializer
+    permission_classes = [permissions.IsAdminUser]
+
+    @action(detail=True, methods=['get'])
+    def download(self, request, pk=None):
+        """Download the raw profile in pstats format."""
+        profile = self.get_object()
+        if not os.path.exists(profile.profile_path):
+            raise Http404("Profile data is no longer available")
+
+        return FileResponse(
+            open(profile.profile_path, 'rb'),
+            as_attachment=True,
+            filename=f"request-profile-{profile.id}.prof",
+            content_type='application/octet-stream'
+        )
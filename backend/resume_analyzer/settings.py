@@ -11,7 +11,10 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
 import os
+import tempfile
 from pathlib import Path
+
+from corsheaders.defaults import default_headers
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -53,6 +56,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    "api.observability.middleware.RequestMetricsMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -60,6 +64,7 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "api.observability.middleware.StageTimingMiddleware",
 ]
 
 ROOT_URLCONF = "resume_analyzer.urls"
@@ -141,6 +146,7 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 # CORS settings
 CORS_ALLOW_ALL_ORIGINS = True
+CORS_ALLOW_HEADERS = (*default_headers, 'idempotency-key')
 
 # Media files
 MEDIA_URL = '/media/'
@@ -156,3 +162,80 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.IsAuthenticated',
     ],
 }
+
+# Response serialization
+# Serve resume and feedback reads with compiled plain-dict serializers,
+# passing stored feedback and sections JSON through without parsing it
+FAST_SERIALIZATION_ENABLED = os.getenv('FAST_SERIALIZATION_ENABLED', 'True') == 'True'
+
+# Observability
+# Per-stage timing of the analysis pipeline, exported at /api/metrics/
+STAGE_TIMING_ENABLED = os.getenv('STAGE_TIMING_ENABLED', 'True') == 'True'
+# Opt-in tracemalloc profiling of analysis stages, reported at /api/metrics/memory/
+MEMORY_PROFILING_ENABLED = os.getenv('MEMORY_PROFILING_ENABLED', 'False') == 'True'
+MEMORY_PROFILING_TOP_N = int(os.getenv('MEMORY_PROFILING_TOP_N', '10'))
+MEMORY_PROFILING_FRAMES = int(os.getenv('MEMORY_PROFILING_FRAMES', '1'))
+# cProfile capture: staff can flag a request with "X-Profile: 1" or "?profile=1";
+# PROFILING_SAMPLE_RATE additionally profiles that fraction of API requests
+PROFILING_SAMPLE_RATE = float(os.getenv('PROFILING_SAMPLE_RATE', '0'))
+PROFILE_DIR = os.getenv('PROFILE_DIR', os.path.join(BASE_DIR, 'profiles'))
+PROFILING_RETENTION_DAYS = int(os.getenv('PROFILING_RETENTION_DAYS', '7'))
+# Per-route request latency, query counts and response sizes
+REQUEST_METRICS_ENABLED = os.getenv('REQUEST_METRICS_ENABLED', 'True') == 'True'
+# Requests slower than this are logged with their query breakdown
+SLOW_REQUEST_SECONDS = float(os.getenv('SLOW_REQUEST_SECONDS', '1.0'))
+# Addresses allowed to scrape /api/metrics/ without a staff session
+METRICS_ALLOWED_IPS = [
+    ip.strip() for ip in os.getenv('METRICS_ALLOWED_IPS', '127.0.0.1,::1').split(',') if ip.strip()
+]
+
+# Analysis engines
+# Default engine for analyze and compare_job requests
+ANALYSIS_ENGINE = os.getenv('ANALYSIS_ENGINE', 'legacy')
+# Additional engines as "name=package.module.Class,..."
+ANALYSIS_ENGINES = dict(
+    item.strip().split('=', 1) for item in os.getenv('ANALYSIS_ENGINES', '').split(',') if '=' in item
+)
+# Canary traffic split as "name=fraction,...", e.g. "fast=0.05"
+ANALYSIS_ENGINE_CANARY = {
+    name.strip(): float(fraction)
+    for name, fraction in (
+        item.split('=', 1) for item in os.getenv('ANALYSIS_ENGINE_CANARY', '').split(',') if '=' in item
+    )
+}
+# Persist preprocessed resume sections so re-analyzing an edited resume
+# only preprocesses the sections that changed
+ANALYSIS_SECTION_CACHE_ENABLED = os.getenv('ANALYSIS_SECTION_CACHE_ENABLED', 'True') == 'True'
+ANALYSIS_SECTION_CACHE_RETENTION_DAYS = int(os.getenv('ANALYSIS_SECTION_CACHE_RETENTION_DAYS', '30'))
+# Skill and role taxonomy file (see publish_taxonomy); empty uses the one
+# shipped in api/ai/taxonomy.json, which is read-only seed data, so set it
+# to a writable path before publishing. Workers pick up a newly published
+# version within TAXONOMY_CHECK_SECONDS, without restarting.
+TAXONOMY_PATH = os.getenv('TAXONOMY_PATH', '')
+TAXONOMY_CHECK_SECONDS = float(os.getenv('TAXONOMY_CHECK_SECONDS', '5'))
+# Role classifier artifact (.npz from train_role_classifier) used by the
+# centroid engine; empty trains one from the taxonomy's role keywords
+ROLE_CLASSIFIER_PATH = os.getenv('ROLE_CLASSIFIER_PATH', '')
+# Cache match results by resume and job description content, in process
+# and in the database, so reopening a comparison does not recompute it
+ANALYSIS_MATCH_CACHE_ENABLED = os.getenv('ANALYSIS_MATCH_CACHE_ENABLED', 'True') == 'True'
+ANALYSIS_MATCH_CACHE_MEMORY_ENTRIES = int(os.getenv('ANALYSIS_MATCH_CACHE_MEMORY_ENTRIES', '1024'))
+ANALYSIS_MATCH_CACHE_DB_ENTRIES = int(os.getenv('ANALYSIS_MATCH_CACHE_DB_ENTRIES', '100000'))
+ANALYSIS_MATCH_CACHE_RETENTION_DAYS = int(os.getenv('ANALYSIS_MATCH_CACHE_RETENTION_DAYS', '30'))
+# Time budget in seconds for analyze and compare_job; once spent, the
+# remaining lower-priority stages are skipped and partial results are
+# returned flagged as degraded. 0 means no budget.
+ANALYSIS_BUDGET_SECONDS = float(os.getenv('ANALYSIS_BUDGET_SECONDS', '0'))
+# Concurrent identical analyze and compare_job requests share one run.
+# Lock files in ANALYSIS_LOCK_DIR extend this across the worker processes
+# of one host; set it empty to coalesce within each process only.
+ANALYSIS_SINGLE_FLIGHT_ENABLED = os.getenv('ANALYSIS_SINGLE_FLIGHT_ENABLED', 'True') == 'True'
+ANALYSIS_LOCK_DIR = os.getenv('ANALYSIS_LOCK_DIR', os.path.join(tempfile.gettempdir(), 'resume_analyzer_locks'))
+
+# Idempotency
+# Responses to upload and analyze requests sent with an Idempotency-Key
+# header are replayed to retries with the same key for this long
+IDEMPOTENCY_ENABLED = os.getenv('IDEMPOTENCY_ENABLED', 'True') == 'True'
+IDEMPOTENCY_KEY_TTL_HOURS = int(os.getenv('IDEMPOTENCY_KEY_TTL_HOURS', '24'))
+# How long a retry waits for an attempt still running in another process
+IDEMPOTENCY_WAIT_SECONDS = float(os.getenv('IDEMPOTENCY_WAIT_SECONDS', '30'))